@@ -0,0 +1,251 @@
+"""Pre-aggregated project analytics.
+
+Counters are keyed "<dimension>:<value>" (plus "total") and hold a project
+count and an estimated_cost sum. Every project write applies the difference
+between the document's old and new contributions, so reading the dashboard
+costs the same whatever the number of projects. rebuild_counters (or the Mongo
+aggregation in MongoAnalyticsStore.rebuild) recomputes them from scratch to
+repair drift, e.g. after writes that bypassed the API.
+
+A rebuild is not atomic with respect to project writes: a write that lands
+after the projects were read but before the new counters are stored is
+either lost or counted twice. Rebuild while writes are quiet, or rebuild
+again afterwards; each rebuild starts from scratch, so this drift never
+accumulates.
+"""
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Dict, Any, Tuple, AsyncIterator
+import sqlite3
+
+# (project count, estimated_cost sum)
+Counter = Tuple[int, float]
+
+DIMENSIONS = ('tier', 'category', 'status', 'day')
+UNKNOWN = "unknown"
+
+
+def _day(value: Any) -> str:
+    if isinstance(value, str):
+        # Legacy documents stored created_at as an ISO string
+        try:
+            value = datetime.fromisoformat(value)
+        except ValueError:
+            return UNKNOWN
+    if not isinstance(value, datetime):
+        return UNKNOWN
+    if value.tzinfo is not None:
+        value = value.astimezone(timezone.utc)
+    return value.strftime('%Y-%m-%d')
+
+
+def contributions(doc: Optional[Dict[str, Any]]) -> Dict[str, Counter]:
+    """Counter increments one project adds"""
+    if doc is None:
+        return {}
+    cost = float(doc.get('estimated_cost') or 0)
+    keys = ["total"]
+    keys += [f"{dimension}:{doc.get(dimension) or UNKNOWN}" for dimension in ('tier', 'category', 'status')]
+    keys.append(f"day:{_day(doc.get('created_at'))}")
+    keys += [f"addon:{addon}" for addon in set(doc.get('addons') or [])]
+    return {key: (1, cost) for key in keys}
+
+
+def delta(previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> Dict[str, Counter]:
+    """Counter changes for one write; unchanged keys are left out"""
+    changes: Dict[str, Counter] = {}
+    for key, (count, cost) in contributions(current).items():
+        changes[key] = (count, cost)
+    for key, (count, cost) in contributions(previous).items():
+        old_count, old_cost = changes.get(key, (0, 0.0))
+        changes[key] = (old_count - count, old_cost - cost)
+    return {key: change for key, change in changes.items() if change != (0, 0.0)}
+
+
+async def rebuild_counters(projects: AsyncIterator[Dict[str, Any]]) -> Dict[str, Counter]:
+    """Recompute every counter by streaming all projects"""
+    counters: Dict[str, Counter] = {}
+    async for doc in projects:
+        for key, (count, cost) in contributions(doc).items():
+            old_count, old_cost = counters.get(key, (0, 0.0))
+            counters[key] = (old_count + count, old_cost + cost)
+    return counters
+
+
+def summarize(counters: Dict[str, Counter], days: Optional[int] = None) -> Dict[str, Any]:
+    """Shape counters for the admin API, optionally keeping only the last `days` days"""
+    since = None
+    if days is not None:
+        since = (datetime.now(timezone.utc) - timedelta(days=days - 1)).strftime('%Y-%m-%d')
+
+    groups: Dict[str, Dict[str, Dict[str, Any]]] = {dimension: {} for dimension in DIMENSIONS + ('addon',)}
+    for key, (count, cost) in counters.items():
+        if key == "total" or count <= 0:
+            continue
+        dimension, _, value = key.partition(':')
+        if dimension not in groups or (dimension == 'day' and since and value < since):
+            continue
+        groups[dimension][value] = {"count": count, "estimated_cost": round(cost, 2)}
+
+    total_count, total_cost = counters.get("total", (0, 0.0))
+    by_count = lambda items: dict(sorted(items.items(), key=lambda item: (-item[1]['count'], item[0])))
+    return {
+        "projects": total_count,
+        "estimated_cost": round(total_cost, 2),
+        "by_tier": by_count(groups['tier']),
+        "by_category": by_count(groups['category']),
+        "by_status": by_count(groups['status']),
+        "by_day": dict(sorted(groups['day'].items())),
+        "addons": by_count(groups['addon']),
+    }
+
+
+class AnalyticsStore(ABC):
+    """Where the counters live; apply() must be safe under concurrent writers"""
+
+    @abstractmethod
+    async def apply(self, changes: Dict[str, Counter]) -> None:
+        ...
+
+    @abstractmethod
+    async def counters(self) -> Dict[str, Counter]:
+        ...
+
+    @abstractmethod
+    async def replace(self, counters: Dict[str, Counter]) -> None:
+        """Swap in freshly rebuilt counters"""
+        ...
+
+    async def record(self, previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> None:
+        """Project change listener: apply the counter difference of one write"""
+        changes = delta(previous, current)
+        if changes:
+            await self.apply(changes)
+
+
+class InMemoryAnalyticsStore(AnalyticsStore):
+    def __init__(self):
+        self._counters: Dict[str, Counter] = {}
+
+    async def apply(self, changes: Dict[str, Counter]) -> None:
+        for key, (count, cost) in changes.items():
+            old_count, old_cost = self._counters.get(key, (0, 0.0))
+            self._counters[key] = (old_count + count, old_cost + cost)
+
+    async def counters(self) -> Dict[str, Counter]:
+        return dict(self._counters)
+
+    async def replace(self, counters: Dict[str, Counter]) -> None:
+        self._counters = dict(counters)
+
+
+def _mongo_group(key_expression: Any, prefix: str) -> list:
+    return [
+        {"$group": {"_id": key_expression, "count": {"$sum": 1}, "cost": {"$sum": {"$ifNull": ["$estimated_cost", 0]}}}},
+        {"$project": {"_id": {"$concat": [prefix, {"$toString": "$_id"}]}, "count": 1, "cost": 1}},
+    ]
+
+
+# Rebuilds every counter in one pass over the projects collection, except the days of
+# legacy string created_at values: $dateToString rejects strings, so rebuild() parses those
+MONGO_REBUILD_PIPELINE = [
+    {"$facet": {
+        "total": [
+            {"$group": {"_id": "total", "count": {"$sum": 1}, "cost": {"$sum": {"$ifNull": ["$estimated_cost", 0]}}}},
+        ],
+        "tier": _mongo_group({"$ifNull": ["$tier", UNKNOWN]}, "tier:"),
+        "category": _mongo_group({"$ifNull": ["$category", UNKNOWN]}, "category:"),
+        "status": _mongo_group({"$ifNull": ["$status", UNKNOWN]}, "status:"),
+        "day": [
+            {"$match": {"created_at": {"$not": {"$type": "string"}}}},
+        ] + _mongo_group(
+            {"$ifNull": [{"$dateToString": {"format": "%Y-%m-%d", "date": "$created_at"}}, UNKNOWN]}, "day:"
+        ),
+        "addon": [
+            {"$project": {"estimated_cost": 1, "addon": {"$setUnion": [{"$ifNull": ["$addons", []]}]}}},
+            {"$unwind": "$addon"},
+        ] + _mongo_group("$addon", "addon:"),
+    }},
+]
+
+
+class MongoAnalyticsStore(AnalyticsStore):
+    """One document per counter, updated with $inc upserts"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def apply(self, changes: Dict[str, Counter]) -> None:
+        from pymongo import UpdateOne
+        await self.collection.bulk_write([
+            UpdateOne({"_id": key}, {"$inc": {"count": count, "cost": cost}}, upsert=True)
+            for key, (count, cost) in changes.items()
+        ], ordered=False)
+
+    async def counters(self) -> Dict[str, Counter]:
+        return {doc['_id']: (doc['count'], doc['cost']) async for doc in self.collection.find({})}
+
+    async def replace(self, counters: Dict[str, Counter]) -> None:
+        from pymongo import ReplaceOne
+        # Overwrite in place, then drop keys that no longer exist, so readers never see an empty set
+        if counters:
+            await self.collection.bulk_write([
+                ReplaceOne({"_id": key}, {"count": count, "cost": cost}, upsert=True)
+                for key, (count, cost) in counters.items()
+            ], ordered=False)
+        await self.collection.delete_many({"_id": {"$nin": list(counters)}})
+
+    async def rebuild(self, projects_collection) -> Dict[str, Counter]:
+        """Recompute all counters with one aggregation over the projects collection and store them"""
+        result = (await projects_collection.aggregate(MONGO_REBUILD_PIPELINE, allowDiskUse=True).to_list(1))[0]
+        counters = {row['_id']: (row['count'], float(row['cost'])) for rows in result.values() for row in rows}
+        legacy = projects_collection.find({"created_at": {"$type": "string"}}, {"created_at": 1, "estimated_cost": 1})
+        async for doc in legacy:
+            key = f"day:{_day(doc['created_at'])}"
+            count, cost = counters.get(key, (0, 0.0))
+            counters[key] = (count + 1, cost + float(doc.get('estimated_cost') or 0))
+        await self.replace(counters)
+        return counters
+
+
+ANALYTICS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS analytics_counters (
+    key TEXT PRIMARY KEY,
+    count INTEGER NOT NULL DEFAULT 0,
+    cost REAL NOT NULL DEFAULT 0
+);
+"""
+
+
+class SQLiteAnalyticsStore(AnalyticsStore):
+    """Counters in an analytics_counters table next to the projects"""
+
+    def __init__(self, database):
+        self.database = database
+
+    async def initialize(self) -> None:
+        await self.database.run(lambda conn: conn.executescript(ANALYTICS_SCHEMA))
+
+    async def apply(self, changes: Dict[str, Counter]) -> None:
+        rows = [(key, count, cost) for key, (count, cost) in changes.items()]
+
+        def upsert(conn: sqlite3.Connection) -> None:
+            conn.executemany(
+                "INSERT INTO analytics_counters (key, count, cost) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET count = count + excluded.count, cost = cost + excluded.cost",
+                rows
+            )
+        await self.database.transaction(upsert)
+
+    async def counters(self) -> Dict[str, Counter]:
+        def query(conn: sqlite3.Connection) -> Dict[str, Counter]:
+            return {row[0]: (row[1], row[2]) for row in conn.execute("SELECT key, count, cost FROM analytics_counters")}
+        return await self.database.run(query)
+
+    async def replace(self, counters: Dict[str, Counter]) -> None:
+        rows = [(key, count, cost) for key, (count, cost) in counters.items()]
+
+        def swap(conn: sqlite3.Connection) -> None:
+            conn.execute("DELETE FROM analytics_counters")
+            conn.executemany("INSERT INTO analytics_counters (key, count, cost) VALUES (?, ?, ?)", rows)
+        await self.database.transaction(swap)
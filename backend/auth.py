@@ -0,0 +1,71 @@
+from collections import OrderedDict
+from typing import List, Optional, Dict, Any, Tuple
+import hashlib
+import time
+
+import jwt
+
+
+class InvalidTokenError(Exception):
+    """Raised when a bearer token fails verification"""
+
+
+class TokenVerifier:
+    """Verifies JWTs and caches the verified claims.
+
+    Claims are cached in a bounded LRU keyed by a SHA-256 of the token (the
+    raw token is never kept) until the token's exp, capped at
+    max_cache_seconds, so a client that resends the same token skips
+    signature verification.
+    """
+
+    def __init__(self, secret: str, algorithms: Optional[List[str]] = None,
+                 audience: Optional[str] = None, cache_size: int = 4096,
+                 max_cache_seconds: float = 300, leeway: float = 0):
+        self.secret = secret
+        self.algorithms = algorithms or ["HS256"]
+        self.audience = audience
+        self.cache_size = cache_size
+        self.max_cache_seconds = max_cache_seconds
+        self.leeway = leeway
+        self._cache: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+
+    def _decode(self, token: str) -> Dict[str, Any]:
+        if not self.secret:
+            raise InvalidTokenError("No JWT secret configured")
+        try:
+            return jwt.decode(
+                token,
+                self.secret,
+                algorithms=self.algorithms,
+                audience=self.audience,
+                leeway=self.leeway,
+                options={"verify_aud": self.audience is not None}
+            )
+        except jwt.PyJWTError as e:
+            raise InvalidTokenError(str(e))
+
+    def verify(self, token: str) -> Dict[str, Any]:
+        """Return the token's verified claims, raising InvalidTokenError otherwise"""
+        key = hashlib.sha256(token.encode()).hexdigest()
+        now = time.time()
+
+        entry = self._cache.get(key)
+        if entry is not None:
+            expires_at, claims = entry
+            if now < expires_at:
+                self._cache.move_to_end(key)
+                return claims
+            del self._cache[key]
+
+        claims = self._decode(token)
+        expires_at = now + self.max_cache_seconds
+        if 'exp' in claims:
+            expires_at = min(expires_at, float(claims['exp']) + self.leeway)
+        self._cache[key] = (expires_at, claims)
+        while len(self._cache) > self.cache_size:
+            self._cache.popitem(last=False)
+        return claims
+
+    def clear(self) -> None:
+        self._cache.clear()
@@ -0,0 +1,184 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, AsyncIterator
+import asyncio
+import hashlib
+import logging
+import os
+import re
+import time
+
+logger = logging.getLogger(__name__)
+
+_DIGEST_RE = re.compile(r"^[0-9a-f]{64}$")
+
+
+def content_digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+def is_digest(value: str) -> bool:
+    return bool(_DIGEST_RE.match(value))
+
+
+class BlobStore(ABC):
+    """Content-addressed blob storage: a blob's key is the SHA-256 of its bytes.
+
+    Storing content that is already present is a no-op, so identical
+    files shared by many scaffolds take up space once. Stores may drop
+    blobs that haven't been stored or read for a while, so callers must
+    treat a missing blob as expired.
+    """
+
+    @abstractmethod
+    async def put(self, data: bytes) -> str:
+        """Store data if new and return its digest"""
+        ...
+
+    @abstractmethod
+    async def exists(self, digest: str) -> bool:
+        ...
+
+    @abstractmethod
+    def read(self, digest: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        """Yield a blob's bytes in pieces; KeyError if it isn't stored"""
+        ...
+
+    async def get(self, digest: str) -> bytes:
+        return b"".join([piece async for piece in self.read(digest)])
+
+
+class InMemoryBlobStore(BlobStore):
+    """Blobs in this process, least recently stored or read dropped beyond max_bytes in total"""
+
+    def __init__(self, max_bytes: int = 256 * 1024 * 1024):
+        self.max_bytes = max_bytes
+        self._blobs: "OrderedDict[str, bytes]" = OrderedDict()
+        self._bytes = 0
+        self.evictions = 0
+
+    async def put(self, data: bytes) -> str:
+        digest = content_digest(data)
+        if digest not in self._blobs:
+            self._blobs[digest] = data
+            self._bytes += len(data)
+        self._blobs.move_to_end(digest)
+        # The newest blob always stays, even if it alone exceeds the bound
+        while self._bytes > self.max_bytes and len(self._blobs) > 1:
+            _, evicted = self._blobs.popitem(last=False)
+            self._bytes -= len(evicted)
+            self.evictions += 1
+        return digest
+
+    async def exists(self, digest: str) -> bool:
+        return digest in self._blobs
+
+    async def read(self, digest: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        data = self._blobs[digest]
+        self._blobs.move_to_end(digest)
+        for offset in range(0, len(data), chunk_size):
+            yield data[offset:offset + chunk_size]
+
+    def stats(self) -> Dict[str, int]:
+        return {"blobs": len(self._blobs), "bytes": self._bytes, "evictions": self.evictions}
+
+
+class FileBlobStore(BlobStore):
+    """One file per blob under root/ab/cdef..., shared by every worker on the host.
+
+    Storing or reading a blob refreshes its modification time, and blobs
+    untouched for max_age_seconds are deleted by prune(), which runs in
+    the background every prune_every puts. None keeps blobs forever.
+    """
+
+    prune_every = 256
+
+    def __init__(self, root: str, max_age_seconds: Optional[float] = 7 * 24 * 3600):
+        self.root = Path(root)
+        self.root.mkdir(parents=True, exist_ok=True)
+        self.max_age_seconds = max_age_seconds
+        self._puts = 0
+        self._prune_task: Optional[asyncio.Task] = None
+
+    def _path(self, digest: str) -> Path:
+        if not is_digest(digest):
+            raise KeyError(digest)
+        return self.root / digest[:2] / digest[2:]
+
+    @staticmethod
+    def _touch(path: Path) -> bool:
+        try:
+            os.utime(path)
+            return True
+        except FileNotFoundError:
+            return False
+
+    def _write(self, digest: str, data: bytes) -> None:
+        path = self._path(digest)
+        if self._touch(path):
+            return
+        path.parent.mkdir(exist_ok=True)
+        # Unique temp name then atomic rename: concurrent writers of one blob both succeed
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.{id(data)}.tmp")
+        with open(tmp_path, 'wb') as f:
+            f.write(data)
+        tmp_path.replace(path)
+
+    async def put(self, data: bytes) -> str:
+        digest = content_digest(data)
+        await asyncio.to_thread(self._write, digest, data)
+        self._puts += 1
+        if self.max_age_seconds is not None and self._puts % self.prune_every == 0 \
+                and (self._prune_task is None or self._prune_task.done()):
+            self._prune_task = asyncio.ensure_future(asyncio.to_thread(self.prune))
+        return digest
+
+    async def exists(self, digest: str) -> bool:
+        try:
+            path = self._path(digest)
+        except KeyError:
+            return False
+        return await asyncio.to_thread(path.exists)
+
+    def _open(self, digest: str):
+        path = self._path(digest)
+        f = open(path, 'rb')
+        self._touch(path)
+        return f
+
+    async def read(self, digest: str, chunk_size: int = 64 * 1024) -> AsyncIterator[bytes]:
+        try:
+            f = await asyncio.to_thread(self._open, digest)
+        except FileNotFoundError:
+            raise KeyError(digest)
+        try:
+            while True:
+                piece = await asyncio.to_thread(f.read, chunk_size)
+                if not piece:
+                    break
+                yield piece
+        finally:
+            f.close()
+
+    def prune(self, now: Optional[float] = None) -> int:
+        """Delete blobs (and abandoned temp files) untouched for max_age_seconds; returns how many"""
+        if self.max_age_seconds is None:
+            return 0
+        cutoff = (now if now is not None else time.time()) - self.max_age_seconds
+        removed = 0
+        for path in self.root.glob('??/*'):
+            try:
+                if path.stat().st_mtime < cutoff:
+                    path.unlink()
+                    removed += 1
+            except FileNotFoundError:
+                # Pruned by another worker, or a temp file renamed into place meanwhile
+                continue
+        if removed:
+            logger.info(f"Pruned {removed} scaffold blobs older than {self.max_age_seconds:.0f}s")
+        return removed
+
+    def stats(self) -> Dict[str, int]:
+        files = [p for p in self.root.glob('??/*') if not p.name.endswith('.tmp')]
+        return {"blobs": len(files), "bytes": sum(p.stat().st_size for p in files)}
@@ -0,0 +1,118 @@
+from typing import List, Optional, Dict, Any, Callable, Awaitable
+import asyncio
+import hashlib
+import time
+
+
+def make_etag(body: bytes) -> str:
+    """Strong ETag derived from the exact response bytes"""
+    return '"' + hashlib.sha256(body).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """Check an If-None-Match header against an ETag (weak comparison, per RFC 9110)"""
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(','):
+        candidate = candidate.strip()
+        if candidate == '*':
+            return True
+        if candidate.startswith('W/'):
+            candidate = candidate[2:]
+        if candidate == etag:
+            return True
+    return False
+
+
+class CatalogSnapshot:
+    """Pre-serialized template catalog at one version, with its documents and optional search index"""
+
+    def __init__(self, version: int, list_body: bytes, item_bodies: Dict[str, bytes],
+                 templates: Optional[List[Dict[str, Any]]] = None, index: Any = None,
+                 source_version: Any = None):
+        self.version = version
+        self.source_version = source_version
+        self.templates = templates or []
+        self.index = index
+        self.list_body = list_body
+        self.list_etag = make_etag(list_body)
+        self.item_bodies = item_bodies
+        self.item_etags = {item_id: make_etag(body) for item_id, body in item_bodies.items()}
+        self.loaded_at = time.monotonic()
+
+
+class TemplateCatalogCache:
+    """In-process versioned cache of the template catalog.
+
+    The whole catalog is loaded and serialized once per version; invalidate()
+    bumps the version so the next read rebuilds it. Other workers' writes
+    don't call this process's invalidate(): if load_version is given (a
+    cheap read of the store's own write counter), it is compared with the
+    snapshot's at most every check_interval seconds and a change triggers a
+    rebuild. Otherwise, and for writes that bypass the API, the TTL bounds
+    staleness.
+    """
+
+    def __init__(self, load: Callable[[], Awaitable[List[Dict[str, Any]]]],
+                 serialize_list: Callable[[List[Dict[str, Any]]], bytes],
+                 serialize_item: Callable[[Dict[str, Any]], bytes],
+                 ttl_seconds: float = 300,
+                 build_index: Optional[Callable[[List[Dict[str, Any]]], Any]] = None,
+                 load_version: Optional[Callable[[], Awaitable[Any]]] = None,
+                 check_interval: float = 1.0):
+        self._load = load
+        self._serialize_list = serialize_list
+        self._serialize_item = serialize_item
+        self._build_index = build_index
+        self._load_version = load_version
+        self.ttl_seconds = ttl_seconds
+        self.check_interval = check_interval
+        self.version = 0
+        self._snapshot: Optional[CatalogSnapshot] = None
+        self._checked_at = 0.0
+        self._lock = asyncio.Lock()
+
+    def invalidate(self) -> None:
+        self.version += 1
+        self._snapshot = None
+
+    def _fresh(self, snapshot: Optional[CatalogSnapshot]) -> bool:
+        return (
+            snapshot is not None
+            and snapshot.version == self.version
+            and time.monotonic() - snapshot.loaded_at < self.ttl_seconds
+        )
+
+    async def _source_changed(self, snapshot: CatalogSnapshot) -> bool:
+        """Whether the store's version moved past the snapshot's; checked at most every check_interval"""
+        now = time.monotonic()
+        if self._load_version is None or now - self._checked_at < self.check_interval:
+            return False
+        self._checked_at = now
+        return await self._load_version() != snapshot.source_version
+
+    async def snapshot(self) -> CatalogSnapshot:
+        current = self._snapshot
+        if self._fresh(current) and not await self._source_changed(current):
+            return current
+        async with self._lock:
+            # Another request may have rebuilt it while we waited
+            if self._snapshot is not current and self._fresh(self._snapshot):
+                return self._snapshot
+            version = self.version
+            # Read before loading, so a write during the load shows up as a change next time
+            self._checked_at = time.monotonic()
+            source_version = await self._load_version() if self._load_version else None
+            templates = await self._load()
+            snapshot = CatalogSnapshot(
+                version,
+                self._serialize_list(templates),
+                {t['id']: self._serialize_item(t) for t in templates},
+                templates,
+                self._build_index(templates) if self._build_index else None,
+                source_version,
+            )
+            # Don't publish a snapshot that an invalidate() raced past
+            if version == self.version:
+                self._snapshot = snapshot
+            return snapshot
@@ -0,0 +1,322 @@
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import List, Optional, Dict, Any, Callable, Awaitable, Set, AsyncIterator
+import asyncio
+import logging
+import uuid
+
+logger = logging.getLogger(__name__)
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+FINISHED_STATES = {JOB_COMPLETED, JOB_FAILED}
+UNFINISHED_STATES = [JOB_QUEUED, JOB_RUNNING]
+
+JobHandler = Callable[[Dict[str, Any]], Awaitable[Any]]
+
+
+class QueueFullError(Exception):
+    """Raised when a job is submitted while the queue is at capacity"""
+
+
+class JobStore(ABC):
+    """Persistence for job documents"""
+
+    @abstractmethod
+    async def create(self, job: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def renew(self, job_ids: List[str], lease_expires_at: datetime) -> None:
+        """Extend the lease of unfinished jobs a queue still holds"""
+        ...
+
+    @abstractmethod
+    async def claim_expired(self, now: datetime, lease_expires_at: datetime) -> Optional[Dict[str, Any]]:
+        """Atomically take over one unfinished job whose lease ran out (or never had one), or None"""
+        ...
+
+
+class InMemoryJobStore(JobStore):
+    """Job store that keeps at most max_jobs documents, dropping the oldest first"""
+
+    def __init__(self, max_jobs: int = 1000):
+        self.max_jobs = max_jobs
+        self._jobs: "OrderedDict[str, Dict[str, Any]]" = OrderedDict()
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        self._jobs[job['id']] = dict(job)
+        while len(self._jobs) > self.max_jobs:
+            self._jobs.popitem(last=False)
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        job = self._jobs.get(job_id)
+        if job is not None:
+            job.update(fields)
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        job = self._jobs.get(job_id)
+        return dict(job) if job is not None else None
+
+    async def renew(self, job_ids: List[str], lease_expires_at: datetime) -> None:
+        for job_id in job_ids:
+            job = self._jobs.get(job_id)
+            if job is not None and job['status'] in UNFINISHED_STATES:
+                job['lease_expires_at'] = lease_expires_at
+
+    async def claim_expired(self, now: datetime, lease_expires_at: datetime) -> Optional[Dict[str, Any]]:
+        for job in self._jobs.values():
+            lease = job.get('lease_expires_at')
+            if job['status'] in UNFINISHED_STATES and (lease is None or lease < now):
+                job['lease_expires_at'] = lease_expires_at
+                return dict(job)
+        return None
+
+
+class MongoJobStore(JobStore):
+    """Job store backed by a Motor collection, shared by every worker.
+
+    Finished jobs carry an expires_at for the TTL index in MONGO_INDEXES.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def create(self, job: Dict[str, Any]) -> None:
+        await self.collection.insert_one(dict(job))
+
+    async def update(self, job_id: str, fields: Dict[str, Any]) -> None:
+        await self.collection.update_one({"id": job_id}, {"$set": fields})
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": job_id}, {"_id": 0})
+
+    async def renew(self, job_ids: List[str], lease_expires_at: datetime) -> None:
+        await self.collection.update_many(
+            {"id": {"$in": job_ids}, "status": {"$in": UNFINISHED_STATES}},
+            {"$set": {"lease_expires_at": lease_expires_at}}
+        )
+
+    async def claim_expired(self, now: datetime, lease_expires_at: datetime) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one_and_update(
+            {"status": {"$in": UNFINISHED_STATES},
+             # None also matches jobs created before leases existed
+             "$or": [{"lease_expires_at": {"$lt": now}}, {"lease_expires_at": None}]},
+            {"$set": {"lease_expires_at": lease_expires_at}},
+            projection={"_id": 0}
+        )
+
+
+class JobQueue:
+    """Bounded queue of background jobs run by a fixed pool of asyncio workers.
+
+    Handlers are registered per job kind and may be any coroutine function
+    taking the job payload, which lets tests substitute stubs for the LLM.
+    Subscribers receive every status change of a job as it happens.
+
+    Every unfinished job is leased to the queue holding it, which renews
+    the lease while the job waits or runs. A job whose lease runs out was
+    held by a worker that died: any queue sharing the store takes it over,
+    queueing it again if it never started and failing it if it was
+    interrupted. A graceful stop fails the jobs it interrupts and hands its
+    still-queued ones back at once.
+    """
+
+    def __init__(self, store: JobStore, concurrency: int = 4, max_queued: int = 100,
+                 lease_seconds: float = 60, retention_seconds: Optional[float] = None):
+        self.store = store
+        self.concurrency = concurrency
+        self.lease_seconds = lease_seconds
+        self.retention_seconds = retention_seconds
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_queued)
+        # Slots taken by submits still writing their job to the store
+        self._reserved = 0
+        self._held: Set[str] = set()
+        self._handlers: Dict[str, JobHandler] = {}
+        self._workers: List[asyncio.Task] = []
+        self._leases: Optional[asyncio.Task] = None
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = {}
+
+    def register(self, kind: str, handler: JobHandler) -> None:
+        self._handlers[kind] = handler
+
+    def start(self) -> None:
+        """Start the worker pool (idempotent)"""
+        if self._workers:
+            return
+        self._workers = [asyncio.create_task(self._worker()) for _ in range(self.concurrency)]
+        self._leases = asyncio.create_task(self._maintain_leases())
+
+    async def stop(self) -> None:
+        tasks = self._workers + ([self._leases] if self._leases is not None else [])
+        for task in tasks:
+            task.cancel()
+        await asyncio.gather(*tasks, return_exceptions=True)
+        self._workers = []
+        self._leases = None
+        queued = []
+        while not self._queue.empty():
+            queued.append(self._queue.get_nowait())
+            self._queue.task_done()
+        self._held.difference_update(queued)
+        if queued:
+            try:
+                await self.store.renew(queued, datetime.now(timezone.utc))
+            except Exception as e:
+                logger.error(f"Could not hand back {len(queued)} queued jobs: {e}")
+
+    def _has_room(self) -> bool:
+        return self._queue.qsize() + self._reserved < self._queue.maxsize
+
+    def _lease_until(self, now: datetime) -> datetime:
+        return now + timedelta(seconds=self.lease_seconds)
+
+    async def submit(self, kind: str, payload: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+        if kind not in self._handlers:
+            raise ValueError(f"No handler registered for job kind '{kind}'")
+        # Take the slot before awaiting the store, so concurrent submits can't overfill the queue
+        if not self._has_room():
+            raise QueueFullError("Job queue is full")
+        self.start()
+
+        now = datetime.now(timezone.utc)
+        job = {
+            "id": str(uuid.uuid4()),
+            "kind": kind,
+            "user_id": user_id,
+            "status": JOB_QUEUED,
+            "payload": payload,
+            "result": None,
+            "error": None,
+            "created_at": now,
+            "updated_at": now,
+            "lease_expires_at": self._lease_until(now),
+        }
+        self._reserved += 1
+        try:
+            await self.store.create(job)
+        finally:
+            self._reserved -= 1
+        self._held.add(job['id'])
+        self._queue.put_nowait(job['id'])
+        return job
+
+    async def get(self, job_id: str) -> Optional[Dict[str, Any]]:
+        return await self.store.get(job_id)
+
+    async def _set_status(self, job_id: str, status: str, **fields) -> None:
+        now = datetime.now(timezone.utc)
+        fields.update(status=status, updated_at=now)
+        if status in FINISHED_STATES and self.retention_seconds is not None:
+            fields['expires_at'] = now + timedelta(seconds=self.retention_seconds)
+        await self.store.update(job_id, fields)
+        event = dict(fields, id=job_id)
+        for subscriber in self._subscribers.get(job_id, ()):
+            subscriber.put_nowait(event)
+
+    async def _run(self, job_id: str) -> None:
+        job = await self.store.get(job_id)
+        if job is None or job['status'] in FINISHED_STATES:
+            return
+        await self._set_status(job_id, JOB_RUNNING)
+        try:
+            result = await self._handlers[job['kind']](job['payload'])
+        except asyncio.CancelledError:
+            await self._set_status(job_id, JOB_FAILED, error="Interrupted by server shutdown")
+            raise
+        except Exception as e:
+            logger.error(f"Job {job_id} ({job['kind']}) failed: {e}")
+            await self._set_status(job_id, JOB_FAILED, error=str(e))
+        else:
+            await self._set_status(job_id, JOB_COMPLETED, result=result)
+
+    async def _worker(self) -> None:
+        while True:
+            job_id = await self._queue.get()
+            try:
+                await self._run(job_id)
+            except Exception as e:
+                logger.error(f"Job worker error on {job_id}: {e}")
+            finally:
+                self._held.discard(job_id)
+                self._queue.task_done()
+
+    async def _take_over(self, job: Dict[str, Any]) -> None:
+        if job['status'] == JOB_RUNNING:
+            logger.warning(f"Job {job['id']} ({job['kind']}) was interrupted by a stopped worker")
+            await self._set_status(job['id'], JOB_FAILED, error="Interrupted: the worker running it stopped")
+        else:
+            self._held.add(job['id'])
+            self._queue.put_nowait(job['id'])
+
+    async def recover(self) -> int:
+        """Take over jobs whose lease ran out, as far as the queue has room; returns how many"""
+        recovered = 0
+        while self._has_room():
+            now = datetime.now(timezone.utc)
+            job = await self.store.claim_expired(now, self._lease_until(now))
+            if job is None:
+                break
+            await self._take_over(job)
+            recovered += 1
+        return recovered
+
+    async def _maintain_leases(self) -> None:
+        while True:
+            try:
+                if self._held:
+                    await self.store.renew(list(self._held), self._lease_until(datetime.now(timezone.utc)))
+                recovered = await self.recover()
+                if recovered:
+                    logger.info(f"Took over {recovered} jobs from stopped workers")
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Job lease maintenance failed: {e}")
+            await asyncio.sleep(self.lease_seconds / 3)
+
+    async def subscribe(self, job_id: str, poll_interval: float = 10) -> AsyncIterator[Optional[Dict[str, Any]]]:
+        """Yield the current job state, then each change until it finishes.
+
+        Changes made by this queue arrive at once. A job held by another
+        worker is polled from the store every poll_interval seconds, and a
+        poll that finds nothing new yields None (time for a heartbeat).
+        """
+        updates: asyncio.Queue = asyncio.Queue()
+        self._subscribers.setdefault(job_id, set()).add(updates)
+        try:
+            # Registered before reading, so no transition can slip between the two
+            job = await self.store.get(job_id)
+            if job is None:
+                return
+            yield job
+            status = job['status']
+            while status not in FINISHED_STATES:
+                try:
+                    event = await asyncio.wait_for(updates.get(), timeout=poll_interval)
+                except asyncio.TimeoutError:
+                    event = await self.store.get(job_id)
+                    if event is None:
+                        return
+                    if event['status'] == status:
+                        yield None
+                        continue
+                status = event['status']
+                yield event
+        finally:
+            subscribers = self._subscribers.get(job_id)
+            if subscribers is not None:
+                subscribers.discard(updates)
+                if not subscribers:
+                    del self._subscribers[job_id]
@@ -0,0 +1,163 @@
+from typing import Optional, Dict, Any, Callable, Awaitable
+import asyncio
+import logging
+import random
+import time
+
+logger = logging.getLogger(__name__)
+
+# (system_message, prompt) -> model response
+LLMCall = Callable[[str, str], Awaitable[Any]]
+
+CIRCUIT_CLOSED = "closed"
+CIRCUIT_OPEN = "open"
+CIRCUIT_HALF_OPEN = "half_open"
+
+
+class CircuitOpenError(Exception):
+    """Raised without calling the provider while the circuit breaker is open"""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"LLM provider unavailable, retry in {retry_after:.0f}s")
+        self.retry_after = retry_after
+
+
+class LLMBusyError(Exception):
+    """Raised when no concurrency slot frees up within the call timeout"""
+
+
+class CircuitBreaker:
+    """Consecutive-failure circuit breaker.
+
+    Opens after failure_threshold failures in a row, rejects calls for
+    reset_timeout seconds, then lets a single probe through (half-open);
+    the probe's outcome closes or re-opens the circuit.
+    """
+
+    def __init__(self, failure_threshold: int = 5, reset_timeout: float = 30):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self.opened_at = 0.0
+        self._probe_in_flight = False
+
+    def retry_after(self) -> float:
+        return max(0.0, self.opened_at + self.reset_timeout - time.monotonic())
+
+    def before_call(self) -> None:
+        """Raise CircuitOpenError if a call may not proceed right now"""
+        if self.state == CIRCUIT_OPEN:
+            if self.retry_after() > 0:
+                raise CircuitOpenError(self.retry_after())
+            self.state = CIRCUIT_HALF_OPEN
+        if self.state == CIRCUIT_HALF_OPEN:
+            if self._probe_in_flight:
+                raise CircuitOpenError(self.reset_timeout)
+            self._probe_in_flight = True
+
+    def abandon(self) -> None:
+        """Forget a call that was cancelled before it had an outcome"""
+        self._probe_in_flight = False
+
+    def record_success(self) -> None:
+        self.state = CIRCUIT_CLOSED
+        self.consecutive_failures = 0
+        self._probe_in_flight = False
+
+    def record_failure(self) -> None:
+        self.consecutive_failures += 1
+        self._probe_in_flight = False
+        if self.state == CIRCUIT_HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+            if self.state != CIRCUIT_OPEN:
+                logger.warning(f"LLM circuit opened after {self.consecutive_failures} consecutive failures")
+            self.state = CIRCUIT_OPEN
+            self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    """Shared entry point for every LLM call.
+
+    Caps concurrent upstream calls with a semaphore, bounds each attempt
+    with a timeout, retries with jittered exponential backoff, and fails
+    fast through a circuit breaker while the provider is unhealthy.
+    """
+
+    def __init__(self, call: LLMCall, max_concurrency: int = 8, timeout: float = 60,
+                 retries: int = 2, backoff_base: float = 0.5,
+                 breaker: Optional[CircuitBreaker] = None):
+        self.call = call
+        self.max_concurrency = max_concurrency
+        self.timeout = timeout
+        self.retries = retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+        self.in_flight = 0
+        self.waiting = 0
+        self.stats = {"calls": 0, "successes": 0, "failures": 0, "timeouts": 0, "rejected": 0}
+
+    async def _attempt(self, system_message: str, prompt: str) -> Any:
+        self.waiting += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), timeout=self.timeout)
+        except asyncio.TimeoutError:
+            raise LLMBusyError(f"No LLM slot free within {self.timeout}s")
+        finally:
+            self.waiting -= 1
+        try:
+            # Checked once a slot is held so a half-open probe can't be stranded in the queue
+            self.breaker.before_call()
+            self.in_flight += 1
+            try:
+                return await asyncio.wait_for(self.call(system_message, prompt), timeout=self.timeout)
+            except asyncio.TimeoutError:
+                self.stats["timeouts"] += 1
+                raise TimeoutError(f"LLM call timed out after {self.timeout}s")
+            except asyncio.CancelledError:
+                self.breaker.abandon()
+                raise
+            finally:
+                self.in_flight -= 1
+        finally:
+            self._semaphore.release()
+
+    async def complete(self, system_message: str, prompt: str) -> Any:
+        """Send one prompt, raising CircuitOpenError, LLMBusyError or the last provider failure"""
+        self.stats["calls"] += 1
+        last_error: Optional[Exception] = None
+        for attempt in range(self.retries + 1):
+            try:
+                response = await self._attempt(system_message, prompt)
+            except (CircuitOpenError, LLMBusyError):
+                self.stats["rejected"] += 1
+                raise
+            except Exception as e:
+                last_error = e
+                self.breaker.record_failure()
+                logger.warning(f"LLM call attempt {attempt + 1} failed: {e}")
+                if attempt < self.retries:
+                    await asyncio.sleep(self.backoff_base * (2 ** attempt) * random.uniform(0.5, 1.5))
+                continue
+            self.breaker.record_success()
+            self.stats["successes"] += 1
+            return response
+        self.stats["failures"] += 1
+        raise last_error
+
+    @property
+    def load(self) -> int:
+        """Calls in progress plus calls queued for a slot"""
+        return self.in_flight + self.waiting
+
+    def state(self) -> Dict[str, Any]:
+        return {
+            "circuit": self.breaker.state,
+            "consecutive_failures": self.breaker.consecutive_failures,
+            "retry_after": round(self.breaker.retry_after(), 1) if self.breaker.state == CIRCUIT_OPEN else 0,
+            "in_flight": self.in_flight,
+            "waiting": self.waiting,
+            "max_concurrency": self.max_concurrency,
+            "timeout": self.timeout,
+            **self.stats,
+        }
@@ -0,0 +1,91 @@
+"""Convert ISO-string timestamps to native BSON dates.
+
+Older documents store created_at/updated_at as ISO strings. This rewrites
+them in batches with bulk_write, touching only fields that are still
+strings, so it is safe to re-run and to run while the API is serving.
+
+Usage:
+    python migrate_datetimes.py [--batch-size 1000] [--dry-run]
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List
+import argparse
+import logging
+import os
+
+from dotenv import load_dotenv
+from pymongo import MongoClient, UpdateOne
+
+from storage import DATETIME_FIELDS
+
+ROOT_DIR = Path(__file__).parent
+load_dotenv(ROOT_DIR / '.env')
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+def parse_timestamp(value: str) -> datetime:
+    parsed = datetime.fromisoformat(value)
+    # Naive strings were written from UTC datetimes
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+def migrate_collection(collection, fields: List[str], batch_size: int, dry_run: bool) -> int:
+    """Rewrite string timestamps in one collection, returning the number of documents changed"""
+    query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+    projection = {field: 1 for field in fields}
+    changed = 0
+    batch = []
+
+    def flush():
+        nonlocal changed
+        if not batch:
+            return
+        if not dry_run:
+            collection.bulk_write(batch, ordered=False)
+        changed += len(batch)
+        batch.clear()
+
+    for doc in collection.find(query, projection).batch_size(batch_size):
+        updates = {}
+        for field in fields:
+            value = doc.get(field)
+            if isinstance(value, str):
+                try:
+                    updates[field] = parse_timestamp(value)
+                except ValueError:
+                    logger.warning(f"{collection.name} {doc['_id']}: unparseable {field} {value!r}, skipped")
+        if updates:
+            # Filter on the string type too, so a concurrent rewrite isn't clobbered
+            batch.append(UpdateOne(
+                {"_id": doc["_id"], **{field: {"$type": "string"} for field in updates}},
+                {"$set": updates}
+            ))
+        if len(batch) >= batch_size:
+            flush()
+    flush()
+    return changed
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Convert ISO-string timestamps to BSON dates")
+    parser.add_argument("--batch-size", type=int, default=1000)
+    parser.add_argument("--dry-run", action="store_true", help="Count documents without writing")
+    args = parser.parse_args()
+
+    client = MongoClient(os.environ.get('MONGO_URL', 'mongodb://localhost:27017'))
+    db = client[os.environ.get('DB_NAME', 'seeforge_db')]
+    try:
+        for collection_name, fields in DATETIME_FIELDS.items():
+            changed = migrate_collection(db[collection_name], fields, args.batch_size, args.dry_run)
+            verb = "would update" if args.dry_run else "updated"
+            logger.info(f"{collection_name}: {verb} {changed} documents")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,188 @@
+from typing import List, Optional, Dict, Any, Union, Annotated
+import hashlib
+import json
+
+import numpy as np
+from pydantic import BaseModel, ConfigDict, Field
+
+DEFAULT_PRICE_TABLES = {
+    "base_prices": {
+        "Idea Spark": 1499,
+        "Starter": 3000,
+        "MVP Launch": 6000,
+        "Growth": 12000,
+        "AI Pro": 20000
+    },
+    "addon_prices": {
+        "Custom Domain Setup": 499,
+        "Logo + Branding Pack": 799,
+        "SEO Optimization": 999,
+        "AI Assistant Integration": 1499,
+        "Hosting Extension": 199,
+        "Maintenance Support": 999,
+        "Analytics Dashboard": 499,
+        "Auth": 0,
+        "Payments": 500,
+        "Admin Panel": 1500,
+        "Multi-language": 800,
+        "Chat Support": 1200,
+        "Data Migration": 2000
+    },
+    "default_tier": "Starter",
+    "default_base_price": 3000,
+    "student_discount": 0.15,
+    "currency": "INR"
+}
+
+
+Price = Annotated[Union[int, float], Field(ge=0)]
+
+
+class PriceTablesConfig(BaseModel):
+    """Shape of a price tables document (config file or Mongo), checked before it replaces the live tables"""
+    model_config = ConfigDict(extra="ignore")
+    base_prices: Dict[str, Price] = Field(min_length=1)
+    addon_prices: Dict[str, Price]
+    default_tier: str = "Starter"
+    default_base_price: Optional[Price] = None
+    student_discount: float = Field(0.15, ge=0, lt=1)
+    currency: str = Field("INR", min_length=1)
+    version: Optional[Union[str, int]] = None
+
+
+class PriceTables:
+    """Immutable, pre-indexed price tables at one version.
+
+    Raises pydantic.ValidationError (a ValueError) for malformed tables,
+    so a bad reload keeps the tables already in effect.
+    """
+
+    def __init__(self, tables: Dict[str, Any]):
+        config = PriceTablesConfig.model_validate(tables)
+        self.base_prices: Dict[str, int] = dict(config.base_prices)
+        self.addon_prices: Dict[str, int] = dict(config.addon_prices)
+        self.default_tier: str = config.default_tier
+        self.default_base_price = (
+            config.default_base_price if config.default_base_price is not None
+            else self.base_prices.get(self.default_tier, 0)
+        )
+        self.student_discount: float = config.student_discount
+        self.currency: str = config.currency
+        self.version: str = str(config.version or self._content_hash())
+
+        # Addons and features share one price list; column i of a selection matrix is item i
+        self.items: List[str] = list(self.addon_prices)
+        self.item_index = {name: i for i, name in enumerate(self.items)}
+        self.item_price_vector = np.array([self.addon_prices[name] for name in self.items])
+
+    def _content_hash(self) -> str:
+        canonical = json.dumps({
+            "base_prices": self.base_prices,
+            "addon_prices": self.addon_prices,
+            "default_tier": self.default_tier,
+            "default_base_price": self.default_base_price,
+            "student_discount": self.student_discount,
+            "currency": self.currency,
+        }, sort_keys=True)
+        return hashlib.sha256(canonical.encode()).hexdigest()[:12]
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "version": self.version,
+            "base_prices": self.base_prices,
+            "addon_prices": self.addon_prices,
+            "default_tier": self.default_tier,
+            "default_base_price": self.default_base_price,
+            "student_discount": self.student_discount,
+            "currency": self.currency,
+        }
+
+
+class PricingEngine:
+    """Prices project configurations against the currently loaded PriceTables.
+
+    Tables are built once and swapped atomically on reload, so in-flight
+    quotes always see one consistent version.
+    """
+
+    def __init__(self, tables: Optional[Dict[str, Any]] = None):
+        self.tables = PriceTables(tables or DEFAULT_PRICE_TABLES)
+
+    def load(self, tables: Dict[str, Any]) -> PriceTables:
+        self.tables = PriceTables(tables)
+        return self.tables
+
+    def load_file(self, path: str) -> PriceTables:
+        with open(path) as f:
+            return self.load(json.load(f))
+
+    async def load_mongo(self, collection) -> Optional[PriceTables]:
+        """Load the highest-versioned price document, if the collection has one"""
+        doc = await collection.find_one({}, {"_id": 0}, sort=[("version", -1)])
+        if not doc:
+            return None
+        return self.load(doc)
+
+    def quote(self, project_data: Dict[str, Any]) -> Dict[str, Any]:
+        """Price a single configuration"""
+        t = self.tables
+        base_cost = t.base_prices.get(project_data.get('tier', t.default_tier), t.default_base_price)
+        addons_cost = sum(t.addon_prices.get(addon, 0) for addon in project_data.get('addons') or [])
+        features_cost = sum(t.addon_prices.get(feature, 0) for feature in project_data.get('features') or [])
+
+        total = base_cost + addons_cost + features_cost
+        if project_data.get('is_student', False):
+            total = total * (1 - t.student_discount)
+
+        return {
+            "base_cost": base_cost,
+            "addons_cost": addons_cost,
+            "features_cost": features_cost,
+            "total_cost": round(total),
+            "currency": t.currency,
+            "pricing_version": t.version
+        }
+
+    def _selection_matrix(self, configs: List[Dict[str, Any]], key: str) -> np.ndarray:
+        """Count matrix (configs x items) of how often each priced item is selected"""
+        t = self.tables
+        rows, cols = [], []
+        for row, config in enumerate(configs):
+            for name in config.get(key) or []:
+                col = t.item_index.get(name)
+                if col is not None:
+                    rows.append(row)
+                    cols.append(col)
+        matrix = np.zeros((len(configs), len(t.items)), dtype=np.int64)
+        np.add.at(matrix, (rows, cols), 1)
+        return matrix
+
+    def quote_batch(self, configs: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+        """Price many configurations at once; results match quote() item for item"""
+        t = self.tables
+        if not configs:
+            return []
+
+        base = np.array([
+            t.base_prices.get(c.get('tier', t.default_tier), t.default_base_price) for c in configs
+        ])
+        addons = self._selection_matrix(configs, 'addons') @ t.item_price_vector
+        features = self._selection_matrix(configs, 'features') @ t.item_price_vector
+        discount = np.array([
+            (1 - t.student_discount) if c.get('is_student', False) else 1.0 for c in configs
+        ])
+        subtotal = base + addons + features
+        # Rounded half to even like quote()'s round(), whether or not prices are whole numbers
+        totals = np.rint(subtotal * discount).astype(np.int64)
+
+        return [
+            {
+                "base_cost": base[i].item(),
+                "addons_cost": addons[i].item(),
+                "features_cost": features[i].item(),
+                "total_cost": int(totals[i]),
+                "currency": t.currency,
+                "pricing_version": t.version
+            }
+            for i in range(len(configs))
+        ]
@@ -0,0 +1,175 @@
+"""Push notifications for project changes.
+
+ProjectEventBus is an in-process pub/sub keyed by project id. It is fed
+either by the project repository's change listener, which only sees this
+worker's writes (in-memory storage, or a single worker), or by a source
+that relays every worker's writes: MongoChangeStreamSource from a Mongo
+change stream, or sqlite_store.SQLiteChangeLogSource from the SQLite
+change log.
+
+Every event carries the whole project, so a subscriber that falls behind
+can skip to the newest state. Each subscriber has a small queue, and when
+it is full the oldest pending event is dropped. A slow client therefore
+never blocks a writer or grows memory.
+"""
+from typing import Optional, Dict, Any, Set
+import asyncio
+import logging
+
+logger = logging.getLogger(__name__)
+
+EVENT_CREATED = "created"
+EVENT_UPDATED = "updated"
+EVENT_DELETED = "deleted"
+
+
+class TooManySubscribersError(Exception):
+    """Raised when the bus is at its subscriber limit"""
+
+
+def change_event(previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    if previous is None:
+        kind = EVENT_CREATED
+    elif current is None:
+        kind = EVENT_DELETED
+    else:
+        kind = EVENT_UPDATED
+    doc = current if current is not None else previous
+    return {"type": kind, "project_id": doc['id'], "project": current}
+
+
+class Subscription:
+    """One subscriber's bounded queue of events for a project"""
+
+    def __init__(self, bus: "ProjectEventBus", project_id: str, max_pending: int):
+        self.bus = bus
+        self.project_id = project_id
+        self.dropped = 0
+        self._queue: asyncio.Queue = asyncio.Queue(maxsize=max_pending)
+
+    def _offer(self, event: Dict[str, Any]) -> None:
+        if self._queue.full():
+            # Events are full snapshots, so losing an older one loses nothing the newest doesn't carry
+            self._queue.get_nowait()
+            self.dropped += 1
+        self._queue.put_nowait(event)
+
+    async def get(self, timeout: float) -> Optional[Dict[str, Any]]:
+        """Next event, or None if none arrives within timeout (time for a heartbeat)"""
+        try:
+            return await asyncio.wait_for(self._queue.get(), timeout=timeout)
+        except asyncio.TimeoutError:
+            return None
+
+    def close(self) -> None:
+        self.bus._unsubscribe(self)
+
+    def __enter__(self) -> "Subscription":
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+class ProjectEventBus:
+    def __init__(self, max_subscribers: int = 10000, max_pending: int = 16):
+        self.max_subscribers = max_subscribers
+        self.max_pending = max_pending
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+        self._count = 0
+
+    @property
+    def subscriber_count(self) -> int:
+        return self._count
+
+    def subscribe(self, project_id: str) -> Subscription:
+        if self._count >= self.max_subscribers:
+            raise TooManySubscribersError(f"At most {self.max_subscribers} project subscriptions")
+        subscription = Subscription(self, project_id, self.max_pending)
+        self._subscribers.setdefault(project_id, set()).add(subscription)
+        self._count += 1
+        return subscription
+
+    def _unsubscribe(self, subscription: Subscription) -> None:
+        subscribers = self._subscribers.get(subscription.project_id)
+        if subscribers is None or subscription not in subscribers:
+            return
+        subscribers.discard(subscription)
+        self._count -= 1
+        if not subscribers:
+            del self._subscribers[subscription.project_id]
+
+    def publish_event(self, event: Dict[str, Any]) -> None:
+        for subscription in self._subscribers.get(event['project_id'], ()):
+            subscription._offer(event)
+
+    async def publish(self, previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> None:
+        """Project repository change listener"""
+        if self._subscribers:
+            self.publish_event(change_event(previous, current))
+
+
+class MongoChangeStreamSource:
+    """Relays project changes from a MongoDB change stream into a bus.
+
+    Needs a replica set or sharded cluster. Deletes can only be relayed
+    when the collection has changeStreamPreAndPostImages enabled
+    (MongoDB 6.0+), since the deleted document's id is only in its
+    pre-image. The stream resumes from the last seen token after errors.
+    """
+
+    def __init__(self, collection, bus: ProjectEventBus, retry_delay: float = 1.0, max_retry_delay: float = 30.0):
+        self.collection = collection
+        self.bus = bus
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._resume_token = None
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    def _relay(self, change: Dict[str, Any]) -> None:
+        operation = change['operationType']
+        current = change.get('fullDocument') if operation != 'delete' else None
+        previous = change.get('fullDocumentBeforeChange')
+        doc = current or previous
+        if doc is None or 'id' not in doc:
+            # An update whose document is already gone, or a delete without a pre-image
+            return
+        if operation == 'insert':
+            previous = None
+        elif operation != 'delete' and previous is None:
+            # Any non-None previous marks an update; the bus never reads it
+            previous = {}
+        self.bus.publish_event(change_event(previous, current))
+
+    async def _run(self) -> None:
+        delay = self.retry_delay
+        pipeline = [{"$match": {"operationType": {"$in": ["insert", "update", "replace", "delete"]}}}]
+        while True:
+            try:
+                async with self.collection.watch(
+                    pipeline,
+                    full_document='updateLookup',
+                    full_document_before_change='whenAvailable',
+                    resume_after=self._resume_token
+                ) as stream:
+                    logger.info("Project change stream connected")
+                    delay = self.retry_delay
+                    async for change in stream:
+                        self._resume_token = change['_id']
+                        self._relay(change)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Project change stream failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
@@ -0,0 +1,161 @@
+"""Token-bucket rate limiting.
+
+Each key (route class + caller identity) owns a bucket holding up to
+`requests` tokens, refilled continuously at requests/period per second;
+a request takes one token or is refused with the time until one is
+available. The in-process backend suits a single worker; the Mongo and
+SQLite backends share buckets between workers.
+"""
+from abc import ABC, abstractmethod
+from collections import OrderedDict
+from datetime import datetime, timezone, timedelta
+from typing import Optional, Tuple
+import sqlite3
+import time
+
+
+class RateLimit:
+    """Bucket capacity and refill period, parsed from "<requests>/<seconds>" """
+
+    def __init__(self, requests: int, period: float):
+        if requests <= 0 or period <= 0:
+            raise ValueError("rate limit requests and period must be positive")
+        self.requests = requests
+        self.period = period
+        self.rate = requests / period
+
+    @classmethod
+    def parse(cls, spec: Optional[str]) -> Optional["RateLimit"]:
+        """None for an empty or "0" spec, which disables the limit"""
+        if not spec or spec.strip() == "0":
+            return None
+        requests, _, period = spec.partition('/')
+        return cls(int(requests), float(period or 1))
+
+    def __repr__(self) -> str:
+        return f"RateLimit({self.requests}/{self.period:g}s)"
+
+
+def take(tokens: float, elapsed: float, limit: RateLimit, cost: float) -> Tuple[float, float]:
+    """Refill a bucket for `elapsed` seconds and try to take `cost` tokens.
+
+    Returns the new token count and 0, or the unchanged count and the
+    seconds until enough tokens will be available.
+    """
+    tokens = min(float(limit.requests), tokens + max(0.0, elapsed) * limit.rate)
+    if tokens >= cost:
+        return tokens - cost, 0.0
+    return tokens, (cost - tokens) / limit.rate
+
+
+class RateLimitBackend(ABC):
+    """Where bucket state lives"""
+
+    @abstractmethod
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        """Take cost tokens from key's bucket: 0 if allowed, else seconds to wait before retrying"""
+        ...
+
+
+class InMemoryRateLimitBackend(RateLimitBackend):
+    """Buckets in this process, least recently used dropped beyond max_keys.
+
+    A dropped bucket comes back full, so max_keys should comfortably exceed
+    the number of callers active within one refill period.
+    """
+
+    def __init__(self, max_keys: int = 100000):
+        self.max_keys = max_keys
+        self._buckets: "OrderedDict[str, Tuple[float, float]]" = OrderedDict()
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        now = time.monotonic()
+        tokens, updated_at = self._buckets.get(key, (float(limit.requests), now))
+        tokens, retry_after = take(tokens, now - updated_at, limit, cost)
+        self._buckets[key] = (tokens, now)
+        self._buckets.move_to_end(key)
+        while len(self._buckets) > self.max_keys:
+            self._buckets.popitem(last=False)
+        return retry_after
+
+
+class MongoRateLimitBackend(RateLimitBackend):
+    """One document per bucket, refilled and decremented atomically by a pipeline update.
+
+    Buckets carry an expires_at for the TTL index, so idle callers'
+    documents are removed once they would have refilled anyway.
+    """
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        from pymongo import ReturnDocument
+        now = time.time()
+        capacity = float(limit.requests)
+        refilled = {"$min": [capacity, {"$add": [
+            {"$ifNull": ["$tokens", capacity]},
+            {"$multiply": [{"$max": [0, {"$subtract": [now, {"$ifNull": ["$updated_at", now]}]}]}, limit.rate]},
+        ]}]}
+        allowed = {"$gte": ["$refilled", cost]}
+        bucket = await self.collection.find_one_and_update(
+            {"_id": key},
+            [
+                {"$set": {"refilled": refilled}},
+                {"$set": {
+                    "allowed": allowed,
+                    "tokens": {"$cond": [allowed, {"$subtract": ["$refilled", cost]}, "$refilled"]},
+                    "updated_at": now,
+                    "expires_at": datetime.fromtimestamp(now, timezone.utc) + timedelta(seconds=limit.period),
+                }},
+                {"$project": {"refilled": 0}},
+            ],
+            upsert=True,
+            return_document=ReturnDocument.AFTER
+        )
+        if bucket["allowed"]:
+            return 0.0
+        return (cost - bucket["tokens"]) / limit.rate
+
+
+RATE_LIMIT_SCHEMA = """
+CREATE TABLE IF NOT EXISTS rate_limits (
+    key TEXT PRIMARY KEY,
+    tokens REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """Buckets in the shared SQLite file, read and written in one IMMEDIATE transaction"""
+
+    # Every prune_every acquires, drop buckets idle for longer than any sensible refill period
+    prune_every = 1024
+    prune_idle_seconds = 24 * 3600
+
+    def __init__(self, database):
+        self.database = database
+        self._acquires = 0
+
+    async def initialize(self) -> None:
+        await self.database.run(lambda conn: conn.executescript(RATE_LIMIT_SCHEMA))
+
+    async def acquire(self, key: str, limit: RateLimit, cost: float = 1) -> float:
+        def acquire(conn: sqlite3.Connection) -> float:
+            now = time.time()
+            row = conn.execute("SELECT tokens, updated_at FROM rate_limits WHERE key = ?", (key,)).fetchone()
+            tokens, updated_at = row if row else (float(limit.requests), now)
+            tokens, retry_after = take(tokens, now - updated_at, limit, cost)
+            conn.execute(
+                "INSERT INTO rate_limits (key, tokens, updated_at) VALUES (?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET tokens = excluded.tokens, updated_at = excluded.updated_at",
+                (key, tokens, now)
+            )
+            return retry_after
+
+        self._acquires += 1
+        if self._acquires % self.prune_every == 0:
+            cutoff = time.time() - self.prune_idle_seconds
+            await self.database.run(lambda conn: conn.execute("DELETE FROM rate_limits WHERE updated_at < ?", (cutoff,)))
+        return await self.database.transaction(acquire)
@@ -0,0 +1,369 @@
+"""Repository ingestion for AI repo analysis.
+
+A local checkout is read file by file (git objects at HEAD, or the plain
+directory tree), filtered down to source text, and packed into chunks that
+fit a token budget. Chunks are summarized concurrently, then one synthesis
+call turns the summaries into the analysis.
+
+Chunk summaries are cached by the blob hashes of the files they cover, so
+re-analyzing after a small change only re-summarizes chunks whose files
+changed. Whole analyses are cached by snapshot (commit SHA, or a digest of
+every blob for a non-git directory) and requirements.
+"""
+from pathlib import Path
+from typing import List, Optional, Dict, Any, Iterator, Iterable, Tuple, Callable, Awaitable
+import asyncio
+import hashlib
+import logging
+import os
+import subprocess
+
+logger = logging.getLogger(__name__)
+
+# (system_message, prompt) -> model response, same shape as llm_gateway.LLMCall
+LLMCall = Callable[[str, str], Awaitable[Any]]
+
+# Directories never worth sending to the model
+SKIP_DIRS = {
+    '.git', '.hg', '.svn', 'node_modules', 'bower_components', 'vendor', '__pycache__', '.venv', 'venv',
+    'dist', 'build', 'out', 'target', 'coverage', '.next', '.nuxt', '.cache', '.idea', '.vscode',
+}
+
+# Generated, binary or media files
+SKIP_SUFFIXES = {
+    '.png', '.jpg', '.jpeg', '.gif', '.webp', '.ico', '.svg', '.bmp', '.pdf', '.zip', '.gz', '.tar', '.tgz',
+    '.jar', '.war', '.class', '.so', '.dll', '.dylib', '.exe', '.bin', '.o', '.a', '.pyc', '.wasm',
+    '.woff', '.woff2', '.ttf', '.eot', '.otf', '.mp3', '.mp4', '.mov', '.avi', '.webm', '.db', '.sqlite',
+    '.map', '.min.js', '.min.css', '.lock',
+}
+SKIP_FILES = {'package-lock.json', 'yarn.lock', 'pnpm-lock.yaml', 'poetry.lock', 'Cargo.lock', 'composer.lock'}
+
+CHUNK_SYSTEM_MESSAGE = "You are an expert code reviewer summarizing part of a repository for a later review."
+SYNTHESIS_SYSTEM_MESSAGE = "You are an expert code reviewer and full-stack developer."
+
+
+class RepoIngestionError(Exception):
+    """Raised when a repository source can't be resolved or read"""
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough token count (~4 characters per token), good enough for budgeting prompts"""
+    return len(text) // 4 + 1
+
+
+def blob_hash(data: bytes) -> str:
+    """Git blob id of some content, so plain directories and checkouts share cache keys"""
+    return hashlib.sha1(b"blob %d\0" % len(data) + data).hexdigest()
+
+
+def resolve_local_source(repo_url: str, allowed_roots: Iterable[str]) -> Optional[Path]:
+    """Local directory named by a file:// URL or absolute path, or None for remote URLs.
+
+    Only directories under one of allowed_roots may be read; with no roots
+    configured, local ingestion is disabled.
+    """
+    if repo_url.startswith('file://'):
+        location = repo_url[len('file://'):]
+    elif repo_url.startswith('/'):
+        location = repo_url
+    else:
+        return None
+    roots = [Path(root).resolve() for root in allowed_roots if root]
+    if not roots:
+        raise RepoIngestionError("Local repository analysis is not enabled")
+    path = Path(location).resolve()
+    if not any(path == root or root in path.parents for root in roots):
+        raise RepoIngestionError("Repository path is outside the allowed roots")
+    if not path.is_dir():
+        raise RepoIngestionError("Repository path does not exist")
+    return path
+
+
+def _skipped(rel_path: str, size: int, max_file_bytes: int) -> bool:
+    parts = rel_path.split('/')
+    name = parts[-1].lower()
+    if any(part in SKIP_DIRS for part in parts[:-1]) or parts[-1] in SKIP_FILES:
+        return True
+    if any(name.endswith(suffix) for suffix in SKIP_SUFFIXES):
+        return True
+    return size == 0 or size > max_file_bytes
+
+
+def _decode(data: bytes) -> Optional[str]:
+    # A NUL byte early on means binary content whatever the extension says
+    if b'\0' in data[:8192]:
+        return None
+    return data.decode('utf-8', errors='replace')
+
+
+class RepoSnapshot:
+    """Readable view of one repository state; files() yields (path, blob hash, text) lazily"""
+
+    def __init__(self, path: Path, max_file_bytes: int):
+        self.path = path
+        self.max_file_bytes = max_file_bytes
+        self.commit = None
+        self.skipped = 0
+        if (path / '.git').exists():
+            try:
+                self.commit = self._git('rev-parse', '--verify', 'HEAD').strip()
+            except RepoIngestionError:
+                # A repository without commits yet is read like a plain directory
+                logger.info(f"No commits in {path}, reading the working tree")
+
+    def _git(self, *args: str) -> str:
+        try:
+            result = subprocess.run(
+                ['git', '-C', str(self.path), *args], capture_output=True, check=True, timeout=60
+            )
+        except (OSError, subprocess.SubprocessError) as e:
+            raise RepoIngestionError(f"git {args[0]} failed: {e}")
+        return result.stdout.decode('utf-8', errors='replace')
+
+    def files(self) -> Iterator[Tuple[str, str, str]]:
+        return self._git_files() if self.commit else self._tree_files()
+
+    def _git_files(self) -> Iterator[Tuple[str, str, str]]:
+        # ls-tree gives sizes and blob ids up front, so filtered files are never read
+        wanted = []
+        for line in self._git('ls-tree', '-r', '-l', '-z', 'HEAD').split('\0'):
+            if not line:
+                continue
+            meta, rel_path = line.split('\t', 1)
+            mode, kind, blob, size = meta.split()
+            # Symlinks are blobs too; like submodules they aren't followed
+            if kind != 'blob' or mode == '120000' or _skipped(rel_path, int(size), self.max_file_bytes):
+                self.skipped += 1
+                continue
+            wanted.append((rel_path, blob))
+
+        process = subprocess.Popen(
+            ['git', '-C', str(self.path), 'cat-file', '--batch'],
+            stdin=subprocess.PIPE, stdout=subprocess.PIPE, stderr=subprocess.DEVNULL
+        )
+        try:
+            for rel_path, blob in wanted:
+                process.stdin.write(blob.encode() + b'\n')
+                process.stdin.flush()
+                header = process.stdout.readline().split()
+                if len(header) < 3:
+                    raise RepoIngestionError(f"Could not read {rel_path} from git")
+                data = process.stdout.read(int(header[2]))
+                process.stdout.read(1)
+                text = _decode(data)
+                if text is None:
+                    self.skipped += 1
+                    continue
+                yield rel_path, blob, text
+        finally:
+            process.stdin.close()
+            process.kill()
+            process.wait()
+
+    def _tree_files(self) -> Iterator[Tuple[str, str, str]]:
+        for directory, dirnames, filenames in os.walk(self.path):
+            dirnames[:] = sorted(d for d in dirnames if d not in SKIP_DIRS)
+            for filename in sorted(filenames):
+                full_path = Path(directory) / filename
+                rel_path = full_path.relative_to(self.path).as_posix()
+                if full_path.is_symlink() or _skipped(rel_path, full_path.stat().st_size, self.max_file_bytes):
+                    self.skipped += 1
+                    continue
+                data = full_path.read_bytes()
+                text = _decode(data)
+                if text is None:
+                    self.skipped += 1
+                    continue
+                yield rel_path, blob_hash(data), text
+
+
+def _split_text(text: str, max_tokens: int) -> List[str]:
+    """Split on line boundaries into parts of at most max_tokens"""
+    max_chars = max_tokens * 4
+    parts, current, size = [], [], 0
+    for line in text.splitlines(keepends=True):
+        while len(line) > max_chars:
+            # A single enormous line (minified code, data) is cut mid-line
+            if current:
+                parts.append(''.join(current))
+                current, size = [], 0
+            parts.append(line[:max_chars])
+            line = line[max_chars:]
+        if size + len(line) > max_chars and current:
+            parts.append(''.join(current))
+            current, size = [], 0
+        current.append(line)
+        size += len(line)
+    if current:
+        parts.append(''.join(current))
+    return parts
+
+
+class Chunk:
+    """Pieces of one or more files summarized by a single LLM call"""
+
+    def __init__(self):
+        # (path, blob hash, part label, text)
+        self.pieces: List[Tuple[str, str, str, str]] = []
+        self.tokens = 0
+
+    def add(self, path: str, blob: str, label: str, text: str) -> None:
+        self.pieces.append((path, blob, label, text))
+        self.tokens += estimate_tokens(text)
+
+    @property
+    def key(self) -> str:
+        """Cache key: which parts of which blobs the chunk holds, independent of commit"""
+        members = '\n'.join(f"{path}\0{blob}\0{label}" for path, blob, label, _ in self.pieces)
+        return "repo-chunk:" + hashlib.sha256(members.encode()).hexdigest()
+
+    def prompt(self) -> str:
+        sections = [
+            "Summarize these repository files for a code reviewer: what each file does, the frameworks and "
+            "libraries it uses, and any notable patterns, risks or quality problems. Keep it under 200 words."
+        ]
+        for path, _, label, text in self.pieces:
+            sections.append(f"=== {path}{' ' + label if label else ''} ===\n{text}")
+        return '\n\n'.join(sections)
+
+
+def build_chunks(files: Iterable[Tuple[str, str, str]], chunk_tokens: int,
+                 max_tokens: int) -> Tuple[List[Chunk], int, bool]:
+    """Pack files, in path order, into chunks of at most chunk_tokens.
+
+    Chunks never span directories, so an edit only shifts chunk boundaries
+    (and invalidates cached summaries) within the edited file's directory.
+    Returns the chunks, the number of files included, and whether the
+    max_tokens budget cut the repository short.
+    """
+    chunks: List[Chunk] = []
+    current: Optional[Chunk] = None
+    current_dir = None
+    total_tokens = 0
+    included = 0
+    for path, blob, text in files:
+        tokens = estimate_tokens(text)
+        if total_tokens + tokens > max_tokens:
+            return chunks, included, True
+        total_tokens += tokens
+        included += 1
+
+        directory = path.rpartition('/')[0]
+        if tokens > chunk_tokens:
+            parts = _split_text(text, chunk_tokens)
+            for i, part in enumerate(parts, 1):
+                chunk = Chunk()
+                chunk.add(path, blob, f"(part {i}/{len(parts)})", part)
+                chunks.append(chunk)
+            current = None
+            continue
+        if current is None or directory != current_dir or current.tokens + tokens > chunk_tokens:
+            current = Chunk()
+            current_dir = directory
+            chunks.append(current)
+        current.add(path, blob, "", text)
+    return chunks, included, False
+
+
+class RepoAnalyzer:
+    """Ingest, summarize and synthesize a local repository.
+
+    llm is any (system_message, prompt) coroutine, so the pipeline can run
+    against a stub offline. cache needs async get(key) / put(key, dict),
+    e.g. a ScaffoldCache.
+    """
+
+    def __init__(self, llm: LLMCall, cache, chunk_tokens: int = 6000, max_tokens: int = 200000,
+                 concurrency: int = 4, max_file_bytes: int = 256 * 1024, synthesis_tokens: int = 24000):
+        self.llm = llm
+        self.cache = cache
+        self.chunk_tokens = chunk_tokens
+        self.max_tokens = max_tokens
+        self.concurrency = concurrency
+        self.max_file_bytes = max_file_bytes
+        self.synthesis_tokens = synthesis_tokens
+
+    def _ingest(self, path: Path) -> Dict[str, Any]:
+        snapshot = RepoSnapshot(path, self.max_file_bytes)
+        chunks, included, truncated = build_chunks(snapshot.files(), self.chunk_tokens, self.max_tokens)
+        # Without a commit, the blobs themselves identify the snapshot
+        snapshot_id = snapshot.commit or hashlib.sha256(
+            '\n'.join(chunk.key for chunk in chunks).encode()
+        ).hexdigest()
+        return {
+            "commit": snapshot.commit, "snapshot": snapshot_id, "chunks": chunks,
+            "files": included, "skipped": snapshot.skipped, "truncated": truncated,
+        }
+
+    async def _summarize(self, chunks: List[Chunk]) -> Tuple[List[str], int]:
+        semaphore = asyncio.Semaphore(self.concurrency)
+        cached = 0
+
+        async def summarize(chunk: Chunk) -> str:
+            nonlocal cached
+            entry = await self.cache.get(chunk.key)
+            if entry is not None:
+                cached += 1
+                return entry['summary']
+            async with semaphore:
+                summary = str(await self.llm(CHUNK_SYSTEM_MESSAGE, chunk.prompt()))
+            await self.cache.put(chunk.key, {"summary": summary})
+            return summary
+
+        summaries = await asyncio.gather(*(summarize(chunk) for chunk in chunks))
+        return list(summaries), cached
+
+    def _synthesis_prompt(self, repo_url: str, requirements: str, ingested: Dict[str, Any],
+                          summaries: List[str]) -> str:
+        budget = self.synthesis_tokens * 4
+        sections = []
+        for chunk, summary in zip(ingested['chunks'], summaries):
+            paths = ', '.join(dict.fromkeys(path for path, _, _, _ in chunk.pieces))
+            section = f"[{paths}]\n{summary.strip()}"
+            budget -= len(section)
+            if budget < 0:
+                sections.append("[remaining summaries omitted for length]")
+                break
+            sections.append(section)
+        revision = f"commit {ingested['commit']}" if ingested['commit'] else "working tree"
+        note = " (large repository: only part of it was read)" if ingested['truncated'] else ""
+        return f"""
+Analyze the repository {repo_url} ({revision}, {ingested['files']} files{note}) and provide enhancement suggestions based on these requirements:
+
+{requirements}
+
+Summaries of the repository's files:
+
+{chr(10).join(sections)}
+
+Provide:
+1. Current tech stack analysis
+2. Suggested improvements
+3. New features to add
+4. Code quality recommendations
+5. Estimated cost for enhancements (base: ₹700)
+6. Timeline estimate
+"""
+
+    async def analyze(self, path: Path, repo_url: str, requirements: str) -> Dict[str, Any]:
+        ingested = await asyncio.to_thread(self._ingest, path)
+        stats = {
+            "commit": ingested['commit'], "files": ingested['files'], "skipped_files": ingested['skipped'],
+            "chunks": len(ingested['chunks']), "truncated": ingested['truncated'],
+        }
+        if not ingested['chunks']:
+            raise RepoIngestionError("No readable source files found in the repository")
+
+        requirements_hash = hashlib.sha256(requirements.strip().encode()).hexdigest()
+        analysis_key = f"repo-analysis:{ingested['snapshot']}:{requirements_hash}"
+        entry = await self.cache.get(analysis_key)
+        if entry is not None:
+            return {"analysis": entry['analysis'], "repository": {**stats, "cached_chunks": stats['chunks']}}
+
+        summaries, cached = await self._summarize(ingested['chunks'])
+        analysis = await self.llm(
+            SYNTHESIS_SYSTEM_MESSAGE, self._synthesis_prompt(repo_url, requirements, ingested, summaries)
+        )
+        await self.cache.put(analysis_key, {"analysis": analysis})
+        logger.info(f"Analyzed {repo_url}: {stats['chunks']} chunks, {cached} summaries from cache")
+        return {"analysis": analysis, "repository": {**stats, "cached_chunks": cached}}
@@ -0,0 +1,123 @@
+"""ZIP downloads of generated scaffolds.
+
+Each scaffold file goes into the content-addressed blob store. A manifest
+of (path, digest) pairs describes the scaffold and is a blob itself, so
+its digest is a stable id for re-downloading. The manifest names the user
+who generated it and only loads for that user, so knowing another user's
+scaffold id (or guessing one from a shared config) reveals nothing. The
+blob store may expire blobs, so a manifest whose files are gone is
+reported as missing. The archive is written as
+it is sent: each file is read from the store and deflated piece by piece,
+and the bytes are handed on as soon as zipfile produces them.
+"""
+from datetime import datetime
+from typing import List, Optional, Dict, Any, AsyncIterator
+import json
+import posixpath
+import re
+import zipfile
+
+from blob_store import BlobStore
+
+MANIFEST_VERSION = 2
+
+
+def safe_archive_path(path: Any) -> Optional[str]:
+    """Relative POSIX path with no '..' or absolute parts, or None if nothing usable is left"""
+    parts = [part for part in str(path).replace('\\', '/').split('/') if part not in ('', '.', '..')]
+    return posixpath.join(*parts) if parts else None
+
+
+def _file_bytes(content: Any) -> bytes:
+    if isinstance(content, str):
+        return content.encode('utf-8')
+    # Models sometimes emit JSON files (package.json) as objects rather than strings
+    return json.dumps(content, indent=2).encode('utf-8')
+
+
+async def store_scaffold(store: BlobStore, owner: str, scaffold: Optional[Dict[str, Any]], raw: Any = None,
+                         name: str = "scaffold") -> str:
+    """Put every scaffold file in the store and return the manifest digest.
+
+    Unstructured model output (scaffold None) is archived as one text file.
+    """
+    files: Dict[str, str] = {}
+    directories = set()
+    if scaffold is None:
+        files["SCAFFOLD.txt"] = await store.put(_file_bytes(str(raw or "")))
+    else:
+        for entry in scaffold.get("file_structure") or []:
+            path = safe_archive_path(entry)
+            if path and str(entry).endswith('/'):
+                directories.add(path + '/')
+        for entry, content in (scaffold.get("key_files") or {}).items():
+            path = safe_archive_path(entry)
+            if path:
+                files[path] = await store.put(_file_bytes(content))
+    manifest = {
+        "version": MANIFEST_VERSION,
+        "owner": owner,
+        # Folder inside the archive and download file name
+        "name": re.sub(r"[^A-Za-z0-9._-]+", "-", name).strip("-.") or "scaffold",
+        "directories": sorted(directories),
+        "files": sorted(files.items()),
+    }
+    return await store.put(json.dumps(manifest, sort_keys=True, separators=(',', ':')).encode())
+
+
+async def load_manifest(store: BlobStore, digest: str, owner: str) -> Dict[str, Any]:
+    """KeyError unless the digest is a stored manifest of owner's whose files are all still stored"""
+    try:
+        manifest = json.loads(await store.get(digest))
+    except ValueError:
+        raise KeyError(digest)
+    if not isinstance(manifest, dict) or manifest.get("version") != MANIFEST_VERSION \
+            or manifest.get("owner") != owner:
+        raise KeyError(digest)
+    for _, file_digest in manifest["files"]:
+        if not await store.exists(file_digest):
+            raise KeyError(digest)
+    return manifest
+
+
+class _ZipSink:
+    """Write-only, non-seekable target for ZipFile; makes it emit data descriptors"""
+
+    def __init__(self):
+        self._pieces: List[bytes] = []
+
+    def write(self, data: bytes) -> int:
+        self._pieces.append(bytes(data))
+        return len(data)
+
+    def flush(self) -> None:
+        pass
+
+    def drain(self) -> bytes:
+        data = b"".join(self._pieces)
+        self._pieces.clear()
+        return data
+
+
+async def stream_zip(store: BlobStore, manifest: Dict[str, Any],
+                     compression: int = zipfile.ZIP_DEFLATED) -> AsyncIterator[bytes]:
+    """Yield a ZIP archive of the manifest's files under a top-level <name>/ folder"""
+    sink = _ZipSink()
+    root = manifest["name"]
+    timestamp = datetime.now().timetuple()[:6]
+    with zipfile.ZipFile(sink, 'w', compression=compression) as archive:
+        for directory in manifest["directories"]:
+            archive.writestr(zipfile.ZipInfo(f"{root}/{directory}", timestamp), b"")
+        for path, digest in manifest["files"]:
+            info = zipfile.ZipInfo(f"{root}/{path}", timestamp)
+            info.compress_type = compression
+            with archive.open(info, 'w') as entry:
+                async for piece in store.read(digest):
+                    entry.write(piece)
+                    data = sink.drain()
+                    if data:
+                        yield data
+            data = sink.drain()
+            if data:
+                yield data
+    yield sink.drain()
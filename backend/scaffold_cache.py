@@ -0,0 +1,153 @@
+from collections import OrderedDict
+from pathlib import Path
+from typing import Optional, Dict, Any, Callable, Awaitable, Tuple
+import asyncio
+import hashlib
+import json
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# Config keys whose values are unordered selections
+SET_LIKE_KEYS = {"features", "addons"}
+
+
+def _normalize(value: Any, key: Optional[str] = None) -> Any:
+    if isinstance(value, str):
+        return value.strip()
+    if isinstance(value, dict):
+        return {
+            k: _normalize(v, k) for k, v in value.items()
+            if v is not None and v != "" and v != [] and v != {}
+        }
+    if isinstance(value, (list, tuple)):
+        items = [_normalize(v) for v in value]
+        if key in SET_LIKE_KEYS:
+            unique = {json.dumps(v, sort_keys=True): v for v in items}
+            return [unique[k] for k in sorted(unique)]
+        return items
+    return value
+
+
+def config_cache_key(project_config: Dict[str, Any]) -> str:
+    """Content hash of a normalized project config.
+
+    Whitespace, empty fields and the order of features/addons don't change
+    the key, so equivalent configs share one cache entry.
+    """
+    canonical = json.dumps(_normalize(project_config), sort_keys=True, separators=(',', ':'), default=str)
+    return hashlib.sha256(canonical.encode()).hexdigest()
+
+
+class ScaffoldCache:
+    """LRU/TTL cache of generated scaffolds with single-flight generation.
+
+    Entries live in memory and, if disk_dir is set, in one JSON file per
+    key so they survive restarts and can be shared by workers on one host.
+    Concurrent requests for the same key wait on one upstream call, run
+    as a task of its own: it finishes (and fills the cache) even if every
+    caller waiting on it is cancelled.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_seconds: float = 3600,
+                 disk_dir: Optional[str] = None,
+                 cacheable: Callable[[Dict[str, Any]], bool] = lambda result: True):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.disk_dir = Path(disk_dir) if disk_dir else None
+        self.cacheable = cacheable
+        self._entries: "OrderedDict[str, Tuple[float, Dict[str, Any]]]" = OrderedDict()
+        self._inflight: Dict[str, asyncio.Task] = {}
+        if self.disk_dir:
+            self.disk_dir.mkdir(parents=True, exist_ok=True)
+
+    def _get_memory(self, key: str) -> Optional[Dict[str, Any]]:
+        entry = self._entries.get(key)
+        if entry is None:
+            return None
+        stored_at, result = entry
+        if time.time() - stored_at >= self.ttl_seconds:
+            del self._entries[key]
+            return None
+        self._entries.move_to_end(key)
+        return result
+
+    def _put_memory(self, key: str, result: Dict[str, Any], stored_at: float) -> None:
+        self._entries[key] = (stored_at, result)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _read_disk(self, key: str) -> Optional[Tuple[float, Dict[str, Any]]]:
+        path = self.disk_dir / f"{key}.json"
+        try:
+            with open(path) as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"Scaffold cache entry {key} unreadable: {e}")
+            return None
+        if time.time() - entry['stored_at'] >= self.ttl_seconds:
+            path.unlink(missing_ok=True)
+            return None
+        return entry['stored_at'], entry['result']
+
+    def _write_disk(self, key: str, result: Dict[str, Any], stored_at: float) -> None:
+        path = self.disk_dir / f"{key}.json"
+        tmp_path = path.with_suffix('.tmp')
+        with open(tmp_path, 'w') as f:
+            json.dump({"stored_at": stored_at, "result": result}, f, default=str)
+        # Atomic rename so readers never see a partial file
+        tmp_path.replace(path)
+
+    async def get(self, key: str) -> Optional[Dict[str, Any]]:
+        result = self._get_memory(key)
+        if result is not None or self.disk_dir is None:
+            return result
+        entry = await asyncio.to_thread(self._read_disk, key)
+        if entry is None:
+            return None
+        self._put_memory(key, entry[1], entry[0])
+        return entry[1]
+
+    async def put(self, key: str, result: Dict[str, Any]) -> None:
+        stored_at = time.time()
+        self._put_memory(key, result, stored_at)
+        if self.disk_dir is not None:
+            try:
+                await asyncio.to_thread(self._write_disk, key, result, stored_at)
+            except Exception as e:
+                logger.warning(f"Scaffold cache write failed for {key}: {e}")
+
+    async def get_or_generate(self, project_config: Dict[str, Any],
+                              generate: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        key = config_cache_key(project_config)
+        cached = await self.get(key)
+        if cached is not None:
+            return cached
+
+        task = self._inflight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(self._generate(key, project_config, generate))
+            self._inflight[key] = task
+        # shield: a cancelled caller, first or not, must not cancel the shared call
+        return await asyncio.shield(task)
+
+    async def _generate(self, key: str, project_config: Dict[str, Any],
+                        generate: Callable[[Dict[str, Any]], Awaitable[Dict[str, Any]]]) -> Dict[str, Any]:
+        try:
+            # A generation that finished while this caller read the cache has already stored its result
+            cached = await self.get(key)
+            if cached is not None:
+                return cached
+            result = await generate(project_config)
+            if self.cacheable(result):
+                await self.put(key, result)
+            return result
+        finally:
+            del self._inflight[key]
+
+    def clear(self) -> None:
+        self._entries.clear()
@@ -0,0 +1,232 @@
+"""Filtering, free-text search and facet counts for templates and projects.
+
+Filters are exact on category, status and features, token-based on the
+tech stack and free text, and inclusive on the price range. matches() is
+the reference semantics.
+
+A token is a maximal run of TOKEN_CHARS (letters, digits, '#' and '+'), so
+"Node.js" holds the tokens "node" and "js" and "C#" stays "c#". The Mongo
+and SQLite backends match a token wherever it is bounded by characters
+outside TOKEN_CHARS. Mongo narrows free text with its text index, built
+without stemming or stop words, and then applies the same bounded-token
+regex, so results agree across backends. Only letters outside ASCII
+differ, since SQLite's lower() leaves them alone.
+"""
+from typing import List, Optional, Dict, Any, Callable, Iterable, Set
+import re
+
+TOKEN_CHARS = "a-z0-9#+"
+_TOKEN_RE = re.compile(f"[{TOKEN_CHARS}]+")
+
+
+def tokenize(text: Any) -> List[str]:
+    """Lowercase word tokens, keeping tech names like c# and c++ intact"""
+    if text is None:
+        return []
+    if isinstance(text, (list, tuple)):
+        text = ' '.join(str(t) for t in text)
+    return _TOKEN_RE.findall(str(text).lower())
+
+
+class SearchFilters:
+    """Parsed search parameters; empty fields don't filter"""
+
+    def __init__(self, category: Optional[str] = None, status: Optional[str] = None,
+                 tech: Optional[List[str]] = None, features: Optional[List[str]] = None,
+                 min_price: Optional[float] = None, max_price: Optional[float] = None,
+                 q: Optional[str] = None):
+        self.category = category or None
+        self.status = status or None
+        self.tech = [t for t in (tech or []) if t]
+        self.features = [f for f in (features or []) if f]
+        self.min_price = min_price
+        self.max_price = max_price
+        self.q = q or None
+        # Every token of every tech value must appear in the document's stack
+        self.tech_terms = sorted({token for value in self.tech for token in tokenize(value)})
+        self.text_terms = sorted(set(tokenize(self.q)))
+
+    @property
+    def active(self) -> bool:
+        return bool(
+            self.category or self.status or self.tech_terms or self.features or self.text_terms
+            or self.min_price is not None or self.max_price is not None
+        )
+
+
+class SearchSpec:
+    """Where a document type keeps the fields that filters and facets read"""
+
+    def __init__(self, price_field: str, tech_values: Callable[[Dict[str, Any]], List[str]],
+                 text_fields: Iterable[str], facet_fields: Iterable[str]):
+        self.price_field = price_field
+        self.tech_values = lambda doc: [v for v in tech_values(doc) if v]
+        self.text_fields = tuple(text_fields)
+        self.facet_fields = tuple(facet_fields)
+
+    def text_tokens(self, doc: Dict[str, Any]) -> Set[str]:
+        return {token for field in self.text_fields for token in tokenize(doc.get(field))}
+
+    def tech_tokens(self, doc: Dict[str, Any]) -> Set[str]:
+        return set(tokenize(self.tech_values(doc)))
+
+
+TEMPLATE_SEARCH = SearchSpec(
+    price_field='base_price',
+    tech_values=lambda doc: list((doc.get('tech_stack') or {}).values()),
+    text_fields=('name', 'description', 'category', 'features'),
+    facet_fields=('category',),
+)
+
+PROJECT_SEARCH = SearchSpec(
+    price_field='estimated_cost',
+    tech_values=lambda doc: [doc.get('frontend'), doc.get('backend')],
+    text_fields=('name', 'description', 'features'),
+    facet_fields=('category', 'status'),
+)
+
+
+def _price_ok(price: Any, filters: SearchFilters) -> bool:
+    if filters.min_price is None and filters.max_price is None:
+        return True
+    if price is None:
+        return False
+    if filters.min_price is not None and price < filters.min_price:
+        return False
+    if filters.max_price is not None and price > filters.max_price:
+        return False
+    return True
+
+
+def matches(spec: SearchSpec, doc: Dict[str, Any], filters: SearchFilters) -> bool:
+    """Whether one document passes the filters"""
+    if filters.category and doc.get('category') != filters.category:
+        return False
+    if filters.status and doc.get('status') != filters.status:
+        return False
+    if filters.features and not set(filters.features) <= set(doc.get('features') or []):
+        return False
+    if filters.tech_terms and not set(filters.tech_terms) <= spec.tech_tokens(doc):
+        return False
+    if filters.text_terms and not set(filters.text_terms) <= spec.text_tokens(doc):
+        return False
+    return _price_ok(doc.get(spec.price_field), filters)
+
+
+class FacetCounter:
+    """Accumulates facet counts over matching documents"""
+
+    def __init__(self, spec: SearchSpec):
+        self.spec = spec
+        self.total = 0
+        self.counts: Dict[str, Dict[str, int]] = {field: {} for field in spec.facet_fields}
+        self.counts['features'] = {}
+        self.counts['tech'] = {}
+        self.min_price: Optional[float] = None
+        self.max_price: Optional[float] = None
+
+    def _bump(self, facet: str, value: Any) -> None:
+        if value is None or value == "":
+            return
+        bucket = self.counts[facet]
+        bucket[value] = bucket.get(value, 0) + 1
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        self.total += 1
+        for field in self.spec.facet_fields:
+            self._bump(field, doc.get(field))
+        for feature in set(doc.get('features') or []):
+            self._bump('features', feature)
+        for value in set(self.spec.tech_values(doc)):
+            self._bump('tech', value)
+        price = doc.get(self.spec.price_field)
+        if price is not None:
+            self.min_price = price if self.min_price is None else min(self.min_price, price)
+            self.max_price = price if self.max_price is None else max(self.max_price, price)
+
+    def result(self) -> Dict[str, Any]:
+        return facet_result(self.total, self.counts, self.min_price, self.max_price)
+
+
+def facet_result(total: int, counts: Dict[str, Dict[str, int]],
+                 min_price: Optional[float], max_price: Optional[float]) -> Dict[str, Any]:
+    """Shape facet counts for the API: each facet's values by descending count, then the price range"""
+    facets: Dict[str, Any] = {
+        facet: dict(sorted(values.items(), key=lambda item: (-item[1], str(item[0]))))
+        for facet, values in counts.items()
+    }
+    facets['price'] = {"min": min_price, "max": max_price} if min_price is not None else None
+    return {"total": total, "facets": facets}
+
+
+def compute_facets(spec: SearchSpec, docs: Iterable[Dict[str, Any]]) -> Dict[str, Any]:
+    counter = FacetCounter(spec)
+    for doc in docs:
+        counter.add(doc)
+    return counter.result()
+
+
+class InvertedIndex:
+    """Term -> document id postings for the exact and token filters, plus each document's price.
+
+    Documents are added, replaced and removed incrementally; matching()
+    intersects the postings of every filter term, smallest first.
+    """
+
+    def __init__(self, spec: SearchSpec, docs: Iterable[Dict[str, Any]] = ()):
+        self.spec = spec
+        self._postings: Dict[str, Set[str]] = {}
+        self._terms: Dict[str, Set[str]] = {}
+        self._prices: Dict[str, Any] = {}
+        for doc in docs:
+            self.add(doc)
+
+    def _doc_terms(self, doc: Dict[str, Any]) -> Set[str]:
+        terms = {f"feature:{feature}" for feature in doc.get('features') or []}
+        terms.update(f"tech:{token}" for token in self.spec.tech_tokens(doc))
+        terms.update(f"text:{token}" for token in self.spec.text_tokens(doc))
+        for field in self.spec.facet_fields:
+            if doc.get(field) is not None:
+                terms.add(f"{field}:{doc[field]}")
+        return terms
+
+    def add(self, doc: Dict[str, Any]) -> None:
+        doc_id = doc['id']
+        if doc_id in self._terms:
+            self.remove(doc_id)
+        terms = self._doc_terms(doc)
+        self._terms[doc_id] = terms
+        self._prices[doc_id] = doc.get(self.spec.price_field)
+        for term in terms:
+            self._postings.setdefault(term, set()).add(doc_id)
+
+    def remove(self, doc_id: str) -> None:
+        for term in self._terms.pop(doc_id, ()):
+            postings = self._postings[term]
+            postings.discard(doc_id)
+            if not postings:
+                del self._postings[term]
+        self._prices.pop(doc_id, None)
+
+    def matching(self, filters: SearchFilters) -> Optional[Set[str]]:
+        """Ids of documents passing the filters, or None if no filter is active (everything matches)"""
+        if not filters.active:
+            return None
+        terms = [f"feature:{feature}" for feature in filters.features]
+        terms += [f"tech:{token}" for token in filters.tech_terms]
+        terms += [f"text:{token}" for token in filters.text_terms]
+        if filters.category:
+            terms.append(f"category:{filters.category}")
+        if filters.status:
+            terms.append(f"status:{filters.status}")
+
+        if terms:
+            postings = sorted((self._postings.get(term, set()) for term in terms), key=len)
+            ids = set(postings[0])
+            for other in postings[1:]:
+                ids &= other
+                if not ids:
+                    break
+        else:
+            ids = set(self._terms)
+        return {doc_id for doc_id in ids if _price_ok(self._prices.get(doc_id), filters)}
@@ -0,0 +1,57 @@
+from datetime import datetime, timedelta
+from typing import List, Dict, Any, Iterable, Optional, Type
+import copy
+import json
+
+from fastapi.responses import Response
+from pydantic import BaseModel
+from pydantic_core import PydanticUndefined
+
+# Safe import for orjson with fallback to the stdlib encoder
+try:
+    import orjson
+    HAS_ORJSON = True
+except ImportError:
+    HAS_ORJSON = False
+
+
+def _default(value: Any) -> Any:
+    if isinstance(value, datetime):
+        text = value.isoformat()
+        # UTC as "Z", the way Pydantic writes it, so both encoders produce identical bodies
+        return text[:-6] + 'Z' if value.utcoffset() == timedelta(0) else text
+    raise TypeError(f"Object of type {type(value).__name__} is not JSON serializable")
+
+
+def dumps(content: Any) -> bytes:
+    """Encode JSON to bytes with orjson when installed, else the stdlib json module"""
+    if HAS_ORJSON:
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS | orjson.OPT_UTC_Z)
+    return json.dumps(content, default=_default, ensure_ascii=False, separators=(',', ':')).encode()
+
+
+class FastJSONResponse(Response):
+    """JSON response that encodes content directly, skipping response_model validation"""
+    media_type = "application/json"
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+
+def model_defaults(model: Type[BaseModel]) -> Dict[str, Any]:
+    """Static field defaults, the values validation fills in for keys a document lacks"""
+    # Factory defaults (ids, timestamps) would be invented afresh, so legacy documents go without them
+    return {name: field.default for name, field in model.model_fields.items() if field.default is not PydanticUndefined}
+
+
+def trim_to_fields(docs: Iterable[Dict[str, Any]], fields: List[str],
+                   defaults: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+    """Trim trusted storage documents to the public model fields, filling in defaults for missing ones"""
+    defaults = defaults or {}
+    return [
+        {
+            field: doc[field] if field in doc else copy.copy(defaults[field])
+            for field in fields if field in doc or field in defaults
+        }
+        for doc in docs
+    ]
@@ -1,15 +1,50 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Body
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Body, Query, Request, WebSocket, WebSocketDisconnect
 from fastapi.middleware.cors import CORSMiddleware
-from pydantic import BaseModel, Field, ConfigDict, EmailStr
-from typing import List, Optional, Dict, Any
+from fastapi.responses import StreamingResponse, Response, JSONResponse
+from starlette.background import BackgroundTask
+from pydantic import BaseModel, Field, ConfigDict, EmailStr, TypeAdapter, ValidationError, model_validator, field_validator
+from typing import List, Optional, Dict, Any, AsyncIterator, Literal, Union
 from datetime import datetime, timezone
 from dotenv import load_dotenv
 from contextlib import asynccontextmanager
 from pathlib import Path
 import os
+import io
+import re
+import asyncio
+import csv
+import json
 import logging
+import math
+import time
 import uuid
-import jwt
+
+from catalog import TemplateCatalogCache, etag_matches, make_etag
+from scaffold_cache import ScaffoldCache
+from blob_store import InMemoryBlobStore, FileBlobStore, is_digest
+from scaffold_archive import store_scaffold, load_manifest, stream_zip
+from jobs import JobQueue, InMemoryJobStore, MongoJobStore, QueueFullError
+from pricing import PricingEngine
+from auth import TokenVerifier, InvalidTokenError
+from serialization import FastJSONResponse, trim_to_fields, model_defaults, dumps
+from metrics import Registry, MetricsMiddleware, mongo_command_listener
+from settings import Settings
+from search import SearchFilters, InvertedIndex, TEMPLATE_SEARCH, matches, compute_facets
+from llm_gateway import LLMGateway, CircuitBreaker, CircuitOpenError, LLMBusyError
+from storage import (
+    VersionConflictError, InMemoryProjectRepository, MongoProjectRepository, ensure_indexes, verify_query_plans,
+    verify_datetimes, sort_key, encode_cursor, decode_cursor, InMemoryTemplateRepository, MongoTemplateRepository
+)
+from sqlite_store import SQLiteDatabase, SQLiteProjectRepository, SQLiteTemplateRepository, SQLiteChangeLogSource
+from repo_ingest import RepoAnalyzer, RepoIngestionError, resolve_local_source
+from rate_limit import RateLimit, RateLimitBackend, InMemoryRateLimitBackend, MongoRateLimitBackend, SQLiteRateLimitBackend
+from project_events import (
+    ProjectEventBus, MongoChangeStreamSource, Subscription, TooManySubscribersError, EVENT_UPDATED, EVENT_DELETED
+)
+from analytics import (
+    AnalyticsStore, InMemoryAnalyticsStore, MongoAnalyticsStore, SQLiteAnalyticsStore,
+    rebuild_counters, summarize
+)
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
@@ -18,31 +53,129 @@ load_dotenv(ROOT_DIR / '.env')
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-# Safe import for emergentintegrations with fallback
-try:
-    from emergentintegrations.llm.chat import LlmChat, UserMessage
-    HAS_EMERGENT = True
-    logger.info("emergentintegrations loaded successfully")
-except ImportError:
-    HAS_EMERGENT = False
-    logger.warning("emergentintegrations not available, using mock AI")
-
-# MongoDB connection with fallback
-try:
-    mongo_url = os.environ.get('MONGO_URL', 'mongodb://localhost:27017')
-    from motor.motor_asyncio import AsyncIOMotorClient
-    client = AsyncIOMotorClient(mongo_url)
-    db = client[os.environ.get('DB_NAME', 'seeforge_db')]
-    HAS_MONGO = True
-    logger.info("MongoDB connected successfully")
-except Exception as e:
-    logger.error(f"MongoDB connection failed: {e}")
-    HAS_MONGO = False
-    db = None
-    logger.info("Using in-memory storage (MongoDB not available)")
+# Prometheus metrics shared by the HTTP middleware, Mongo command listener and LLM calls
+metrics_registry = Registry()
+LLM_CALL_SECONDS = metrics_registry.histogram(
+    "llm_call_duration_seconds", "LLM gateway call latency by operation and outcome",
+    ("operation", "outcome"), buckets=(0.1, 0.25, 0.5, 1, 2.5, 5, 10, 20, 30, 60, 120)
+)
+LLM_CALLS = metrics_registry.counter(
+    "llm_calls_total", "LLM calls by operation and outcome (success, error, fallback)", ("operation", "outcome")
+)
+ADMISSION_REJECTIONS = metrics_registry.counter(
+    "admission_rejections_total", "Requests refused before running, by route class and reason (rate_limited, shed)",
+    ("route_class", "reason")
+)
+AUTH_VERIFY_SECONDS = metrics_registry.histogram(
+    "auth_token_verify_duration_seconds", "Bearer token verification latency", ("result",),
+    buckets=(0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+)
+
+# Expose /metrics to non-loopback clients (e.g. a scraper on another host)
+METRICS_ALLOW_REMOTE = os.environ.get('METRICS_ALLOW_REMOTE', 'false').lower() == 'true'
+
+# MongoDB client, connected in the app lifespan (see connect_mongo); in-memory stores until then
+client = None
+db = None
+HAS_MONGO = False
+
+# Pagination for project listings
+PROJECTS_PAGE_SIZE = int(os.environ.get('PROJECTS_PAGE_SIZE', '20'))
+PROJECTS_MAX_PAGE_SIZE = int(os.environ.get('PROJECTS_MAX_PAGE_SIZE', '100'))
+
+# Rows fetched per round trip when streaming project exports
+EXPORT_BATCH_SIZE = int(os.environ.get('EXPORT_BATCH_SIZE', '500'))
+
+# Upper bound on how long the template catalog cache may serve a snapshot, and how often it asks
+# storage whether another worker changed the catalog (SQLite only; Mongo relies on the TTL)
+TEMPLATE_CACHE_TTL = float(os.environ.get('TEMPLATE_CACHE_TTL', '300'))
+TEMPLATE_CACHE_CHECK_INTERVAL = float(os.environ.get('TEMPLATE_CACHE_CHECK_INTERVAL', '1'))
+
+# AI scaffold cache: entries, lifetime, and optional on-disk tier
+SCAFFOLD_CACHE_SIZE = int(os.environ.get('SCAFFOLD_CACHE_SIZE', '256'))
+SCAFFOLD_CACHE_TTL = float(os.environ.get('SCAFFOLD_CACHE_TTL', '3600'))
+SCAFFOLD_CACHE_DIR = os.environ.get('SCAFFOLD_CACHE_DIR') or None
+
+# Content-addressed store for files of downloaded scaffolds: in memory up to a byte bound unless
+# a directory is set, where blobs untouched for the TTL are pruned (0 keeps them forever)
+SCAFFOLD_BLOB_DIR = os.environ.get('SCAFFOLD_BLOB_DIR') or None
+SCAFFOLD_BLOB_MAX_BYTES = int(os.environ.get('SCAFFOLD_BLOB_MAX_BYTES', str(256 * 1024 * 1024)))
+SCAFFOLD_BLOB_TTL = float(os.environ.get('SCAFFOLD_BLOB_TTL', str(7 * 24 * 3600)))
+
+# Background AI jobs: worker pool size, queue bound, and in-memory retention
+JOB_CONCURRENCY = int(os.environ.get('JOB_CONCURRENCY', '4'))
+JOB_QUEUE_SIZE = int(os.environ.get('JOB_QUEUE_SIZE', '100'))
+JOB_RETENTION = int(os.environ.get('JOB_RETENTION', '1000'))
+# Finished jobs in MongoDB are deleted this long after finishing; unfinished ones are leased to
+# the worker holding them and taken over by another once a lease runs out
+JOB_TTL = float(os.environ.get('JOB_TTL', str(7 * 24 * 3600)))
+JOB_LEASE_SECONDS = float(os.environ.get('JOB_LEASE_SECONDS', '60'))
+
+# Repo analysis ingestion: readable roots for file:// checkouts (empty disables), token budgets,
+# concurrent chunk summaries per analysis, largest file read, and the summary cache
+REPO_INGEST_ROOTS = [r.strip() for r in os.environ.get('REPO_INGEST_ROOTS', '').split(',') if r.strip()]
+REPO_CHUNK_TOKENS = int(os.environ.get('REPO_CHUNK_TOKENS', '6000'))
+REPO_MAX_TOKENS = int(os.environ.get('REPO_MAX_TOKENS', '200000'))
+REPO_SUMMARY_CONCURRENCY = int(os.environ.get('REPO_SUMMARY_CONCURRENCY', '4'))
+REPO_MAX_FILE_BYTES = int(os.environ.get('REPO_MAX_FILE_BYTES', str(256 * 1024)))
+REPO_SUMMARY_CACHE_SIZE = int(os.environ.get('REPO_SUMMARY_CACHE_SIZE', '4096'))
+REPO_SUMMARY_CACHE_TTL = float(os.environ.get('REPO_SUMMARY_CACHE_TTL', str(7 * 24 * 3600)))
+REPO_SUMMARY_CACHE_DIR = os.environ.get('REPO_SUMMARY_CACHE_DIR') or None
+
+# Seconds between SSE keep-alive comments while a stream is waiting on the LLM
+SSE_HEARTBEAT_SECONDS = float(os.environ.get('SSE_HEARTBEAT_SECONDS', '10'))
+
+# Project change push on MongoDB: 'listener' publishes this worker's writes, 'change_stream' relays every
+# worker's writes; SQLite always relays every worker's writes from its change log, polled this often.
+# Open subscriptions allowed, and events buffered per subscriber
+PROJECT_EVENTS_SOURCE = os.environ.get('PROJECT_EVENTS_SOURCE', 'listener')
+PROJECT_EVENTS_POLL_INTERVAL = float(os.environ.get('PROJECT_EVENTS_POLL_INTERVAL', '0.5'))
+PROJECT_EVENTS_MAX_SUBSCRIBERS = int(os.environ.get('PROJECT_EVENTS_MAX_SUBSCRIBERS', '10000'))
+PROJECT_EVENTS_QUEUE = int(os.environ.get('PROJECT_EVENTS_QUEUE', '16'))
 
-# Create the main app without a prefix
-app = FastAPI(title="SeeForge API", version="1.0.0")
+# LLM provider and gateway limits
+GEMINI_API_KEY = os.environ.get('GEMINI_API_KEY', '')
+LLM_PROVIDER = os.environ.get('LLM_PROVIDER', 'gemini')
+LLM_MODEL = os.environ.get('LLM_MODEL', 'gemini-2.0-flash')
+LLM_MAX_CONCURRENCY = int(os.environ.get('LLM_MAX_CONCURRENCY', '8'))
+LLM_TIMEOUT = float(os.environ.get('LLM_TIMEOUT', '60'))
+LLM_RETRIES = int(os.environ.get('LLM_RETRIES', '2'))
+LLM_BACKOFF = float(os.environ.get('LLM_BACKOFF', '0.5'))
+LLM_BREAKER_THRESHOLD = int(os.environ.get('LLM_BREAKER_THRESHOLD', '5'))
+LLM_BREAKER_RESET = float(os.environ.get('LLM_BREAKER_RESET', '30'))
+
+# Per-caller token buckets by route class, as "<requests>/<seconds>" ("0" disables); shared between
+# workers through the storage backend (Mongo or SQLite) when RATE_LIMIT_SHARED is set
+RATE_LIMITS = {
+    "llm": RateLimit.parse(os.environ.get('RATE_LIMIT_LLM', '10/60')),
+    "write": RateLimit.parse(os.environ.get('RATE_LIMIT_WRITE', '60/60')),
+    "read": RateLimit.parse(os.environ.get('RATE_LIMIT_READ', '300/60')),
+}
+RATE_LIMIT_SHARED = os.environ.get('RATE_LIMIT_SHARED', 'false').lower() == 'true'
+# Refuse new LLM requests outright while this many LLM calls are running or queued for a slot
+LLM_SHED_THRESHOLD = int(os.environ.get('LLM_SHED_THRESHOLD', str(LLM_MAX_CONCURRENCY * 4)))
+LLM_SHED_RETRY_AFTER = int(os.environ.get('LLM_SHED_RETRY_AFTER', '5'))
+
+# Price tables: optional JSON file overriding the built-in/Mongo tables, and batch quote limit
+PRICING_CONFIG = os.environ.get('PRICING_CONFIG') or None
+PRICING_BATCH_MAX = int(os.environ.get('PRICING_BATCH_MAX', '500'))
+
+# Auth: JWT verification settings, read once at startup
+SUPABASE_JWT_SECRET = os.environ.get('SUPABASE_JWT_SECRET', '')
+JWT_ALGORITHMS = [a.strip() for a in os.environ.get('JWT_ALGORITHMS', 'HS256').split(',')]
+JWT_AUDIENCE = os.environ.get('JWT_AUDIENCE') or None
+JWT_CACHE_SIZE = int(os.environ.get('JWT_CACHE_SIZE', '4096'))
+# Requests without an Authorization header act as the shared demo user
+ALLOW_DEMO_USER = os.environ.get('ALLOW_DEMO_USER', 'true').lower() == 'true'
+DEMO_USER_ID = "demo-user-123"
+# Token subjects allowed to run admin maintenance endpoints; none when unset
+ADMIN_USER_IDS = {u.strip() for u in os.environ.get('ADMIN_USER_IDS', '').split(',') if u.strip()}
+
+# Serve trusted storage documents without re-validating them through the response models
+FAST_SERIALIZATION = os.environ.get('FAST_SERIALIZATION', 'true').lower() == 'true'
+
+# Largest number of operations accepted by POST /api/projects/bulk
+BULK_MAX_OPERATIONS = int(os.environ.get('BULK_MAX_OPERATIONS', '1000'))
 
 # Create a router with the /api prefix
 api_router = APIRouter(prefix="/api")
@@ -95,8 +228,61 @@ class Project(BaseModel):
     status: str = "pending"
     github_repo_url: Optional[str] = None
     deployed_url: Optional[str] = None
+    tier: str = "Starter"
     created_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
     updated_at: datetime = Field(default_factory=lambda: datetime.now(timezone.utc))
+    version: int = 0
+
+class ProjectUpdate(BaseModel):
+    """Fields a client may change on an existing project.
+
+    Features and addons are priced into estimated_cost at creation, so
+    they aren't changeable here. Only the URL fields may be cleared with null.
+    """
+    model_config = ConfigDict(extra="forbid")
+    name: Optional[str] = None
+    description: Optional[str] = None
+    category: Optional[str] = None
+    platform: Optional[str] = None
+    frontend: Optional[str] = None
+    backend: Optional[str] = None
+    ui_template: Optional[str] = None
+    deployment_option: Optional[str] = None
+    estimated_timeline: Optional[str] = None
+    status: Optional[str] = None
+    github_repo_url: Optional[str] = None
+    deployed_url: Optional[str] = None
+
+    @field_validator(
+        'name', 'description', 'category', 'platform', 'frontend', 'backend', 'ui_template',
+        'deployment_option', 'estimated_timeline', 'status'
+    )
+    @classmethod
+    def not_null(cls, value: Optional[str]) -> str:
+        # Optional only so the field can be left out; Project requires a string
+        if value is None:
+            raise ValueError("may not be null")
+        return value
+
+class BulkProjectOperation(BaseModel):
+    op: Literal["create", "update", "delete"]
+    id: Optional[str] = None
+    project: Optional[ProjectCreate] = None
+    updates: Optional[ProjectUpdate] = None
+
+    @model_validator(mode="after")
+    def check_operands(self):
+        if self.op == "create" and self.project is None:
+            raise ValueError("create requires 'project'")
+        if self.op == "update" and (self.id is None or self.updates is None):
+            raise ValueError("update requires 'id' and 'updates'")
+        if self.op == "delete" and self.id is None:
+            raise ValueError("delete requires 'id'")
+        return self
+
+class BulkProjectRequest(BaseModel):
+    operations: List[BulkProjectOperation]
+    ordered: bool = True
 
 class Template(BaseModel):
     model_config = ConfigDict(extra="ignore")
@@ -120,6 +306,21 @@ class PaymentOrder(BaseModel):
     project_id: str
     user_id: str
 
+class ProjectPage(BaseModel):
+    projects: List[Project]
+    next_cursor: Optional[str] = None
+    # Set when facets are requested: count and facet values over all matches, not just this page
+    total: Optional[int] = None
+    facets: Optional[Dict[str, Any]] = None
+
+class TemplateSearchResult(BaseModel):
+    templates: List[Template]
+    total: int
+    facets: Dict[str, Any]
+
+class PricingBatchRequest(BaseModel):
+    configurations: List[Dict[str, Any]]
+
 class GithubRepoAnalysis(BaseModel):
     repo_url: str
     requirements: str
@@ -177,29 +378,277 @@ demo_templates = [
     }
 ]
 
-demo_projects = []
+# ==================== Storage ====================
+
+# In-memory until startup connects the configured backend (see connect_mongo / connect_sqlite)
+STORAGE_BACKEND = "memory"
+project_repo = InMemoryProjectRepository()
+template_repo = InMemoryTemplateRepository(demo_templates)
+sqlite_db: Optional[SQLiteDatabase] = None
+
+# Admin dashboard counters, kept current by every project write
+analytics_store: AnalyticsStore = InMemoryAnalyticsStore()
+
+async def record_analytics(previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> None:
+    await analytics_store.record(previous, current)
+
+project_repo.add_listener(record_analytics)
+
+# Pushes project changes to subscribed clients (see /projects/{project_id}/events)
+project_events = ProjectEventBus(max_subscribers=PROJECT_EVENTS_MAX_SUBSCRIBERS, max_pending=PROJECT_EVENTS_QUEUE)
+project_change_stream: Optional[Union[MongoChangeStreamSource, SQLiteChangeLogSource]] = None
+
+project_repo.add_listener(project_events.publish)
+
+# ==================== Auth ====================
+
+token_verifier = TokenVerifier(
+    SUPABASE_JWT_SECRET,
+    algorithms=JWT_ALGORITHMS,
+    audience=JWT_AUDIENCE,
+    cache_size=JWT_CACHE_SIZE
+)
+
+# ==================== Template Catalog Cache ====================
+
+async def load_templates() -> List[Dict[str, Any]]:
+    """Load the full template catalog from storage"""
+    return await template_repo.list_all()
+
+async def load_templates_version() -> Any:
+    return await template_repo.catalog_version()
+
+template_list_adapter = TypeAdapter(List[Template])
+
+template_catalog = TemplateCatalogCache(
+    load_templates,
+    serialize_list=lambda ts: template_list_adapter.dump_json(template_list_adapter.validate_python(ts)),
+    serialize_item=lambda t: Template(**t).model_dump_json().encode(),
+    ttl_seconds=TEMPLATE_CACHE_TTL,
+    build_index=lambda ts: InvertedIndex(TEMPLATE_SEARCH, ts),
+    load_version=load_templates_version,
+    check_interval=TEMPLATE_CACHE_CHECK_INTERVAL
+)
+
+def cached_json_response(body: bytes, etag: str, if_none_match: Optional[str]) -> Response:
+    """Serve pre-serialized JSON, or 304 if the client already has this ETag"""
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if etag_matches(if_none_match, etag):
+        return Response(status_code=304, headers=headers)
+    return Response(content=body, media_type="application/json", headers=headers)
 
 # ==================== Helper Functions ====================
 
-def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
-    """Extract user ID from JWT token with fallback for demo"""
+PROJECT_FIELDS = list(Project.model_fields)
+# Filled in on the fast path for legacy documents, as strict validation would
+PROJECT_DEFAULTS = model_defaults(Project)
+
+def project_etag(project: Dict[str, Any]) -> str:
+    return f'"v{project.get("version", 0)}"'
+
+def parse_if_match(if_match: Optional[str]) -> Optional[int]:
+    """Version named by an If-Match header (None for absent or '*'); 412 if it can't match any version"""
+    if if_match is None or if_match.strip() == "*":
+        return None
+    # If-Match uses strong comparison, so weak validators never match
+    match = re.fullmatch(r'\s*"v(\d+)"\s*', if_match)
+    if not match:
+        raise HTTPException(status_code=412, detail="If-Match does not name a current project version")
+    return int(match.group(1))
+
+def project_response(project: Dict[str, Any], response: Response):
+    """Return a stored project with its ETag, encoded directly in fast mode or validated in strict mode"""
+    etag = project_etag(project)
+    if FAST_SERIALIZATION:
+        return FastJSONResponse(trim_to_fields([project], PROJECT_FIELDS, PROJECT_DEFAULTS)[0], headers={"ETag": etag})
+    response.headers["ETag"] = etag
+    return Project(**project)
+
+def project_page_response(page: Dict[str, Any]):
+    """Return a page of stored projects, encoded directly in fast mode or validated in strict mode"""
+    if FAST_SERIALIZATION:
+        return FastJSONResponse({
+            "projects": trim_to_fields(page['projects'], PROJECT_FIELDS, PROJECT_DEFAULTS),
+            "next_cursor": page['next_cursor'],
+            "total": page.get('total'),
+            "facets": page.get('facets')
+        })
+    return page
+
+async def fetch_project_page(list_page, limit: Optional[int], cursor: Optional[str], order: str) -> Dict[str, Any]:
+    """Fetch one keyset page via list_page(limit, after, descending) and build the next cursor"""
+    limit = limit or PROJECTS_PAGE_SIZE
+    try:
+        after = decode_cursor(cursor) if cursor else None
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    # Ask for one extra row to learn whether another page exists
+    projects = await list_page(limit + 1, after, order == "desc")
+    next_cursor = None
+    if len(projects) > limit:
+        projects = projects[:limit]
+        next_cursor = encode_cursor(sort_key(projects[-1]))
+    
+    return {"projects": projects, "next_cursor": next_cursor}
+
+async def template_search_filters(
+    category: Optional[str] = None,
+    tech: List[str] = Query([], description="Tech stack terms; every token must appear"),
+    features: List[str] = Query([], description="Exact feature names; all must be present"),
+    min_price: Optional[float] = Query(None, ge=0),
+    max_price: Optional[float] = Query(None, ge=0),
+    q: Optional[str] = Query(None, max_length=200, description="Free text; every word must appear")
+) -> SearchFilters:
+    return SearchFilters(category=category, tech=tech, features=features,
+                         min_price=min_price, max_price=max_price, q=q)
+
+async def project_search_filters(
+    status: Optional[str] = None,
+    template_filters: SearchFilters = Depends(template_search_filters)
+) -> SearchFilters:
+    template_filters.status = status or None
+    return template_filters
+
+def filter_templates(snapshot, filters: SearchFilters) -> List[Dict[str, Any]]:
+    """Catalog templates passing filters, in catalog order"""
+    ids = snapshot.index.matching(filters)
+    return [t for t in snapshot.templates if ids is None or t['id'] in ids]
+
+def _export_value(value: Any) -> Any:
+    """JSON-encode values that json.dumps cannot handle natively"""
+    if isinstance(value, datetime):
+        return value.isoformat()
+    return str(value)
+
+async def export_projects_ndjson(projects: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Render projects as newline-delimited JSON, one line per document"""
+    async for project in projects:
+        yield json.dumps(project, default=_export_value) + "\n"
+
+async def export_projects_csv(projects: AsyncIterator[Dict[str, Any]]) -> AsyncIterator[str]:
+    """Render projects as CSV with one column per Project field; list fields are JSON-encoded"""
+    columns = list(Project.model_fields)
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    
+    def flush() -> str:
+        chunk = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return chunk
+    
+    writer.writerow(columns)
+    yield flush()
+    async for project in projects:
+        row = []
+        for column in columns:
+            value = project.get(column)
+            if isinstance(value, (list, dict)):
+                value = json.dumps(value, default=_export_value)
+            elif isinstance(value, datetime):
+                value = value.isoformat()
+            row.append("" if value is None else value)
+        writer.writerow(row)
+        yield flush()
+
+def sse_event(data: Any, event: Optional[str] = None) -> str:
+    """Format one Server-Sent Events message"""
+    message = f"event: {event}\n" if event else ""
+    return message + f"data: {json.dumps(data, default=_export_value)}\n\n"
+
+async def get_current_user_id(authorization: Optional[str] = Header(None)) -> str:
+    """Auth dependency: the verified subject of the bearer token, or the demo user if none was sent"""
     if not authorization:
-        # For demo purposes, return a mock user ID
-        return "demo-user-123"
+        if ALLOW_DEMO_USER:
+            return DEMO_USER_ID
+        raise HTTPException(status_code=401, detail="Missing bearer token", headers={"WWW-Authenticate": "Bearer"})
+    
+    scheme, _, token = authorization.partition(" ")
+    if scheme.lower() != "bearer" or not token:
+        raise HTTPException(status_code=401, detail="Invalid authorization header", headers={"WWW-Authenticate": "Bearer"})
     
+    start = time.perf_counter()
     try:
-        token = authorization.replace("Bearer ", "")
-        jwt_secret = os.environ.get('SUPABASE_JWT_SECRET', 'demo-secret')
-        payload = jwt.decode(token, jwt_secret, algorithms=["HS256"], options={"verify_signature": False})
-        return payload.get("sub", "demo-user-123")
-    except Exception as e:
-        logger.error(f"JWT decode error: {e}")
-        return "demo-user-123"
+        claims = token_verifier.verify(token)
+    except InvalidTokenError as e:
+        AUTH_VERIFY_SECONDS.observe("invalid", value=time.perf_counter() - start)
+        logger.warning(f"JWT verification failed: {e}")
+        raise HTTPException(status_code=401, detail="Invalid or expired token", headers={"WWW-Authenticate": "Bearer"})
+    
+    AUTH_VERIFY_SECONDS.observe("valid", value=time.perf_counter() - start)
+    
+    if not claims.get("sub"):
+        raise HTTPException(status_code=401, detail="Token has no subject", headers={"WWW-Authenticate": "Bearer"})
+    return claims["sub"]
+
+async def require_admin(user_id: str = Depends(get_current_user_id)) -> str:
+    """Auth dependency for admin data and maintenance endpoints: the caller must be listed in ADMIN_USER_IDS"""
+    if user_id not in ADMIN_USER_IDS:
+        raise HTTPException(status_code=403, detail="Admin access required")
+    return user_id
+
+# ==================== LLM Gateway ====================
+
+_llm_sdk: Optional[Any] = None
+_llm_sdk_checked = False
+
+def load_llm_sdk() -> Optional[Any]:
+    """Import emergentintegrations on first use, returning its chat module or None if it isn't installed"""
+    global _llm_sdk, _llm_sdk_checked
+    if not _llm_sdk_checked:
+        try:
+            from emergentintegrations.llm import chat
+            _llm_sdk = chat
+            logger.info("emergentintegrations loaded successfully")
+        except ImportError:
+            logger.warning("emergentintegrations not available, using mock AI")
+        _llm_sdk_checked = True
+    return _llm_sdk
+
+def llm_available() -> bool:
+    return load_llm_sdk() is not None
+
+async def call_gemini(system_message: str, prompt: str) -> Any:
+    """Send a single prompt to Gemini in a fresh chat session"""
+    sdk = load_llm_sdk()
+    # LlmChat keeps per-session message history, so sessions are never shared between requests
+    chat = sdk.LlmChat(
+        api_key=GEMINI_API_KEY,
+        session_id=f"seeforge_{uuid.uuid4()}",
+        system_message=system_message
+    ).with_model(LLM_PROVIDER, LLM_MODEL)
+    
+    return await chat.send_message(sdk.UserMessage(text=prompt))
+
+llm_gateway = LLMGateway(
+    call_gemini,
+    max_concurrency=LLM_MAX_CONCURRENCY,
+    timeout=LLM_TIMEOUT,
+    retries=LLM_RETRIES,
+    backoff_base=LLM_BACKOFF,
+    breaker=CircuitBreaker(LLM_BREAKER_THRESHOLD, LLM_BREAKER_RESET)
+)
+
+async def complete_llm(operation: str, system_message: str, prompt: str) -> Any:
+    """Send one prompt through the gateway, recording its latency and outcome"""
+    start = time.perf_counter()
+    outcome = "error"
+    try:
+        response = await llm_gateway.complete(system_message, prompt)
+        outcome = "success"
+        return response
+    except asyncio.CancelledError:
+        outcome = "cancelled"
+        raise
+    finally:
+        LLM_CALL_SECONDS.observe(operation, outcome, value=time.perf_counter() - start)
+        LLM_CALLS.inc(operation, outcome)
 
 async def generate_ai_scaffold(project_config: Dict[str, Any]) -> Dict[str, Any]:
     """Generate project scaffold using Gemini API with fallback"""
     try:
-        if not HAS_EMERGENT:
+        if not llm_available():
             # Return mock data if emergentintegrations is not available
             return {
                 "scaffold": {
@@ -221,18 +670,9 @@ async def generate_ai_scaffold(project_config: Dict[str, Any]) -> Dict[str, Any]
                 "timestamp": datetime.now(timezone.utc).isoformat()
             }
         
-        # Get API key from environment
-        api_key = os.environ.get('GEMINI_API_KEY', '')
-        if not api_key:
+        if not GEMINI_API_KEY:
             raise ValueError("GEMINI_API_KEY not found")
         
-        # Create LlmChat instance
-        chat = LlmChat(
-            api_key=api_key,
-            session_id=f"project_{uuid.uuid4()}",
-            system_message="You are an expert full-stack developer who generates complete project scaffolds with file structures and code."
-        ).with_model("gemini", "gemini-2.0-flash")
-        
         # Create prompt
         prompt = f"""
 Generate a complete project scaffold for the following requirements:
@@ -257,8 +697,11 @@ Provide a JSON response with the following structure:
 }}
 """
         
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
+        response = await complete_llm(
+            "scaffold",
+            "You are an expert full-stack developer who generates complete project scaffolds with file structures and code.",
+            prompt
+        )
         
         return {
             "scaffold": response,
@@ -267,6 +710,7 @@ Provide a JSON response with the following structure:
         }
     except Exception as e:
         logger.error(f"AI scaffold generation error: {e}")
+        LLM_CALLS.inc("scaffold", "fallback")
         # Return mock data on error
         return {
             "scaffold": {
@@ -282,71 +726,170 @@ Provide a JSON response with the following structure:
             "error": str(e)
         }
 
-def calculate_pricing(project_data: Dict[str, Any]) -> Dict[str, Any]:
-    """Calculate project pricing based on selections"""
-    base_prices = {
-        "Idea Spark": 1499,
-        "Starter": 3000,
-        "MVP Launch": 6000,
-        "Growth": 12000,
-        "AI Pro": 20000
-    }
-    
-    addon_prices = {
-        "Custom Domain Setup": 499,
-        "Logo + Branding Pack": 799,
-        "SEO Optimization": 999,
-        "AI Assistant Integration": 1499,
-        "Hosting Extension": 199,
-        "Maintenance Support": 999,
-        "Analytics Dashboard": 499,
-        "Auth": 0,
-        "Payments": 500,
-        "Admin Panel": 1500,
-        "Multi-language": 800,
-        "Chat Support": 1200,
-        "Data Migration": 2000
-    }
-    
-    # Calculate base cost
-    base_cost = base_prices.get(project_data.get('tier', 'Starter'), 3000)
-    
-    # Calculate addons cost
-    addons_cost = sum(addon_prices.get(addon, 0) for addon in project_data.get('addons', []))
+# Only successful generations are cached; fallbacks should be retried
+scaffold_cache = ScaffoldCache(
+    max_entries=SCAFFOLD_CACHE_SIZE,
+    ttl_seconds=SCAFFOLD_CACHE_TTL,
+    disk_dir=SCAFFOLD_CACHE_DIR,
+    cacheable=lambda result: result.get("status") == "generated"
+)
+
+scaffold_blobs = (
+    FileBlobStore(SCAFFOLD_BLOB_DIR, max_age_seconds=SCAFFOLD_BLOB_TTL or None) if SCAFFOLD_BLOB_DIR
+    else InMemoryBlobStore(max_bytes=SCAFFOLD_BLOB_MAX_BYTES)
+)
+
+# Chunk summaries keyed by blob hashes, and finished analyses keyed by commit and requirements
+repo_summary_cache = ScaffoldCache(
+    max_entries=REPO_SUMMARY_CACHE_SIZE,
+    ttl_seconds=REPO_SUMMARY_CACHE_TTL,
+    disk_dir=REPO_SUMMARY_CACHE_DIR
+)
+
+repo_analyzer = RepoAnalyzer(
+    lambda system_message, prompt: complete_llm("repo_analysis", system_message, prompt),
+    repo_summary_cache,
+    chunk_tokens=REPO_CHUNK_TOKENS,
+    max_tokens=REPO_MAX_TOKENS,
+    concurrency=REPO_SUMMARY_CONCURRENCY,
+    max_file_bytes=REPO_MAX_FILE_BYTES
+)
+
+async def run_repo_analysis(repo_url: str, requirements: str) -> Dict[str, Any]:
+    """Analyze a repository against the requested changes using Gemini.
+
+    Local checkouts (file:// under REPO_INGEST_ROOTS) are read and summarized
+    so the model sees the code; other URLs are analyzed from the URL alone.
+    """
+    local_path = resolve_local_source(repo_url, REPO_INGEST_ROOTS)
+    if not llm_available():
+        return {
+            "analysis": "Mock analysis: Your repository looks good! We can add new features and improve performance.",
+            "base_cost": 700,
+            "status": "completed",
+            "suggestions": [
+                "Add user authentication",
+                "Improve code structure", 
+                "Add responsive design",
+                "Enhance performance"
+            ]
+        }
     
-    # Calculate features cost
-    features_cost = sum(addon_prices.get(feature, 0) for feature in project_data.get('features', []))
+    if local_path is not None:
+        result = await repo_analyzer.analyze(local_path, repo_url, requirements)
+        return {**result, "base_cost": 700, "status": "completed"}
     
-    total = base_cost + addons_cost + features_cost
+    prompt = f"""
+Analyze the GitHub repository at {repo_url} and provide enhancement suggestions based on these requirements:
+
+{requirements}
+
+Provide:
+1. Current tech stack analysis
+2. Suggested improvements
+3. New features to add
+4. Code quality recommendations
+5. Estimated cost for enhancements (base: ₹700)
+6. Timeline estimate
+"""
     
-    # Apply student discount if applicable
-    if project_data.get('is_student', False):
-        total = total * 0.85  # 15% discount
+    response = await complete_llm("repo_analysis", "You are an expert code reviewer and full-stack developer.", prompt)
     
     return {
-        "base_cost": base_cost,
-        "addons_cost": addons_cost,
-        "features_cost": features_cost,
-        "total_cost": round(total),
-        "currency": "INR"
+        "analysis": response,
+        "base_cost": 700,
+        "status": "completed"
     }
 
+pricing_engine = PricingEngine()
+
+def calculate_pricing(project_data: Dict[str, Any]) -> Dict[str, Any]:
+    """Calculate project pricing based on selections"""
+    return pricing_engine.quote(project_data)
+
+async def reload_pricing() -> Dict[str, Any]:
+    """Reload price tables from PRICING_CONFIG, else from Mongo; keep current tables if neither has any"""
+    if PRICING_CONFIG:
+        tables = pricing_engine.load_file(PRICING_CONFIG)
+    elif HAS_MONGO:
+        tables = await pricing_engine.load_mongo(db.pricing) or pricing_engine.tables
+    else:
+        tables = pricing_engine.tables
+    return tables.to_dict()
+
+# ==================== Background Jobs ====================
+
+# connect_mongo moves the queue onto MongoJobStore before the workers start
+job_queue = JobQueue(
+    InMemoryJobStore(JOB_RETENTION),
+    concurrency=JOB_CONCURRENCY,
+    max_queued=JOB_QUEUE_SIZE,
+    lease_seconds=JOB_LEASE_SECONDS,
+    retention_seconds=JOB_TTL
+)
+
+async def run_scaffold_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await scaffold_cache.get_or_generate(payload['project_config'], generate_ai_scaffold)
+
+async def run_repo_analysis_job(payload: Dict[str, Any]) -> Dict[str, Any]:
+    return await run_repo_analysis(payload['repo_url'], payload['requirements'])
+
+job_queue.register("generate_scaffold", run_scaffold_job)
+job_queue.register("analyze_repo", run_repo_analysis_job)
+
+# ==================== Admission Control ====================
+
+rate_limit_backend: RateLimitBackend = InMemoryRateLimitBackend()
+
+def admission(route_class: str):
+    """Route dependency: shed LLM work when overloaded, then apply the caller's token bucket for route_class"""
+    async def check(request: Request, user_id: str = Depends(get_current_user_id)) -> None:
+        if route_class == "llm" and llm_gateway.load >= LLM_SHED_THRESHOLD:
+            ADMISSION_REJECTIONS.inc(route_class, "shed")
+            raise HTTPException(
+                status_code=503,
+                detail="AI service is at capacity, try again shortly",
+                headers={"Retry-After": str(LLM_SHED_RETRY_AFTER)}
+            )
+        limit = RATE_LIMITS[route_class]
+        if limit is None:
+            return
+        
+        # Anonymous callers all share the demo user id, so tell them apart by address
+        if user_id == DEMO_USER_ID:
+            identity = f"ip:{request.client.host if request.client else 'unknown'}"
+        else:
+            identity = f"user:{user_id}"
+        try:
+            retry_after = await rate_limit_backend.acquire(f"{route_class}:{identity}", limit)
+        except Exception as e:
+            # Fail open: a rate limiter outage shouldn't take the API down with it
+            logger.error(f"Rate limiter unavailable: {e}")
+            return
+        if retry_after > 0:
+            ADMISSION_REJECTIONS.inc(route_class, "rate_limited")
+            raise HTTPException(
+                status_code=429,
+                detail="Too many requests",
+                headers={"Retry-After": str(max(1, math.ceil(retry_after)))}
+            )
+    
+    return check
+
 # ==================== Routes ====================
 
 @api_router.get("/")
 async def root():
-    return {"message": "SeeForge API", "version": "1.0.0", "status": "running", "database": HAS_MONGO, "ai": HAS_EMERGENT}
+    return {"message": "SeeForge API", "version": "1.0.0", "status": "running", "database": STORAGE_BACKEND != "memory", "storage": STORAGE_BACKEND, "ai": llm_available()}
 
 # ==================== Projects Routes ====================
 
-@api_router.post("/projects", response_model=Project)
+@api_router.post("/projects", response_model=Project, dependencies=[Depends(admission("write"))])
 async def create_project(
     project: ProjectCreate,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Create a new project"""
-    user_id = get_current_user_id(authorization)
-    
     # Calculate pricing
     pricing = calculate_pricing(project.model_dump())
     
@@ -357,221 +900,451 @@ async def create_project(
         estimated_timeline="2-3 weeks"
     )
     
-    if HAS_MONGO:
-        doc = project_obj.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        doc['updated_at'] = doc['updated_at'].isoformat()
-        
-        await db.projects.insert_one(doc)
-    else:
-        # Store in demo data
-        demo_projects.append(project_obj.model_dump())
+    await project_repo.insert(project_obj.model_dump())
     
     return project_obj
 
-@api_router.get("/projects", response_model=List[Project])
-async def get_projects(authorization: Optional[str] = Header(None)):
-    """Get all projects for authenticated user"""
-    user_id = get_current_user_id(authorization)
+@api_router.post("/projects/bulk", dependencies=[Depends(admission("write"))])
+async def bulk_projects(request: BulkProjectRequest, user_id: str = Depends(get_current_user_id)):
+    """Create, update and delete many projects in one request"""
+    if len(request.operations) > BULK_MAX_OPERATIONS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_OPERATIONS} operations per request")
     
-    if HAS_MONGO:
-        projects = await db.projects.find({"user_id": user_id}, {"_id": 0}).to_list(1000)
-        
-        for project in projects:
-            if isinstance(project.get('created_at'), str):
-                project['created_at'] = datetime.fromisoformat(project['created_at'])
-            if isinstance(project.get('updated_at'), str):
-                project['updated_at'] = datetime.fromisoformat(project['updated_at'])
-        
-        return projects
-    else:
-        # Filter projects by user_id from demo data
-        user_projects = [p for p in demo_projects if p.get('user_id') == user_id]
-        return user_projects
+    # Price every create in one pass
+    creates = [op.project.model_dump() for op in request.operations if op.op == "create"]
+    quotes = iter(pricing_engine.quote_batch(creates))
+    
+    now = datetime.now(timezone.utc)
+    operations = []
+    for op in request.operations:
+        if op.op == "create":
+            project_obj = Project(
+                **op.project.model_dump(),
+                user_id=user_id,
+                estimated_cost=next(quotes)['total_cost'],
+                estimated_timeline="2-3 weeks"
+            )
+            operations.append({"op": "insert", "doc": project_obj.model_dump()})
+        elif op.op == "update":
+            operations.append({"op": "update", "id": op.id, "updates": {**op.updates.model_dump(exclude_unset=True), "updated_at": now}})
+        else:
+            operations.append({"op": "delete", "id": op.id})
+    
+    results = await project_repo.bulk_write(user_id, operations, ordered=request.ordered)
+    
+    summary: Dict[str, int] = {}
+    for result in results:
+        summary[result['status']] = summary.get(result['status'], 0) + 1
+    
+    return {"results": results, "summary": summary}
 
-@api_router.get("/projects/{project_id}", response_model=Project)
-async def get_project(project_id: str, authorization: Optional[str] = Header(None)):
-    """Get a specific project"""
-    user_id = get_current_user_id(authorization)
+@api_router.get("/projects", response_model=ProjectPage, dependencies=[Depends(admission("read"))])
+async def get_projects(
+    limit: Optional[int] = Query(None, ge=1, le=PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    filters: SearchFilters = Depends(project_search_filters),
+    facets: bool = Query(False, description="Include the total and facet counts over all matches"),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get a page of projects for authenticated user, ordered by creation time and optionally filtered"""
+    async def list_page(page_limit, after, descending):
+        return await project_repo.search(user_id, filters, page_limit, after, descending)
     
-    if HAS_MONGO:
-        project = await db.projects.find_one({"id": project_id, "user_id": user_id}, {"_id": 0})
+    if facets:
+        page, counts = await asyncio.gather(
+            fetch_project_page(list_page, limit, cursor, order),
+            project_repo.facet_counts(user_id, filters)
+        )
+        page.update(counts)
     else:
-        project = next((p for p in demo_projects if p['id'] == project_id and p.get('user_id') == user_id), None)
+        page = await fetch_project_page(list_page, limit, cursor, order)
+    
+    return project_page_response(page)
+
+@api_router.get("/projects/{project_id}", response_model=Project, dependencies=[Depends(admission("read"))])
+async def get_project(
+    project_id: str,
+    response: Response,
+    if_none_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
+):
+    """Get a specific project"""
+    project = await project_repo.get(user_id, project_id)
     
     if not project:
         raise HTTPException(status_code=404, detail="Project not found")
     
-    if isinstance(project.get('created_at'), str):
-        project['created_at'] = datetime.fromisoformat(project['created_at'])
-    if isinstance(project.get('updated_at'), str):
-        project['updated_at'] = datetime.fromisoformat(project['updated_at'])
+    if etag_matches(if_none_match, project_etag(project)):
+        return Response(status_code=304, headers={"ETag": project_etag(project)})
     
-    return Project(**project)
+    return project_response(project, response)
 
-@api_router.put("/projects/{project_id}", response_model=Project)
+@api_router.put("/projects/{project_id}", response_model=Project, dependencies=[Depends(admission("write"))])
 async def update_project(
     project_id: str,
-    updates: Dict[str, Any] = Body(...),
-    authorization: Optional[str] = Header(None)
+    updates: ProjectUpdate,
+    response: Response,
+    if_match: Optional[str] = Header(None),
+    user_id: str = Depends(get_current_user_id)
 ):
-    """Update a project"""
-    user_id = get_current_user_id(authorization)
-    
-    updates['updated_at'] = datetime.now(timezone.utc)
+    """Update a project; with If-Match, only if it is still at that version"""
+    expected_version = parse_if_match(if_match)
+    fields = updates.model_dump(exclude_unset=True)
+    fields['updated_at'] = datetime.now(timezone.utc)
     
-    if HAS_MONGO:
-        result = await db.projects.update_one(
-            {"id": project_id, "user_id": user_id},
-            {"$set": updates}
+    try:
+        updated_project = await project_repo.update(user_id, project_id, fields, expected_version)
+    except VersionConflictError as e:
+        raise HTTPException(
+            status_code=412,
+            detail="Project was modified by another request",
+            headers={"ETag": f'"v{e.current_version}"'}
         )
-        
-        if result.matched_count == 0:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        updated_project = await db.projects.find_one({"id": project_id}, {"_id": 0})
-    else:
-        project_index = next((i for i, p in enumerate(demo_projects) if p['id'] == project_id and p.get('user_id') == user_id), -1)
-        if project_index == -1:
-            raise HTTPException(status_code=404, detail="Project not found")
-        
-        demo_projects[project_index].update(updates)
-        updated_project = demo_projects[project_index]
     
-    if isinstance(updated_project.get('created_at'), str):
-        updated_project['created_at'] = datetime.fromisoformat(updated_project['created_at'])
-    if isinstance(updated_project.get('updated_at'), str):
-        updated_project['updated_at'] = datetime.fromisoformat(updated_project['updated_at'])
+    if not updated_project:
+        raise HTTPException(status_code=404, detail="Project not found")
     
-    return Project(**updated_project)
+    return project_response(updated_project, response)
 
-@api_router.delete("/projects/{project_id}")
-async def delete_project(project_id: str, authorization: Optional[str] = Header(None)):
+@api_router.delete("/projects/{project_id}", dependencies=[Depends(admission("write"))])
+async def delete_project(project_id: str, user_id: str = Depends(get_current_user_id)):
     """Delete a project"""
-    user_id = get_current_user_id(authorization)
+    deleted = await project_repo.delete(user_id, project_id)
     
-    if HAS_MONGO:
-        result = await db.projects.delete_one({"id": project_id, "user_id": user_id})
-    else:
-        result = type('obj', (object,), {'deleted_count': 0})()
-        demo_projects[:] = [p for p in demo_projects if not (p['id'] == project_id and p.get('user_id') == user_id)]
-        result.deleted_count = 1
-    
-    if getattr(result, 'deleted_count', 0) == 0:
+    if not deleted:
         raise HTTPException(status_code=404, detail="Project not found")
     
     return {"message": "Project deleted successfully"}
 
+# ==================== Project Events Routes ====================
+
+def project_event_payload(event_type: str, project: Optional[Dict[str, Any]], project_id: str) -> Dict[str, Any]:
+    return {
+        "type": event_type,
+        "project_id": project_id,
+        "project": trim_to_fields([project], PROJECT_FIELDS, PROJECT_DEFAULTS)[0] if project is not None else None
+    }
+
+async def project_event_stream(subscription: Subscription, project: Dict[str, Any]) -> AsyncIterator[Optional[Dict[str, Any]]]:
+    """Yield a snapshot of the project, then each change until it is deleted; None whenever a heartbeat is due"""
+    yield project_event_payload("snapshot", project, project['id'])
+    version = project.get('version', 0)
+    while True:
+        event = await subscription.get(SSE_HEARTBEAT_SECONDS)
+        if event is None:
+            yield None
+            continue
+        if event['type'] == EVENT_UPDATED:
+            # Skip changes the snapshot (or a newer event) already reflects
+            if event['project'].get('version', 0) <= version:
+                continue
+            version = event['project'].get('version', 0)
+        yield project_event_payload(event['type'], event['project'], event['project_id'])
+        if event['type'] == EVENT_DELETED:
+            return
+
+async def open_project_subscription(project_id: str, user_id: str):
+    """Subscribe, then read the project, so no change can slip between the snapshot and the stream"""
+    try:
+        subscription = project_events.subscribe(project_id)
+    except TooManySubscribersError:
+        raise HTTPException(status_code=503, detail="Too many open subscriptions", headers={"Retry-After": "30"})
+    project = await project_repo.get(user_id, project_id)
+    if not project:
+        subscription.close()
+        raise HTTPException(status_code=404, detail="Project not found")
+    return subscription, project
+
+@api_router.get("/projects/{project_id}/events", dependencies=[Depends(admission("read"))])
+async def stream_project_events(project_id: str, user_id: str = Depends(get_current_user_id)):
+    """Stream the project and then its changes (status, deployed_url, ...) as Server-Sent Events"""
+    subscription, project = await open_project_subscription(project_id, user_id)
+    
+    async def events():
+        async for payload in project_event_stream(subscription, project):
+            if payload is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield sse_event(payload, event=payload['type'])
+    
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+        # Runs however the stream ends, including a client that leaves before the first event
+        background=BackgroundTask(subscription.close)
+    )
+
+@api_router.websocket("/projects/{project_id}/ws")
+async def project_events_websocket(websocket: WebSocket, project_id: str, token: Optional[str] = None):
+    """The same project snapshot and changes as /events over a WebSocket; browsers pass the JWT as ?token="""
+    authorization = websocket.headers.get("authorization") or (f"Bearer {token}" if token else None)
+    try:
+        user_id = await get_current_user_id(authorization)
+        subscription, project = await open_project_subscription(project_id, user_id)
+    except HTTPException as e:
+        await websocket.close(code=1013 if e.status_code == 503 else 1008, reason=str(e.detail))
+        return
+    
+    with subscription:
+        await websocket.accept()
+        # Clients don't send anything; reading is how a closed connection is noticed between events
+        receiver = asyncio.create_task(websocket.receive())
+        try:
+            async for payload in project_event_stream(subscription, project):
+                if receiver.done():
+                    break
+                await websocket.send_text(json.dumps(payload or {"type": "heartbeat"}, default=_export_value))
+            else:
+                await websocket.close()
+        except WebSocketDisconnect:
+            pass
+        finally:
+            receiver.cancel()
+
 # ==================== AI Generation Routes ====================
 
-@api_router.post("/ai/generate-scaffold")
+@api_router.post("/ai/generate-scaffold", dependencies=[Depends(admission("llm"))])
 async def generate_scaffold(
     request: AIScaffoldRequest,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Generate AI scaffold for project"""
-    user_id = get_current_user_id(authorization)
-    
-    scaffold = await generate_ai_scaffold(request.project_config)
+    scaffold = await scaffold_cache.get_or_generate(request.project_config, generate_ai_scaffold)
     
     return scaffold
 
-@api_router.post("/ai/analyze-repo")
+def parse_scaffold(scaffold: Any) -> Optional[Dict[str, Any]]:
+    """Return the scaffold as a dict, parsing LLM text (optionally in a ```json fence) if needed"""
+    if isinstance(scaffold, dict):
+        return scaffold
+    if not isinstance(scaffold, str):
+        return None
+    fenced = re.search(r"```(?:json)?\s*(.*?)```", scaffold, re.DOTALL)
+    text = fenced.group(1) if fenced else scaffold
+    try:
+        parsed = json.loads(text)
+    except ValueError:
+        return None
+    return parsed if isinstance(parsed, dict) else None
+
+async def stream_scaffold_events(project_config: Dict[str, Any]) -> AsyncIterator[str]:
+    """Generate a scaffold and emit it piece by piece as Server-Sent Events"""
+    yield sse_event({"status": "started"}, event="started")
+    
+    # The generation keeps running if the client leaves, so its result still lands in the cache
+    generation = asyncio.ensure_future(scaffold_cache.get_or_generate(project_config, generate_ai_scaffold))
+    while True:
+        done, _ = await asyncio.wait({generation}, timeout=SSE_HEARTBEAT_SECONDS)
+        if done:
+            break
+        yield ": heartbeat\n\n"
+    result = generation.result()
+    
+    scaffold = parse_scaffold(result.get("scaffold"))
+    if scaffold is None:
+        # Unstructured model output: pass it through whole
+        yield sse_event({"content": result.get("scaffold")}, event="raw")
+    else:
+        for entry in scaffold.get("file_structure", []):
+            yield sse_event({"path": entry}, event="file_structure")
+        for path, content in (scaffold.get("key_files") or {}).items():
+            yield sse_event({"path": path, "content": content}, event="key_file")
+        yield sse_event({
+            "setup_instructions": scaffold.get("setup_instructions", []),
+            "estimated_time": scaffold.get("estimated_time")
+        }, event="setup")
+    
+    yield sse_event({k: v for k, v in result.items() if k != "scaffold"}, event="done")
+
+@api_router.post("/ai/generate-scaffold/stream", dependencies=[Depends(admission("llm"))])
+async def generate_scaffold_stream(
+    request: AIScaffoldRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Generate AI scaffold for project, streamed as Server-Sent Events"""
+    return StreamingResponse(
+        stream_scaffold_events(request.project_config),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+def scaffold_zip_response(manifest_id: str, manifest: Dict[str, Any]) -> StreamingResponse:
+    return StreamingResponse(
+        stream_zip(scaffold_blobs, manifest),
+        media_type="application/zip",
+        headers={
+            "Content-Disposition": f'attachment; filename="{manifest["name"]}.zip"',
+            "X-Scaffold-Id": manifest_id
+        }
+    )
+
+@api_router.post("/ai/generate-scaffold/zip", dependencies=[Depends(admission("llm"))])
+async def generate_scaffold_zip(
+    request: AIScaffoldRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Generate AI scaffold for project and download it as a ZIP archive.
+
+    X-Scaffold-Id names the stored scaffold for GET /ai/scaffolds/{id}/zip,
+    which serves it only to the same user until the blob store expires it.
+    """
+    result = await scaffold_cache.get_or_generate(request.project_config, generate_ai_scaffold)
+    manifest_id = await store_scaffold(
+        scaffold_blobs,
+        user_id,
+        parse_scaffold(result.get("scaffold")),
+        raw=result.get("scaffold"),
+        name=str(request.project_config.get("name") or "scaffold")
+    )
+    try:
+        manifest = await load_manifest(scaffold_blobs, manifest_id, user_id)
+    except KeyError:
+        # Only when this one scaffold is larger than the whole in-memory store
+        raise HTTPException(status_code=507, detail="Scaffold too large to archive")
+    return scaffold_zip_response(manifest_id, manifest)
+
+@api_router.get("/ai/scaffolds/{scaffold_id}/zip", dependencies=[Depends(admission("read"))])
+async def download_scaffold_zip(scaffold_id: str, user_id: str = Depends(get_current_user_id)):
+    """Download a scaffold the caller generated earlier as a ZIP archive; 404 if expired or someone else's"""
+    try:
+        if not is_digest(scaffold_id):
+            raise KeyError(scaffold_id)
+        manifest = await load_manifest(scaffold_blobs, scaffold_id, user_id)
+    except KeyError:
+        raise HTTPException(status_code=404, detail="Scaffold not found")
+    return scaffold_zip_response(scaffold_id, manifest)
+
+@api_router.post("/ai/analyze-repo", dependencies=[Depends(admission("llm"))])
 async def analyze_github_repo(
     request: GithubRepoAnalysis,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Analyze GitHub repository and provide enhancement suggestions"""
-    user_id = get_current_user_id(authorization)
-    
     try:
-        if not HAS_EMERGENT:
-            return {
-                "analysis": "Mock analysis: Your repository looks good! We can add new features and improve performance.",
-                "base_cost": 700,
-                "status": "completed",
-                "suggestions": [
-                    "Add user authentication",
-                    "Improve code structure", 
-                    "Add responsive design",
-                    "Enhance performance"
-                ]
-            }
-        
-        # Create LlmChat instance
-        api_key = os.environ.get('GEMINI_API_KEY', '')
-        chat = LlmChat(
-            api_key=api_key,
-            session_id=f"repo_analysis_{uuid.uuid4()}",
-            system_message="You are an expert code reviewer and full-stack developer."
-        ).with_model("gemini", "gemini-2.0-flash")
-        
-        prompt = f"""
-Analyze the GitHub repository at {request.repo_url} and provide enhancement suggestions based on these requirements:
-
-{request.requirements}
-
-Provide:
-1. Current tech stack analysis
-2. Suggested improvements
-3. New features to add
-4. Code quality recommendations
-5. Estimated cost for enhancements (base: ₹700)
-6. Timeline estimate
-"""
-        
-        user_message = UserMessage(text=prompt)
-        response = await chat.send_message(user_message)
-        
-        return {
-            "analysis": response,
-            "base_cost": 700,
-            "status": "completed"
-        }
+        return await run_repo_analysis(request.repo_url, request.requirements)
+    except (CircuitOpenError, LLMBusyError) as e:
+        retry_after = getattr(e, 'retry_after', LLM_BREAKER_RESET)
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(max(1, round(retry_after)))})
+    except RepoIngestionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
     except Exception as e:
         logger.error(f"Repo analysis error: {e}")
         raise HTTPException(status_code=500, detail=str(e))
 
+@api_router.get("/ai/status")
+async def get_ai_status():
+    """Report LLM gateway health: circuit state, concurrency and call counters"""
+    return {"ai": llm_available(), **llm_gateway.state()}
+
+# ==================== Job Routes ====================
+
+async def get_owned_job(job_id: str, user_id: str) -> Dict[str, Any]:
+    job = await job_queue.get(job_id)
+    if not job or job.get('user_id') != user_id:
+        raise HTTPException(status_code=404, detail="Job not found")
+    return job
+
+async def submit_job(kind: str, payload: Dict[str, Any], user_id: str) -> Dict[str, Any]:
+    try:
+        job = await job_queue.submit(kind, payload, user_id)
+    except QueueFullError:
+        raise HTTPException(status_code=503, detail="Job queue is full, try again later")
+    return {"job_id": job['id'], "status": job['status']}
+
+@api_router.post("/jobs/generate-scaffold", status_code=202, dependencies=[Depends(admission("llm"))])
+async def submit_scaffold_job(
+    request: AIScaffoldRequest,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Queue AI scaffold generation and return its job id immediately"""
+    return await submit_job("generate_scaffold", request.model_dump(), user_id)
+
+@api_router.post("/jobs/analyze-repo", status_code=202, dependencies=[Depends(admission("llm"))])
+async def submit_repo_analysis_job(
+    request: GithubRepoAnalysis,
+    user_id: str = Depends(get_current_user_id)
+):
+    """Queue a repository analysis and return its job id immediately"""
+    try:
+        # Reject unreadable sources now rather than as a failed job
+        resolve_local_source(request.repo_url, REPO_INGEST_ROOTS)
+    except RepoIngestionError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    return await submit_job("analyze_repo", request.model_dump(), user_id)
+
+@api_router.get("/jobs/{job_id}")
+async def get_job(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Get the status, and once finished the result, of a job"""
+    return await get_owned_job(job_id, user_id)
+
+@api_router.get("/jobs/{job_id}/events")
+async def stream_job_events(job_id: str, user_id: str = Depends(get_current_user_id)):
+    """Stream job status changes as Server-Sent Events until the job finishes"""
+    await get_owned_job(job_id, user_id)
+    
+    async def events():
+        async for update in job_queue.subscribe(job_id, poll_interval=SSE_HEARTBEAT_SECONDS):
+            if update is None:
+                yield ": heartbeat\n\n"
+            else:
+                yield sse_event(update, event=update['status'])
+    
+    return StreamingResponse(events(), media_type="text/event-stream", headers={"Cache-Control": "no-cache"})
+
 # ==================== Templates Routes ====================
 
 @api_router.get("/templates", response_model=List[Template])
-async def get_templates():
-    """Get all available templates"""
+async def get_templates(
+    filters: SearchFilters = Depends(template_search_filters),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Get all available templates, optionally filtered"""
     try:
-        if HAS_MONGO:
-            templates = await db.templates.find({}, {"_id": 0}).to_list(1000)
-            
-            for template in templates:
-                if isinstance(template.get('created_at'), str):
-                    template['created_at'] = datetime.fromisoformat(template['created_at'])
-            
-            return templates
-        else:
-            # Return demo data if no database
-            return demo_templates
+        snapshot = await template_catalog.snapshot()
     except Exception as e:
         logger.error(f"Templates fetch error: {e}")
-        return demo_templates
+        return [t for t in demo_templates if matches(TEMPLATE_SEARCH, t, filters)]
+    
+    if not filters.active:
+        return cached_json_response(snapshot.list_body, snapshot.list_etag, if_none_match)
+    # Filtered lists are stitched from the pre-serialized item bodies
+    body = b"[" + b",".join(snapshot.item_bodies[t['id']] for t in filter_templates(snapshot, filters)) + b"]"
+    return cached_json_response(body, make_etag(body), if_none_match)
+
+@api_router.get("/templates/search", response_model=TemplateSearchResult)
+async def search_templates(
+    filters: SearchFilters = Depends(template_search_filters),
+    if_none_match: Optional[str] = Header(None)
+):
+    """Filtered templates with the total and facet counts (category, features, tech, price range)"""
+    try:
+        snapshot = await template_catalog.snapshot()
+    except Exception as e:
+        logger.error(f"Template search error: {e}")
+        raise HTTPException(status_code=500, detail="Error searching templates")
+    
+    selected = filter_templates(snapshot, filters)
+    items = b",".join(snapshot.item_bodies[t['id']] for t in selected)
+    # {"templates":[...], "total": n, "facets": {...}}
+    body = b'{"templates":[' + items + b'],' + dumps(compute_facets(TEMPLATE_SEARCH, selected))[1:]
+    return cached_json_response(body, make_etag(body), if_none_match)
 
 @api_router.get("/templates/{template_id}", response_model=Template)
-async def get_template(template_id: str):
+async def get_template(template_id: str, if_none_match: Optional[str] = Header(None)):
     """Get a specific template"""
     try:
-        if HAS_MONGO:
-            template = await db.templates.find_one({"id": template_id}, {"_id": 0})
-        else:
-            template = next((t for t in demo_templates if t['id'] == template_id), None)
-        
-        if not template:
-            raise HTTPException(status_code=404, detail="Template not found")
-        
-        if isinstance(template.get('created_at'), str):
-            template['created_at'] = datetime.fromisoformat(template['created_at'])
-        
-        return Template(**template)
+        snapshot = await template_catalog.snapshot()
     except Exception as e:
         logger.error(f"Template fetch error: {e}")
         raise HTTPException(status_code=500, detail="Error fetching template")
+    
+    body = snapshot.item_bodies.get(template_id)
+    if body is None:
+        raise HTTPException(status_code=404, detail="Template not found")
+    
+    return cached_json_response(body, snapshot.item_etags[template_id], if_none_match)
 
 # ==================== Pricing Routes ====================
 
@@ -581,16 +1354,28 @@ async def calculate_project_pricing(project_data: Dict[str, Any] = Body(...)):
     pricing = calculate_pricing(project_data)
     return pricing
 
+@api_router.post("/pricing/calculate-batch")
+async def calculate_project_pricing_batch(request: PricingBatchRequest):
+    """Calculate pricing for many project configurations in one call"""
+    if len(request.configurations) > PRICING_BATCH_MAX:
+        raise HTTPException(status_code=400, detail=f"At most {PRICING_BATCH_MAX} configurations per batch")
+    
+    tables = pricing_engine.tables
+    return {"quotes": pricing_engine.quote_batch(request.configurations), "pricing_version": tables.version}
+
+@api_router.get("/pricing/tables")
+async def get_pricing_tables():
+    """Get the price tables currently in effect"""
+    return pricing_engine.tables.to_dict()
+
 # ==================== Payment Routes ====================
 
 @api_router.post("/payments/create-order")
 async def create_payment_order(
     order: PaymentOrder,
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Create Razorpay payment order"""
-    user_id = get_current_user_id(authorization)
-    
     # Mock response for development
     order_id = f"order_{uuid.uuid4()}"
     
@@ -604,11 +1389,9 @@ async def create_payment_order(
 @api_router.post("/payments/verify")
 async def verify_payment(
     payment_data: Dict[str, Any] = Body(...),
-    authorization: Optional[str] = Header(None)
+    user_id: str = Depends(get_current_user_id)
 ):
     """Verify Razorpay payment"""
-    user_id = get_current_user_id(authorization)
-    
     # Mock verification for development
     return {
         "status": "verified",
@@ -618,14 +1401,47 @@ async def verify_payment(
 # ==================== Admin Routes ====================
 
 @api_router.get("/admin/projects")
-async def admin_get_all_projects(authorization: Optional[str] = Header(None)):
-    """Admin: Get all projects"""
-    if HAS_MONGO:
-        projects = await db.projects.find({}, {"_id": 0}).to_list(1000)
-    else:
-        projects = demo_projects
+async def admin_get_all_projects(
+    limit: Optional[int] = Query(None, ge=1, le=PROJECTS_MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    order: str = Query("desc", pattern="^(asc|desc)$"),
+    authorization: Optional[str] = Header(None)
+):
+    """Admin: Get a page of all projects, ordered by creation time"""
+    page = await fetch_project_page(project_repo.list_all, limit, cursor, order)
+    
+    if FAST_SERIALIZATION:
+        return FastJSONResponse(page)
+    return page
+
+@api_router.get("/admin/projects/export")
+async def admin_export_projects(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$"),
+    admin_id: str = Depends(require_admin)
+):
+    """Admin: Stream every project as NDJSON or CSV"""
+    projects = project_repo.iter_all(EXPORT_BATCH_SIZE)
     
-    return projects
+    if format == "csv":
+        return StreamingResponse(
+            export_projects_csv(projects),
+            media_type="text/csv",
+            headers={"Content-Disposition": 'attachment; filename="projects.csv"'}
+        )
+    
+    return StreamingResponse(export_projects_ndjson(projects), media_type="application/x-ndjson")
+
+@api_router.post("/admin/pricing/reload")
+async def admin_reload_pricing(admin_id: str = Depends(require_admin)):
+    """Admin: Reload price tables from the config file or database; malformed tables are rejected and the current ones kept"""
+    try:
+        return await reload_pricing()
+    except ValidationError as e:
+        logger.error(f"Pricing reload rejected: {e}")
+        raise HTTPException(status_code=422, detail=e.errors(include_url=False, include_context=False))
+    except Exception as e:
+        logger.error(f"Pricing reload error: {e}")
+        raise HTTPException(status_code=500, detail=f"Pricing reload failed: {e}")
 
 @api_router.post("/admin/templates", response_model=Template)
 async def admin_create_template(
@@ -633,44 +1449,255 @@ async def admin_create_template(
     authorization: Optional[str] = Header(None)
 ):
     """Admin: Create a new template"""
-    if HAS_MONGO:
-        doc = template.model_dump()
-        doc['created_at'] = doc['created_at'].isoformat()
-        
-        await db.templates.insert_one(doc)
-    else:
-        demo_templates.append(template.model_dump())
+    await template_repo.insert(template.model_dump())
+    
+    template_catalog.invalidate()
     
     return template
 
-# Include the router in the main app
-app.include_router(api_router)
+@api_router.get("/admin/analytics")
+async def admin_get_analytics(
+    days: Optional[int] = Query(None, ge=1, le=366),
+    admin_id: str = Depends(require_admin)
+):
+    """Admin: Project counts and estimated cost by tier, category, status and day, plus addon popularity"""
+    return summarize(await analytics_store.counters(), days)
+
+async def rebuild_analytics() -> Dict[str, Any]:
+    """Recompute the analytics counters from the stored projects.
 
-# CORS middleware
-app.add_middleware(
-    CORSMiddleware,
-    allow_origins=["http://localhost:3000", "http://localhost:5173", "http://127.0.0.1:3000"],
-    allow_credentials=True,
-    allow_methods=["*"],
-    allow_headers=["*"],
-)
+    Project writes during the rebuild may be lost from or counted twice in
+    the result (see analytics.py); a later rebuild corrects them.
+    """
+    if isinstance(analytics_store, MongoAnalyticsStore):
+        counters = await analytics_store.rebuild(db.projects)
+    else:
+        counters = await rebuild_counters(project_repo.iter_all(EXPORT_BATCH_SIZE))
+        await analytics_store.replace(counters)
+    return counters
+
+@api_router.post("/admin/analytics/rebuild")
+async def admin_rebuild_analytics(admin_id: str = Depends(require_admin)):
+    """Admin: Rebuild the analytics counters from scratch, e.g. after writes that bypassed the API.
+
+    Scans every project, so run it rarely and while writes are quiet.
+    """
+    try:
+        return summarize(await rebuild_analytics())
+    except Exception as e:
+        logger.error(f"Analytics rebuild error: {e}")
+        raise HTTPException(status_code=500, detail=f"Analytics rebuild failed: {e}")
+
+# ==================== Health & Metrics ====================
+
+@api_router.get("/health/live")
+async def liveness():
+    """Liveness probe: the process is up and its event loop is serving requests"""
+    return {"status": "alive"}
+
+@api_router.get("/health/ready")
+async def readiness(request: Request):
+    """Readiness probe: startup has finished and the database answers a ping"""
+    settings: Settings = request.app.state.settings
+    checks = {"startup": request.app.state.ready}
+    if HAS_MONGO:
+        try:
+            await asyncio.wait_for(db.command("ping"), timeout=settings.readiness_timeout)
+            checks["mongo"] = True
+        except Exception as e:
+            logger.warning(f"Readiness ping failed: {e}")
+            checks["mongo"] = False
+    ready = all(checks.values())
+    return JSONResponse({"status": "ready" if ready else "not_ready", "checks": checks}, status_code=200 if ready else 503)
 
-@asynccontextmanager
-async def lifespan(app: FastAPI):
-    # Startup
+async def get_metrics(request: Request):
+    """Prometheus scrape endpoint, loopback-only unless METRICS_ALLOW_REMOTE is set"""
+    host = request.client.host if request.client else None
+    if not METRICS_ALLOW_REMOTE and host not in ("127.0.0.1", "::1", "localhost"):
+        raise HTTPException(status_code=403, detail="Metrics are only served to local clients")
+    return Response(metrics_registry.render(), media_type=Registry.content_type)
+
+# ==================== App Factory ====================
+
+def use_memory_storage() -> None:
+    """Point storage, analytics, rate limits and jobs at fresh in-memory stores.
+
+    Runs first in every startup, so an app never inherits the connections
+    or data of one built earlier in the same process (tests, benchmarks).
+    """
+    global client, db, HAS_MONGO, STORAGE_BACKEND, project_repo, template_repo, analytics_store, rate_limit_backend
+    global sqlite_db, project_change_stream
+    client = db = sqlite_db = project_change_stream = None
+    HAS_MONGO = False
+    STORAGE_BACKEND = "memory"
+    project_repo = InMemoryProjectRepository()
+    project_repo.add_listener(record_analytics)
+    project_repo.add_listener(project_events.publish)
+    template_repo = InMemoryTemplateRepository(list(demo_templates))
+    analytics_store = InMemoryAnalyticsStore()
+    rate_limit_backend = InMemoryRateLimitBackend()
+    job_queue.store = InMemoryJobStore(JOB_RETENTION)
+    template_catalog.invalidate()
+
+async def connect_mongo(settings: Settings) -> None:
+    """Create the Motor client and move storage and jobs onto MongoDB"""
+    global client, db, HAS_MONGO, STORAGE_BACKEND, project_repo, template_repo, analytics_store, rate_limit_backend
+    global project_change_stream
+    if not settings.mongo_url:
+        logger.info("No MONGO_URL configured, using in-memory storage")
+        return
+    try:
+        from motor.motor_asyncio import AsyncIOMotorClient
+    except ImportError as e:
+        logger.error(f"motor not available, using in-memory storage: {e}")
+        return
+    
+    # tz_aware so stored BSON dates come back as UTC-aware datetimes
+    client = (settings.mongo_client_factory or AsyncIOMotorClient)(
+        settings.mongo_url,
+        tz_aware=True,
+        minPoolSize=settings.mongo_min_pool_size,
+        maxPoolSize=settings.mongo_max_pool_size,
+        serverSelectionTimeoutMS=settings.mongo_server_selection_timeout_ms,
+        event_listeners=[mongo_command_listener(metrics_registry)]
+    )
+    db = client[settings.db_name]
+    HAS_MONGO = True
+    STORAGE_BACKEND = "mongo"
+    project_repo = MongoProjectRepository(db.projects)
+    project_repo.add_listener(record_analytics)
+    if PROJECT_EVENTS_SOURCE == "change_stream":
+        # Relays local writes too, so the repository listener would only duplicate them
+        project_change_stream = MongoChangeStreamSource(db.projects, project_events)
+    else:
+        project_repo.add_listener(project_events.publish)
+    template_repo = MongoTemplateRepository(db.templates)
+    analytics_store = MongoAnalyticsStore(db.analytics_counters)
+    if RATE_LIMIT_SHARED:
+        rate_limit_backend = MongoRateLimitBackend(db.rate_limits)
+    job_queue.store = MongoJobStore(db.jobs)
+
+async def connect_sqlite(settings: Settings) -> None:
+    """Open the SQLite file shared by all workers and move projects and templates onto it"""
+    global sqlite_db, STORAGE_BACKEND, project_repo, template_repo, analytics_store, rate_limit_backend
+    global project_change_stream
+    sqlite_db = SQLiteDatabase(settings.sqlite_path, max_workers=settings.sqlite_threads)
+    await sqlite_db.initialize()
+    STORAGE_BACKEND = "sqlite"
+    project_repo = SQLiteProjectRepository(sqlite_db)
+    project_repo.add_listener(record_analytics)
+    # Other workers' writes never reach this one's repository listeners, so events come from the shared log
+    project_change_stream = SQLiteChangeLogSource(sqlite_db, project_events, poll_interval=PROJECT_EVENTS_POLL_INTERVAL)
+    template_repo = SQLiteTemplateRepository(sqlite_db)
+    analytics_store = SQLiteAnalyticsStore(sqlite_db)
+    await analytics_store.initialize()
+    if RATE_LIMIT_SHARED:
+        rate_limit_backend = SQLiteRateLimitBackend(sqlite_db)
+        await rate_limit_backend.initialize()
+    seeded = await template_repo.seed(demo_templates)
+    logger.info(f"SQLite storage at {settings.sqlite_path}" + (f", seeded {seeded} templates" if seeded else ""))
+
+async def warm_mongo_pool(settings: Settings) -> None:
+    """Open min_pool_size connections up front so the first requests don't pay for the handshakes"""
+    # Concurrent pings each check out their own connection
+    pings = [db.command("ping") for _ in range(max(1, settings.mongo_min_pool_size))]
+    try:
+        await asyncio.wait_for(asyncio.gather(*pings), timeout=settings.mongo_warmup_timeout)
+        logger.info(f"MongoDB connected, {len(pings)} pooled connections warmed")
+    except Exception as e:
+        # Keep starting; readiness stays failed until a ping succeeds
+        logger.error(f"MongoDB warmup failed: {e}")
+
+async def startup(app: FastAPI, settings: Settings) -> None:
     logger.info("SeeForge API starting up...")
-    yield
-    # Shutdown
-    logger.info("SeeForge API shutting down...")
+    use_memory_storage()
+    if settings.storage_backend == "mongo":
+        await connect_mongo(settings)
+    elif settings.storage_backend == "sqlite":
+        await connect_sqlite(settings)
     if HAS_MONGO:
+        await warm_mongo_pool(settings)
+        try:
+            await ensure_indexes(db)
+            logger.info("MongoDB indexes ensured")
+        except Exception as e:
+            logger.error(f"MongoDB index creation failed: {e}")
+        
+        # Keyset paging needs BSON dates: refuse to start on data migrate_datetimes.py hasn't converted
+        try:
+            await verify_datetimes(db)
+        except RuntimeError:
+            raise
+        except Exception as e:
+            logger.error(f"MongoDB timestamp check failed: {e}")
+        
+        if settings.verify_query_plans:
+            # Diagnostics mode: refuse to start if any query shape is unindexed
+            await verify_query_plans(db)
+            logger.info("MongoDB query plans verified")
+    try:
+        tables = await reload_pricing()
+        logger.info(f"Pricing tables loaded (version {tables['version']})")
+    except Exception as e:
+        logger.error(f"Pricing tables load failed, using defaults: {e}")
+    try:
+        # First start against existing data (or after the counters were dropped): build them once
+        if not await analytics_store.counters():
+            await rebuild_analytics()
+    except Exception as e:
+        logger.error(f"Analytics counters rebuild failed: {e}")
+    job_queue.start()
+    if project_change_stream is not None:
+        project_change_stream.start()
+    app.state.ready = True
+    
+    if settings.preload_llm_sdk:
+        # Import the SDK off the event loop after reporting ready, so it neither delays startup nor the first AI request
+        app.state.llm_preload = asyncio.create_task(asyncio.to_thread(load_llm_sdk))
+
+async def shutdown(app: FastAPI) -> None:
+    logger.info("SeeForge API shutting down...")
+    app.state.ready = False
+    await job_queue.stop()
+    if project_change_stream is not None:
+        await project_change_stream.stop()
+    if client is not None:
         client.close()
         logger.info("MongoDB connection closed")
+    if sqlite_db is not None:
+        sqlite_db.close()
 
-# Create the main app with lifespan
-app = FastAPI(title="SeeForge API", version="1.0.0", lifespan=lifespan)
+def create_app(settings: Optional[Settings] = None) -> FastAPI:
+    """Build the API app; connections are opened in its lifespan, not at import"""
+    settings = settings or Settings.from_env()
+    
+    @asynccontextmanager
+    async def lifespan(app: FastAPI):
+        await startup(app, settings)
+        try:
+            yield
+        finally:
+            await shutdown(app)
+    
+    app = FastAPI(title="SeeForge API", version="1.0.0", lifespan=lifespan)
+    app.state.settings = settings
+    app.state.ready = False
+    
+    app.include_router(api_router)
+    app.add_api_route("/metrics", get_metrics, methods=["GET"], include_in_schema=False)
+    
+    app.add_middleware(
+        CORSMiddleware,
+        allow_origins=settings.cors_origins,
+        allow_credentials=True,
+        allow_methods=["*"],
+        allow_headers=["*"],
+    )
+    # Outermost, so latency includes CORS handling; labelled by route template
+    app.add_middleware(MetricsMiddleware, registry=metrics_registry, routes=lambda: app.router.routes)
+    return app
 
-# Include the router in the main app (AFTER creating the app)
-app.include_router(api_router)
+app = create_app()
 
 if __name__ == "__main__":
     import uvicorn
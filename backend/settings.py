@@ -0,0 +1,74 @@
+from typing import Any, Callable, List, Optional
+import os
+
+STORAGE_BACKENDS = ('mongo', 'sqlite', 'memory')
+DEFAULT_CORS_ORIGINS = ["http://localhost:3000", "http://localhost:5173", "http://127.0.0.1:3000"]
+
+
+def _env_bool(name: str, default: str) -> bool:
+    return os.environ.get(name, default).lower() == 'true'
+
+
+class Settings:
+    """Process wiring for create_app: database connection, pool sizing, CORS and startup behaviour.
+
+    Request-level tunables (page sizes, cache sizes, LLM limits) stay module
+    constants in server.py; these are the knobs that decide how the process
+    boots and when it reports ready.
+    """
+
+    def __init__(
+        self,
+        storage_backend: str = 'mongo',
+        mongo_url: Optional[str] = 'mongodb://localhost:27017',
+        db_name: str = 'seeforge_db',
+        mongo_min_pool_size: int = 4,
+        mongo_max_pool_size: int = 100,
+        mongo_server_selection_timeout_ms: int = 5000,
+        mongo_warmup_timeout: float = 10.0,
+        readiness_timeout: float = 1.0,
+        verify_query_plans: bool = False,
+        cors_origins: Optional[List[str]] = None,
+        preload_llm_sdk: bool = True,
+        sqlite_path: str = 'seeforge.db',
+        sqlite_threads: int = 4,
+        mongo_client_factory: Optional[Callable[..., Any]] = None,
+    ):
+        if storage_backend not in STORAGE_BACKENDS:
+            raise ValueError(f"storage_backend must be one of {', '.join(STORAGE_BACKENDS)}")
+        self.storage_backend = storage_backend
+        # No URL means the in-memory stores, e.g. for local demos and benchmarks
+        self.mongo_url = mongo_url or None
+        self.db_name = db_name
+        self.mongo_min_pool_size = mongo_min_pool_size
+        self.mongo_max_pool_size = mongo_max_pool_size
+        self.mongo_server_selection_timeout_ms = mongo_server_selection_timeout_ms
+        self.mongo_warmup_timeout = mongo_warmup_timeout
+        self.readiness_timeout = readiness_timeout
+        self.verify_query_plans = verify_query_plans
+        self.cors_origins = cors_origins if cors_origins is not None else list(DEFAULT_CORS_ORIGINS)
+        self.preload_llm_sdk = preload_llm_sdk
+        # SQLite file shared by every worker on the host when storage_backend is 'sqlite'
+        self.sqlite_path = sqlite_path
+        self.sqlite_threads = sqlite_threads
+        # Called like AsyncIOMotorClient(url, **options); e.g. mongomock_motor's client in tests
+        self.mongo_client_factory = mongo_client_factory
+
+    @classmethod
+    def from_env(cls) -> "Settings":
+        cors = os.environ.get('CORS_ORIGINS')
+        return cls(
+            storage_backend=os.environ.get('STORAGE_BACKEND', 'mongo').lower(),
+            mongo_url=os.environ.get('MONGO_URL', 'mongodb://localhost:27017'),
+            db_name=os.environ.get('DB_NAME', 'seeforge_db'),
+            mongo_min_pool_size=int(os.environ.get('MONGO_MIN_POOL_SIZE', '4')),
+            mongo_max_pool_size=int(os.environ.get('MONGO_MAX_POOL_SIZE', '100')),
+            mongo_server_selection_timeout_ms=int(os.environ.get('MONGO_SERVER_SELECTION_TIMEOUT_MS', '5000')),
+            mongo_warmup_timeout=float(os.environ.get('MONGO_WARMUP_TIMEOUT', '10')),
+            readiness_timeout=float(os.environ.get('READINESS_TIMEOUT', '1')),
+            verify_query_plans=_env_bool('MONGO_VERIFY_QUERY_PLANS', 'false'),
+            cors_origins=[o.strip() for o in cors.split(',') if o.strip()] if cors else None,
+            preload_llm_sdk=_env_bool('PRELOAD_LLM_SDK', 'true'),
+            sqlite_path=os.environ.get('SQLITE_PATH', 'seeforge.db'),
+            sqlite_threads=int(os.environ.get('SQLITE_THREADS', '4')),
+        )
@@ -0,0 +1,569 @@
+"""Embedded SQLite storage for projects and templates.
+
+The database runs in WAL mode so several uvicorn workers (or processes on
+one host) can share a single file: readers never block the writer and each
+other, and writers queue on SQLite's lock with a busy timeout. Every query
+runs on a small thread pool with one connection per thread, so the event
+loop never waits on disk.
+
+Triggers append every project write to the project_changes log, which
+SQLiteChangeLogSource polls to push all workers' changes to subscribers.
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from typing import List, Optional, Dict, Any, Callable, Iterable, Tuple
+import asyncio
+import json
+import logging
+import sqlite3
+import threading
+import time
+
+from project_events import ProjectEventBus, change_event
+from search import SearchFilters, TOKEN_CHARS, facet_result
+from storage import (
+    ProjectRepository, TemplateRepository, VersionConflictError, PROTECTED_FIELDS, SortKey, _bulk_result
+)
+
+# Project fields stored in their own columns; list/dict fields are JSON text
+PROJECT_COLUMNS = (
+    'id', 'user_id', 'name', 'description', 'category', 'platform', 'frontend', 'backend', 'ui_template',
+    'features', 'addons', 'deployment_option', 'estimated_cost', 'estimated_timeline', 'status',
+    'github_repo_url', 'deployed_url', 'created_at', 'updated_at', 'version',
+)
+TEMPLATE_COLUMNS = (
+    'id', 'name', 'description', 'category', 'preview_image', 'features', 'tech_stack',
+    'estimated_build_time', 'base_price', 'created_at',
+)
+# JSON columns and the empty value written when a document omits them
+JSON_COLUMNS = {'features': list, 'addons': list, 'tech_stack': dict}
+DATETIME_COLUMNS = {'created_at', 'updated_at'}
+
+logger = logging.getLogger(__name__)
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS projects (
+    id TEXT PRIMARY KEY,
+    user_id TEXT NOT NULL,
+    name TEXT,
+    description TEXT,
+    category TEXT,
+    platform TEXT,
+    frontend TEXT,
+    backend TEXT,
+    ui_template TEXT,
+    features TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(features)),
+    addons TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(addons)),
+    deployment_option TEXT,
+    estimated_cost REAL,
+    estimated_timeline TEXT,
+    status TEXT,
+    github_repo_url TEXT,
+    deployed_url TEXT,
+    created_at TEXT NOT NULL,
+    updated_at TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+CREATE INDEX IF NOT EXISTS projects_user_id_id ON projects (user_id, id);
+CREATE INDEX IF NOT EXISTS projects_user_id_created_at_id ON projects (user_id, created_at, id);
+CREATE INDEX IF NOT EXISTS projects_created_at_id ON projects (created_at, id);
+CREATE INDEX IF NOT EXISTS projects_user_id_category_created_at_id ON projects (user_id, category, created_at, id);
+
+-- Every project write, from any worker or tool, in commit order; read by SQLiteChangeLogSource
+CREATE TABLE IF NOT EXISTS project_changes (
+    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+    project_id TEXT NOT NULL,
+    kind TEXT NOT NULL,
+    changed_at REAL NOT NULL
+);
+CREATE TRIGGER IF NOT EXISTS project_changes_insert AFTER INSERT ON projects
+BEGIN INSERT INTO project_changes (project_id, kind, changed_at) VALUES (NEW.id, 'created', (julianday('now') - 2440587.5) * 86400.0); END;
+CREATE TRIGGER IF NOT EXISTS project_changes_update AFTER UPDATE ON projects
+BEGIN INSERT INTO project_changes (project_id, kind, changed_at) VALUES (NEW.id, 'updated', (julianday('now') - 2440587.5) * 86400.0); END;
+CREATE TRIGGER IF NOT EXISTS project_changes_delete AFTER DELETE ON projects
+BEGIN INSERT INTO project_changes (project_id, kind, changed_at) VALUES (OLD.id, 'deleted', (julianday('now') - 2440587.5) * 86400.0); END;
+
+CREATE TABLE IF NOT EXISTS templates (
+    id TEXT PRIMARY KEY,
+    name TEXT,
+    description TEXT,
+    category TEXT,
+    preview_image TEXT,
+    features TEXT NOT NULL DEFAULT '[]' CHECK (json_valid(features)),
+    tech_stack TEXT NOT NULL DEFAULT '{}' CHECK (json_valid(tech_stack)),
+    estimated_build_time TEXT,
+    base_price REAL,
+    created_at TEXT,
+    extra TEXT NOT NULL DEFAULT '{}'
+);
+
+-- Bumped by every template write, whichever worker or tool makes it, so catalog caches can see changes
+CREATE TABLE IF NOT EXISTS templates_version (
+    id INTEGER PRIMARY KEY CHECK (id = 0),
+    version INTEGER NOT NULL
+);
+INSERT OR IGNORE INTO templates_version (id, version) VALUES (0, 0);
+CREATE TRIGGER IF NOT EXISTS templates_version_insert AFTER INSERT ON templates
+BEGIN UPDATE templates_version SET version = version + 1 WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS templates_version_update AFTER UPDATE ON templates
+BEGIN UPDATE templates_version SET version = version + 1 WHERE id = 0; END;
+CREATE TRIGGER IF NOT EXISTS templates_version_delete AFTER DELETE ON templates
+BEGIN UPDATE templates_version SET version = version + 1 WHERE id = 0; END;
+"""
+
+
+def _encode_datetime(value: Any) -> Any:
+    if not isinstance(value, datetime):
+        return value
+    if value.tzinfo is None:
+        value = value.replace(tzinfo=timezone.utc)
+    # Fixed-width UTC text, so lexical order in the index is chronological order
+    return value.astimezone(timezone.utc).strftime('%Y-%m-%dT%H:%M:%S.%f+00:00')
+
+
+def _decode_datetime(value: Any) -> Any:
+    return datetime.fromisoformat(value) if isinstance(value, str) else value
+
+
+def _to_row(doc: Dict[str, Any], columns: Iterable[str]) -> Dict[str, Any]:
+    row = {}
+    for column in columns:
+        value = doc.get(column)
+        if column in JSON_COLUMNS:
+            value = json.dumps(value if value is not None else JSON_COLUMNS[column]())
+        elif column in DATETIME_COLUMNS:
+            value = _encode_datetime(value)
+        row[column] = value
+    # Anything outside the fixed columns round-trips through the extra JSON column
+    extra = {k: v for k, v in doc.items() if k not in row and k != '_id'}
+    row['extra'] = json.dumps(extra, default=_encode_datetime)
+    return row
+
+
+def _from_row(row: sqlite3.Row) -> Dict[str, Any]:
+    doc = {}
+    for column in row.keys():
+        value = row[column]
+        if column == 'extra':
+            continue
+        if column in JSON_COLUMNS:
+            value = json.loads(value)
+        elif column in DATETIME_COLUMNS:
+            value = _decode_datetime(value)
+        doc[column] = value
+    doc.update(json.loads(row['extra']))
+    return doc
+
+
+class SQLiteDatabase:
+    """Thread-pooled access to one SQLite file in WAL mode"""
+
+    def __init__(self, path: str, max_workers: int = 4, busy_timeout_ms: int = 5000):
+        self.path = path
+        self.busy_timeout_ms = busy_timeout_ms
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="sqlite")
+        self._local = threading.local()
+        self._connections: List[sqlite3.Connection] = []
+        self._lock = threading.Lock()
+
+    def _connection(self) -> sqlite3.Connection:
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            # Autocommit mode; transactions are opened explicitly with BEGIN IMMEDIATE
+            # Only ever used from this thread; check_same_thread is off so close() can run from any thread
+            conn = sqlite3.connect(
+                self.path, isolation_level=None, timeout=self.busy_timeout_ms / 1000, check_same_thread=False
+            )
+            conn.row_factory = sqlite3.Row
+            conn.execute("PRAGMA journal_mode=WAL")
+            # Durable across process crashes; only an OS crash can lose the last commits
+            conn.execute("PRAGMA synchronous=NORMAL")
+            conn.execute(f"PRAGMA busy_timeout={self.busy_timeout_ms}")
+            self._local.conn = conn
+            with self._lock:
+                self._connections.append(conn)
+        return conn
+
+    async def run(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Run fn(connection) on the pool and await its result"""
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(self._executor, lambda: fn(self._connection()))
+
+    async def transaction(self, fn: Callable[[sqlite3.Connection], Any]) -> Any:
+        """Like run, inside BEGIN IMMEDIATE ... COMMIT (rolled back if fn raises)"""
+        def wrapped(conn: sqlite3.Connection):
+            # IMMEDIATE takes the write lock up front, so read-then-write can't deadlock on upgrade
+            conn.execute("BEGIN IMMEDIATE")
+            try:
+                result = fn(conn)
+            except BaseException:
+                conn.execute("ROLLBACK")
+                raise
+            conn.execute("COMMIT")
+            return result
+        return await self.run(wrapped)
+
+    async def initialize(self) -> None:
+        await self.run(lambda conn: conn.executescript(SCHEMA))
+
+    def close(self) -> None:
+        self._executor.shutdown(wait=True)
+        with self._lock:
+            for conn in self._connections:
+                conn.close()
+            self._connections.clear()
+
+
+def _glob_escape(token: str) -> str:
+    # GLOB has no escape character; wrap its metacharacters in brackets
+    return ''.join(f"[{c}]" if c in '*?[' else c for c in token)
+
+
+def _token_glob(token: str) -> str:
+    """GLOB matching token as a whole search.tokenize() token in space-padded, lowercased text"""
+    return f"*[^{TOKEN_CHARS}]{_glob_escape(token)}[^{TOKEN_CHARS}]*"
+
+
+def _insert_sql(table: str, row: Dict[str, Any]) -> str:
+    columns = ', '.join(row)
+    placeholders = ', '.join(f':{column}' for column in row)
+    return f"INSERT INTO {table} ({columns}) VALUES ({placeholders})"
+
+
+class SQLiteProjectRepository(ProjectRepository):
+    """Project store backed by the projects table"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    @staticmethod
+    def _insert(conn: sqlite3.Connection, doc: Dict[str, Any]) -> None:
+        row = _to_row(doc, PROJECT_COLUMNS)
+        row['version'] = row['version'] or 0
+        try:
+            conn.execute(_insert_sql('projects', row), row)
+        except sqlite3.IntegrityError:
+            raise ValueError(f"Project {doc['id']} already exists")
+
+    @staticmethod
+    def _get(conn: sqlite3.Connection, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        row = conn.execute("SELECT * FROM projects WHERE id = ? AND user_id = ?", (project_id, user_id)).fetchone()
+        return _from_row(row) if row is not None else None
+
+    @staticmethod
+    def _update(conn: sqlite3.Connection, user_id: str, project_id: str, updates: Dict[str, Any],
+                expected_version: Optional[int]) -> Optional[Tuple[Dict[str, Any], Dict[str, Any]]]:
+        """Apply updates, returning (previous, current) documents or None if not found"""
+        previous = SQLiteProjectRepository._get(conn, user_id, project_id)
+        if previous is None:
+            return None
+        current_version = previous.get('version', 0)
+        if expected_version is not None and current_version != expected_version:
+            raise VersionConflictError(current_version)
+        current = dict(previous)
+        current.update({k: v for k, v in updates.items() if k not in PROTECTED_FIELDS})
+        current['version'] = current_version + 1
+        row = _to_row(current, PROJECT_COLUMNS)
+        assignments = ', '.join(f"{column} = :{column}" for column in row if column != 'id')
+        conn.execute(f"UPDATE projects SET {assignments} WHERE id = :id", row)
+        return previous, current
+
+    @staticmethod
+    def _delete(conn: sqlite3.Connection, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        """Delete a project, returning the removed document (call inside a transaction)"""
+        previous = SQLiteProjectRepository._get(conn, user_id, project_id)
+        if previous is not None:
+            conn.execute("DELETE FROM projects WHERE id = ?", (project_id,))
+        return previous
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        await self.database.run(lambda conn: self._insert(conn, doc))
+        await self._notify(None, dict(doc))
+
+    async def get(self, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        return await self.database.run(lambda conn: self._get(conn, user_id, project_id))
+
+    @staticmethod
+    def _filter_conditions(filters: Optional[SearchFilters]):
+        conditions: List[str] = []
+        params: List[Any] = []
+        if filters is None:
+            return conditions, params
+        if filters.category:
+            conditions.append("category = ?")
+            params.append(filters.category)
+        if filters.status:
+            conditions.append("status = ?")
+            params.append(filters.status)
+        for feature in filters.features:
+            conditions.append("EXISTS (SELECT 1 FROM json_each(projects.features) WHERE value = ?)")
+            params.append(feature)
+        if filters.min_price is not None:
+            conditions.append("estimated_cost >= ?")
+            params.append(filters.min_price)
+        if filters.max_price is not None:
+            conditions.append("estimated_cost <= ?")
+            params.append(filters.max_price)
+        for token in filters.tech_terms:
+            # Space-padded so the token only matches whole words
+            conditions.append("(' ' || lower(coalesce(frontend, '') || ' ' || coalesce(backend, '')) || ' ') "
+                              "GLOB ?")
+            params.append(_token_glob(token))
+        for token in filters.text_terms:
+            conditions.append("(' ' || lower(coalesce(name, '') || ' ' || coalesce(description, '') || ' ' "
+                              "|| features) || ' ') GLOB ?")
+            params.append(_token_glob(token))
+        return conditions, params
+
+    async def _page(self, user_id: Optional[str], limit: int, after: Optional[SortKey],
+                    descending: bool, filters: Optional[SearchFilters] = None) -> List[Dict[str, Any]]:
+        conditions, params = [], []
+        if user_id is not None:
+            conditions.append("user_id = ?")
+            params.append(user_id)
+        filter_conditions, filter_params = self._filter_conditions(filters)
+        conditions += filter_conditions
+        params += filter_params
+        if after is not None:
+            conditions.append(f"(created_at, id) {'<' if descending else '>'} (?, ?)")
+            params.extend([_encode_datetime(after[0]), after[1]])
+        where = f"WHERE {' AND '.join(conditions)}" if conditions else ""
+        direction = "DESC" if descending else "ASC"
+        sql = f"SELECT * FROM projects {where} ORDER BY created_at {direction}, id {direction} LIMIT ?"
+        params.append(limit)
+
+        def query(conn: sqlite3.Connection):
+            return [_from_row(row) for row in conn.execute(sql, params)]
+        return await self.database.run(query)
+
+    async def list_for_user(self, user_id: str, limit: int, after: Optional[SortKey] = None,
+                            descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page(user_id, limit, after, descending)
+
+    async def list_all(self, limit: int, after: Optional[SortKey] = None,
+                       descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page(None, limit, after, descending)
+
+    async def search(self, user_id: str, filters: SearchFilters, limit: int, after: Optional[SortKey] = None,
+                     descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page(user_id, limit, after, descending, filters)
+
+    async def facet_counts(self, user_id: str, filters: SearchFilters) -> Dict[str, Any]:
+        conditions, params = self._filter_conditions(filters)
+        where = " AND ".join(["user_id = ?"] + conditions)
+        params = [user_id] + params
+        matched = f"SELECT * FROM projects WHERE {where}"
+
+        def query(conn: sqlite3.Connection) -> Dict[str, Any]:
+            def grouped(sql: str, repeat: int = 1) -> Dict[str, int]:
+                rows = conn.execute(sql, params * repeat)
+                return {row[0]: row[1] for row in rows if row[0] not in (None, "")}
+
+            counts = {
+                "category": grouped(f"SELECT category, count(*) FROM ({matched}) GROUP BY category"),
+                "status": grouped(f"SELECT status, count(*) FROM ({matched}) GROUP BY status"),
+                "features": grouped(
+                    f"SELECT value, count(DISTINCT m.id) FROM ({matched}) AS m, json_each(m.features) GROUP BY value"
+                ),
+                # UNION (not ALL) counts a project once when frontend and backend are the same
+                "tech": grouped(
+                    f"SELECT tech, count(*) FROM (SELECT id, frontend AS tech FROM ({matched}) "
+                    f"UNION SELECT id, backend FROM ({matched})) GROUP BY tech",
+                    repeat=2
+                ),
+            }
+            total, min_price, max_price = conn.execute(
+                f"SELECT count(*), min(estimated_cost), max(estimated_cost) FROM ({matched})", params
+            ).fetchone()
+            return facet_result(total, counts, min_price, max_price)
+        return await self.database.run(query)
+
+    async def update(self, user_id: str, project_id: str, updates: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        change = await self.database.transaction(
+            lambda conn: self._update(conn, user_id, project_id, updates, expected_version)
+        )
+        if change is None:
+            return None
+        await self._notify(*change)
+        return change[1]
+
+    async def delete(self, user_id: str, project_id: str) -> bool:
+        previous = await self.database.transaction(lambda conn: self._delete(conn, user_id, project_id))
+        if previous is None:
+            return False
+        await self._notify(previous, None)
+        return True
+
+    async def bulk_write(self, user_id: str, operations: List[Dict[str, Any]],
+                         ordered: bool = True) -> List[Dict[str, Any]]:
+        # The whole batch is one thread hop and one commit; failed items don't undo earlier ones
+        changes = []
+
+        def apply(conn: sqlite3.Connection) -> List[Dict[str, Any]]:
+            results = []
+            failed = False
+            for operation in operations:
+                if failed and ordered:
+                    results.append(_bulk_result(operation, "skipped"))
+                    continue
+                try:
+                    if operation['op'] == 'insert':
+                        self._insert(conn, operation['doc'])
+                        change = (None, dict(operation['doc']))
+                        status = "created"
+                    elif operation['op'] == 'update':
+                        change = self._update(conn, user_id, operation['id'], operation['updates'], None)
+                        status = "updated" if change else "not_found"
+                    else:
+                        previous = self._delete(conn, user_id, operation['id'])
+                        change = (previous, None) if previous else None
+                        status = "deleted" if change else "not_found"
+                    if change:
+                        changes.append(change)
+                    results.append(_bulk_result(operation, status))
+                except Exception as e:
+                    status = "error"
+                    results.append(_bulk_result(operation, status, str(e)))
+                failed = failed or status in ("not_found", "error")
+            return results
+        results = await self.database.transaction(apply)
+        for change in changes:
+            await self._notify(*change)
+        return results
+
+
+class SQLiteTemplateRepository(TemplateRepository):
+    """Templates backed by the templates table"""
+
+    def __init__(self, database: SQLiteDatabase):
+        self.database = database
+
+    async def list_all(self) -> List[Dict[str, Any]]:
+        def query(conn: sqlite3.Connection):
+            return [_from_row(row) for row in conn.execute("SELECT * FROM templates ORDER BY created_at, id")]
+        return await self.database.run(query)
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        row = _to_row(doc, TEMPLATE_COLUMNS)
+        await self.database.run(lambda conn: conn.execute(_insert_sql('templates', row), row))
+
+    async def catalog_version(self) -> Optional[int]:
+        def query(conn: sqlite3.Connection) -> int:
+            return conn.execute("SELECT version FROM templates_version WHERE id = 0").fetchone()[0]
+        return await self.database.run(query)
+
+    async def seed(self, docs: List[Dict[str, Any]]) -> int:
+        """Insert docs if the table is empty, returning how many were written"""
+        rows = [_to_row(doc, TEMPLATE_COLUMNS) for doc in docs]
+
+        def apply(conn: sqlite3.Connection) -> int:
+            if conn.execute("SELECT 1 FROM templates LIMIT 1").fetchone() is not None:
+                return 0
+            for row in rows:
+                conn.execute(_insert_sql('templates', row), row)
+            return len(rows)
+        # Inside one write transaction, so concurrent workers seed at most once
+        return await self.database.transaction(apply) if rows else 0
+
+
+class SQLiteChangeLogSource:
+    """Relays project changes from the project_changes log into a bus.
+
+    Each worker polls the log every poll_interval seconds for rows past the
+    last one it has seen and publishes the projects' current state, so
+    subscribers hear about writes made by any worker on the file. While
+    nobody is subscribed only the position is advanced. Rows older than
+    retention_seconds are pruned every prune_every polls.
+    """
+
+    prune_every = 600
+    batch_size = 500
+
+    def __init__(self, database: SQLiteDatabase, bus: ProjectEventBus, poll_interval: float = 0.5,
+                 retention_seconds: float = 3600, retry_delay: float = 1.0, max_retry_delay: float = 30.0):
+        self.database = database
+        self.bus = bus
+        self.poll_interval = poll_interval
+        self.retention_seconds = retention_seconds
+        self.retry_delay = retry_delay
+        self.max_retry_delay = max_retry_delay
+        self._seq: Optional[int] = None
+        self._polls = 0
+        self._task: Optional[asyncio.Task] = None
+
+    def start(self) -> None:
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self) -> None:
+        if self._task is not None:
+            self._task.cancel()
+            await asyncio.gather(self._task, return_exceptions=True)
+            self._task = None
+
+    @staticmethod
+    def _last_seq(conn: sqlite3.Connection) -> int:
+        return conn.execute("SELECT COALESCE(MAX(seq), 0) FROM project_changes").fetchone()[0]
+
+    def _read(self, conn: sqlite3.Connection, after: int) -> Tuple[int, int, List[Dict[str, Any]]]:
+        """The seq of the last change past `after` read, how many were read, and their bus events"""
+        changes = conn.execute(
+            "SELECT seq, project_id, kind FROM project_changes WHERE seq > ? ORDER BY seq LIMIT ?",
+            (after, self.batch_size)
+        ).fetchall()
+        if not changes:
+            return after, 0, []
+        ids = list({row['project_id'] for row in changes})
+        placeholders = ', '.join('?' * len(ids))
+        projects = {
+            row['id']: _from_row(row)
+            for row in conn.execute(f"SELECT * FROM projects WHERE id IN ({placeholders})", ids)
+        }
+        events = []
+        for row in changes:
+            current = projects.get(row['project_id'])
+            if row['kind'] == 'deleted':
+                events.append(change_event({'id': row['project_id']}, None))
+            elif current is not None:
+                # Deleted since; its own 'deleted' row follows. Any non-None previous marks an update
+                events.append(change_event(None if row['kind'] == 'created' else {}, current))
+        return changes[-1]['seq'], len(changes), events
+
+    async def poll(self) -> int:
+        """Publish changes logged since the last poll; returns how many events were published"""
+        if self._seq is None:
+            # Start from now: subscribers get a snapshot when they connect, not history
+            self._seq = await self.database.run(self._last_seq)
+            return 0
+        self._polls += 1
+        if self._polls % self.prune_every == 0:
+            cutoff = time.time() - self.retention_seconds
+            await self.database.run(lambda conn: conn.execute("DELETE FROM project_changes WHERE changed_at < ?", (cutoff,)))
+        if not self.bus.subscriber_count:
+            self._seq = await self.database.run(self._last_seq)
+            return 0
+        published = 0
+        while True:
+            seq, read, events = await self.database.run(lambda conn: self._read(conn, self._seq))
+            self._seq = seq
+            for event in events:
+                self.bus.publish_event(event)
+            published += len(events)
+            if read < self.batch_size:
+                return published
+
+    async def _run(self) -> None:
+        delay = self.retry_delay
+        while True:
+            try:
+                await self.poll()
+                delay = self.retry_delay
+                await asyncio.sleep(self.poll_interval)
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"Project change log poll failed, retrying in {delay:.0f}s: {e}")
+                await asyncio.sleep(delay)
+                delay = min(delay * 2, self.max_retry_delay)
@@ -0,0 +1,651 @@
+from abc import ABC, abstractmethod
+from typing import List, Optional, Dict, Any, Tuple, AsyncIterator, Callable, Awaitable
+from datetime import datetime
+import base64
+import bisect
+import json
+import logging
+import re
+
+from search import SearchFilters, InvertedIndex, PROJECT_SEARCH, TOKEN_CHARS, matches, compute_facets, facet_result
+
+logger = logging.getLogger(__name__)
+
+# Keyset position of a project in (created_at, id) order
+SortKey = Tuple[datetime, str]
+
+# Called after every write with (previous, current): (None, doc) for inserts, (doc, None) for deletes
+ChangeListener = Callable[[Optional[Dict[str, Any]], Optional[Dict[str, Any]]], Awaitable[None]]
+
+
+def sort_key(doc: Dict[str, Any]) -> SortKey:
+    """Return the (created_at, id) keyset position of a project document"""
+    return doc['created_at'], doc['id']
+
+
+def encode_cursor(key: SortKey) -> str:
+    """Encode a keyset position as an opaque URL-safe token"""
+    # An unmigrated ISO-string created_at (see verify_datetimes) is already in the encoded form
+    created_at = key[0] if isinstance(key[0], str) else key[0].isoformat()
+    raw = json.dumps([created_at, key[1]], separators=(',', ':')).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip('=')
+
+
+def decode_cursor(token: str) -> SortKey:
+    """Decode a token produced by encode_cursor, raising ValueError if malformed"""
+    try:
+        raw = base64.urlsafe_b64decode(token + '=' * (-len(token) % 4))
+        created_at, project_id = json.loads(raw)
+        return datetime.fromisoformat(created_at), str(project_id)
+    except Exception as e:
+        raise ValueError(f"Invalid cursor: {e}")
+
+
+class VersionConflictError(Exception):
+    """Raised when a conditional update names a version that is no longer current"""
+
+    def __init__(self, current_version: int):
+        super().__init__(f"Project is at version {current_version}")
+        self.current_version = current_version
+
+
+# Fields an update may never touch: identity, owner, creation time and the version counter
+PROTECTED_FIELDS = ('id', 'user_id', 'created_at', 'version', '_id')
+
+
+def _token_pattern(token: str) -> Dict[str, str]:
+    """Case-insensitive regex matching token as a whole search.tokenize() token"""
+    return {"$regex": f"(^|[^{TOKEN_CHARS}]){re.escape(token)}($|[^{TOKEN_CHARS}])", "$options": "i"}
+
+
+def _bulk_result(operation: Dict[str, Any], status: str, error: Optional[str] = None) -> Dict[str, Any]:
+    project_id = operation['doc']['id'] if operation['op'] == 'insert' else operation['id']
+    result = {"op": operation['op'], "id": project_id, "status": status}
+    if error:
+        result["error"] = error
+    return result
+
+
+class ProjectRepository(ABC):
+    """Storage interface for project documents, scoped by owner"""
+
+    _listeners: Tuple[ChangeListener, ...] = ()
+
+    def add_listener(self, listener: ChangeListener) -> None:
+        """Register a coroutine to be awaited with (previous, current) after every successful write"""
+        self._listeners = self._listeners + (listener,)
+
+    async def _notify(self, previous: Optional[Dict[str, Any]], current: Optional[Dict[str, Any]]) -> None:
+        for listener in self._listeners:
+            try:
+                await listener(previous, current)
+            except Exception as e:
+                # The write itself succeeded; a listener must not turn it into an error
+                logger.error(f"Project change listener failed: {e}")
+
+    @abstractmethod
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        ...
+
+    @abstractmethod
+    async def get(self, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def list_for_user(self, user_id: str, limit: int, after: Optional[SortKey] = None,
+                            descending: bool = True) -> List[Dict[str, Any]]:
+        """List up to limit of a user's projects in (created_at, id) order, starting after a keyset position"""
+        ...
+
+    @abstractmethod
+    async def list_all(self, limit: int, after: Optional[SortKey] = None,
+                       descending: bool = True) -> List[Dict[str, Any]]:
+        """Like list_for_user, across all users"""
+        ...
+
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        """Yield every project in ascending (created_at, id) order, one batch in memory at a time"""
+        after = None
+        while True:
+            batch = await self.list_all(batch_size, after, descending=False)
+            for doc in batch:
+                yield doc
+            if len(batch) < batch_size:
+                return
+            after = sort_key(batch[-1])
+
+    async def _scan_user(self, user_id: str, after: Optional[SortKey] = None,
+                         descending: bool = True, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        while True:
+            batch = await self.list_for_user(user_id, batch_size, after, descending)
+            for doc in batch:
+                yield doc
+            if len(batch) < batch_size:
+                return
+            after = sort_key(batch[-1])
+
+    async def search(self, user_id: str, filters: SearchFilters, limit: int, after: Optional[SortKey] = None,
+                     descending: bool = True) -> List[Dict[str, Any]]:
+        """Like list_for_user, keeping only projects that pass filters"""
+        if not filters.active:
+            return await self.list_for_user(user_id, limit, after, descending)
+        found = []
+        async for doc in self._scan_user(user_id, after, descending):
+            if matches(PROJECT_SEARCH, doc, filters):
+                found.append(doc)
+                if len(found) == limit:
+                    break
+        return found
+
+    async def facet_counts(self, user_id: str, filters: SearchFilters) -> Dict[str, Any]:
+        """Total and per-facet counts over all of a user's projects that pass filters"""
+        docs = [doc async for doc in self._scan_user(user_id) if matches(PROJECT_SEARCH, doc, filters)]
+        return compute_facets(PROJECT_SEARCH, docs)
+
+    @abstractmethod
+    async def update(self, user_id: str, project_id: str, updates: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        """Atomically apply updates and bump version, returning the updated document or None if not found.
+
+        With expected_version, raise VersionConflictError unless the stored
+        version matches. Documents written before versioning count as version 0.
+        """
+        ...
+
+    @abstractmethod
+    async def delete(self, user_id: str, project_id: str) -> bool:
+        """Delete a project, returning whether anything was removed"""
+        ...
+
+    async def bulk_write(self, user_id: str, operations: List[Dict[str, Any]],
+                         ordered: bool = True) -> List[Dict[str, Any]]:
+        """Apply insert/update/delete operations for one user, returning one result per operation.
+
+        Each operation is {"op": "insert", "doc": ...}, {"op": "update", "id": ...,
+        "updates": ...} or {"op": "delete", "id": ...}. In ordered mode the first
+        failure stops the batch and later operations are reported as skipped.
+        """
+        results = []
+        failed = False
+        for operation in operations:
+            if failed and ordered:
+                results.append(_bulk_result(operation, "skipped"))
+                continue
+            try:
+                if operation['op'] == 'insert':
+                    await self.insert(operation['doc'])
+                    status = "created"
+                elif operation['op'] == 'update':
+                    found = await self.update(user_id, operation['id'], operation['updates'])
+                    status = "updated" if found else "not_found"
+                else:
+                    found = await self.delete(user_id, operation['id'])
+                    status = "deleted" if found else "not_found"
+                results.append(_bulk_result(operation, status))
+            except Exception as e:
+                status = "error"
+                results.append(_bulk_result(operation, status, str(e)))
+            failed = failed or status in ("not_found", "error")
+        return results
+
+
+class InMemoryProjectRepository(ProjectRepository):
+    """Project store indexed by id, with a secondary per-user index and an inverted search index"""
+
+    def __init__(self):
+        self._by_id: Dict[str, Dict[str, Any]] = {}
+        # Sorted (created_at, id) keys, per user and overall, for keyset paging
+        self._by_user: Dict[str, List[SortKey]] = {}
+        self._all: List[SortKey] = []
+        self._index = InvertedIndex(PROJECT_SEARCH)
+
+    def _page(self, keys: List[SortKey], limit: int, after: Optional[SortKey],
+              descending: bool) -> List[Dict[str, Any]]:
+        if descending:
+            end = bisect.bisect_left(keys, after) if after is not None else len(keys)
+            selected = keys[max(0, end - limit):end][::-1]
+        else:
+            start = bisect.bisect_right(keys, after) if after is not None else 0
+            selected = keys[start:start + limit]
+        return [dict(self._by_id[key[1]]) for key in selected]
+
+    def _owned(self, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._by_id.get(project_id)
+        if doc is None or doc.get('user_id') != user_id:
+            return None
+        return doc
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        if doc['id'] in self._by_id:
+            # Mirrors the unique id index on the Mongo collection
+            raise ValueError(f"Project {doc['id']} already exists")
+        doc = dict(doc)
+        key = sort_key(doc)
+        self._by_id[doc['id']] = doc
+        bisect.insort(self._by_user.setdefault(doc.get('user_id'), []), key)
+        bisect.insort(self._all, key)
+        self._index.add(doc)
+        await self._notify(None, dict(doc))
+
+    async def get(self, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        doc = self._owned(user_id, project_id)
+        return dict(doc) if doc is not None else None
+
+    async def list_for_user(self, user_id: str, limit: int, after: Optional[SortKey] = None,
+                            descending: bool = True) -> List[Dict[str, Any]]:
+        return self._page(self._by_user.get(user_id, []), limit, after, descending)
+
+    async def list_all(self, limit: int, after: Optional[SortKey] = None,
+                       descending: bool = True) -> List[Dict[str, Any]]:
+        return self._page(self._all, limit, after, descending)
+
+    def _matching_keys(self, user_id: str, filters: SearchFilters) -> List[SortKey]:
+        ids = self._index.matching(filters)
+        keys = self._by_user.get(user_id, [])
+        return keys if ids is None else [key for key in keys if key[1] in ids]
+
+    async def search(self, user_id: str, filters: SearchFilters, limit: int, after: Optional[SortKey] = None,
+                     descending: bool = True) -> List[Dict[str, Any]]:
+        return self._page(self._matching_keys(user_id, filters), limit, after, descending)
+
+    async def facet_counts(self, user_id: str, filters: SearchFilters) -> Dict[str, Any]:
+        return compute_facets(PROJECT_SEARCH, (self._by_id[key[1]] for key in self._matching_keys(user_id, filters)))
+
+    async def update(self, user_id: str, project_id: str, updates: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        doc = self._owned(user_id, project_id)
+        if doc is None:
+            return None
+        current_version = doc.get('version', 0)
+        if expected_version is not None and current_version != expected_version:
+            raise VersionConflictError(current_version)
+        previous = dict(doc)
+        doc.update({k: v for k, v in updates.items() if k not in PROTECTED_FIELDS})
+        doc['version'] = current_version + 1
+        self._index.add(doc)
+        await self._notify(previous, dict(doc))
+        return dict(doc)
+
+    async def delete(self, user_id: str, project_id: str) -> bool:
+        doc = self._owned(user_id, project_id)
+        if doc is None:
+            return False
+        key = sort_key(doc)
+        del self._by_id[project_id]
+        user_keys = self._by_user[user_id]
+        del user_keys[bisect.bisect_left(user_keys, key)]
+        if not user_keys:
+            del self._by_user[user_id]
+        del self._all[bisect.bisect_left(self._all, key)]
+        self._index.remove(project_id)
+        await self._notify(doc, None)
+        return True
+
+
+class MongoProjectRepository(ProjectRepository):
+    """Project store backed by a Motor collection"""
+
+    def __init__(self, collection):
+        self.collection = collection
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        # insert_one adds _id to the dict it is given, so hand it a copy
+        await self.collection.insert_one(dict(doc))
+        await self._notify(None, dict(doc))
+
+    async def get(self, user_id: str, project_id: str) -> Optional[Dict[str, Any]]:
+        return await self.collection.find_one({"id": project_id, "user_id": user_id}, {"_id": 0})
+
+    async def _page(self, query: Dict[str, Any], limit: int, after: Optional[SortKey],
+                    descending: bool) -> List[Dict[str, Any]]:
+        direction = -1 if descending else 1
+        if after is not None:
+            op = "$lt" if descending else "$gt"
+            created_at = after[0]
+            keyset = {"$or": [
+                {"created_at": {op: created_at}},
+                {"created_at": created_at, "id": {op: after[1]}},
+            ]}
+            query = dict(query, **{"$and": query.get("$and", []) + [keyset]})
+        cursor = self.collection.find(query, {"_id": 0}).sort([("created_at", direction), ("id", direction)])
+        return await cursor.limit(limit).to_list(limit)
+
+    async def list_for_user(self, user_id: str, limit: int, after: Optional[SortKey] = None,
+                            descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page({"user_id": user_id}, limit, after, descending)
+
+    async def list_all(self, limit: int, after: Optional[SortKey] = None,
+                       descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page({}, limit, after, descending)
+
+    @staticmethod
+    def _search_query(user_id: str, filters: SearchFilters) -> Dict[str, Any]:
+        query: Dict[str, Any] = {"user_id": user_id}
+        if filters.category:
+            query["category"] = filters.category
+        if filters.status:
+            query["status"] = filters.status
+        if filters.features:
+            query["features"] = {"$all": filters.features}
+        price = {}
+        if filters.min_price is not None:
+            price["$gte"] = filters.min_price
+        if filters.max_price is not None:
+            price["$lte"] = filters.max_price
+        if price:
+            query["estimated_cost"] = price
+        if filters.tech_terms:
+            # Whole-token match within the frontend or backend name
+            clauses = []
+            for token in filters.tech_terms:
+                pattern = _token_pattern(token)
+                clauses.append({"$or": [{"frontend": pattern}, {"backend": pattern}]})
+            query["$and"] = clauses
+        if filters.text_terms:
+            # The text index narrows candidates but splits words on its own delimiters;
+            # the bounded-token regexes keep exactly the documents matches() accepts
+            query["$text"] = {"$search": " ".join(f'"{term}"' for term in filters.text_terms)}
+            query.setdefault("$and", []).extend(
+                {"$or": [{field: _token_pattern(term)} for field in PROJECT_SEARCH.text_fields]}
+                for term in filters.text_terms
+            )
+        return query
+
+    async def search(self, user_id: str, filters: SearchFilters, limit: int, after: Optional[SortKey] = None,
+                     descending: bool = True) -> List[Dict[str, Any]]:
+        return await self._page(self._search_query(user_id, filters), limit, after, descending)
+
+    async def facet_counts(self, user_id: str, filters: SearchFilters) -> Dict[str, Any]:
+        def count_by(field: str, unwind: bool = False) -> List[Dict[str, Any]]:
+            stages = [{"$unwind": f"${field}"}] if unwind else []
+            return stages + [{"$group": {"_id": f"${field}", "count": {"$sum": 1}}}]
+
+        pipeline = [
+            {"$match": self._search_query(user_id, filters)},
+            {"$facet": {
+                "category": count_by("category"),
+                "status": count_by("status"),
+                "features": [{"$project": {"features": {"$setUnion": [{"$ifNull": ["$features", []]}]}}}]
+                            + count_by("features", unwind=True),
+                "tech": [{"$group": {"_id": {"frontend": "$frontend", "backend": "$backend"}, "count": {"$sum": 1}}}],
+                "price": [{"$group": {"_id": None, "total": {"$sum": 1},
+                                      "min": {"$min": "$estimated_cost"}, "max": {"$max": "$estimated_cost"}}}],
+            }},
+        ]
+        result = (await self.collection.aggregate(pipeline).to_list(1))[0]
+        counts = {
+            facet: {row["_id"]: row["count"] for row in result[facet] if row["_id"] not in (None, "")}
+            for facet in ("category", "status", "features")
+        }
+        # Grouped by (frontend, backend) pair; a project counts once per distinct value
+        tech: Dict[str, int] = {}
+        for row in result["tech"]:
+            for value in {row["_id"].get("frontend"), row["_id"].get("backend")} - {None, ""}:
+                tech[value] = tech.get(value, 0) + row["count"]
+        counts["tech"] = tech
+        price = result["price"][0] if result["price"] else {"total": 0, "min": None, "max": None}
+        return facet_result(price["total"], counts, price["min"], price["max"])
+
+    async def iter_all(self, batch_size: int = 500) -> AsyncIterator[Dict[str, Any]]:
+        # A single server-side cursor; Motor fetches batch_size documents per round trip
+        cursor = self.collection.find({}, {"_id": 0}).sort([("created_at", 1), ("id", 1)]).batch_size(batch_size)
+        async for doc in cursor:
+            yield doc
+
+    async def update(self, user_id: str, project_id: str, updates: Dict[str, Any],
+                     expected_version: Optional[int] = None) -> Optional[Dict[str, Any]]:
+        query: Dict[str, Any] = {"id": project_id, "user_id": user_id}
+        if expected_version is not None:
+            # None also matches documents that predate the version field
+            query["version"] = {"$in": [0, None]} if expected_version == 0 else expected_version
+        fields = {k: v for k, v in updates.items() if k not in PROTECTED_FIELDS}
+        # The document as it was before the update; the result is derived from it, saving a read
+        previous = await self.collection.find_one_and_update(
+            query,
+            {"$set": fields, "$inc": {"version": 1}},
+            projection={"_id": 0},
+            return_document=False  # ReturnDocument.BEFORE
+        )
+        if previous is not None:
+            updated = {**previous, **fields, "version": previous.get('version', 0) + 1}
+            await self._notify(previous, updated)
+            return updated
+        if expected_version is None:
+            return None
+        # Only a failed conditional update pays for a second lookup, to tell 404 from 412
+        current = await self.collection.find_one({"id": project_id, "user_id": user_id}, {"_id": 0, "version": 1})
+        if current is None:
+            return None
+        raise VersionConflictError(current.get('version', 0))
+
+    async def delete(self, user_id: str, project_id: str) -> bool:
+        deleted = await self.collection.find_one_and_delete({"id": project_id, "user_id": user_id}, projection={"_id": 0})
+        if deleted is None:
+            return False
+        await self._notify(deleted, None)
+        return True
+
+    async def bulk_write(self, user_id: str, operations: List[Dict[str, Any]],
+                         ordered: bool = True) -> List[Dict[str, Any]]:
+        from pymongo import InsertOne, UpdateOne, DeleteOne
+        from pymongo.errors import BulkWriteError
+
+        # bulk_write only reports totals, so look up targets first to report not_found per item
+        # (and to know each document's state for change listeners)
+        target_ids = [op['id'] for op in operations if op['op'] != 'insert']
+        existing: Dict[str, Dict[str, Any]] = {}
+        if target_ids:
+            cursor = self.collection.find({"id": {"$in": target_ids}, "user_id": user_id}, {"_id": 0})
+            existing = {doc['id']: doc async for doc in cursor}
+
+        results: List[Optional[Dict[str, Any]]] = [None] * len(operations)
+        requests, request_positions, changes = [], [], []
+        for position, operation in enumerate(operations):
+            if operation['op'] == 'insert':
+                request = InsertOne(dict(operation['doc']))
+                previous, current = None, dict(operation['doc'])
+                existing[current['id']] = current
+            elif operation['id'] not in existing:
+                results[position] = _bulk_result(operation, "not_found")
+                if ordered:
+                    break
+                continue
+            elif operation['op'] == 'update':
+                fields = {k: v for k, v in operation['updates'].items() if k not in PROTECTED_FIELDS}
+                request = UpdateOne({"id": operation['id'], "user_id": user_id}, {"$set": fields, "$inc": {"version": 1}})
+                previous = existing[operation['id']]
+                current = {**previous, **fields, "version": previous.get('version', 0) + 1}
+                existing[operation['id']] = current
+            else:
+                request = DeleteOne({"id": operation['id'], "user_id": user_id})
+                # A later delete of the same id in this batch finds nothing
+                previous, current = existing.pop(operation['id']), None
+            requests.append(request)
+            request_positions.append(position)
+            changes.append((previous, current))
+
+        write_errors: Dict[int, str] = {}
+        if requests:
+            try:
+                await self.collection.bulk_write(requests, ordered=ordered)
+            except BulkWriteError as e:
+                write_errors = {err['index']: err.get('errmsg', 'write error') for err in e.details.get('writeErrors', [])}
+
+        success = {"insert": "created", "update": "updated", "delete": "deleted"}
+        first_error = min(write_errors) if write_errors else None
+        for request_index, position in enumerate(request_positions):
+            operation = operations[position]
+            if request_index in write_errors:
+                results[position] = _bulk_result(operation, "error", write_errors[request_index])
+            elif ordered and first_error is not None and request_index > first_error:
+                results[position] = _bulk_result(operation, "skipped")
+            else:
+                results[position] = _bulk_result(operation, success[operation['op']])
+                await self._notify(*changes[request_index])
+        return [
+            result if result is not None else _bulk_result(operation, "skipped")
+            for result, operation in zip(results, operations)
+        ]
+
+
+class TemplateRepository(ABC):
+    """Storage interface for the template catalog"""
+
+    @abstractmethod
+    async def list_all(self) -> List[Dict[str, Any]]:
+        ...
+
+    @abstractmethod
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        ...
+
+    async def catalog_version(self) -> Optional[Any]:
+        """Cheap token that changes with every write from any process, or None if the store has none"""
+        return None
+
+
+class InMemoryTemplateRepository(TemplateRepository):
+    """Templates held in a list (the demo catalog when no database is configured)"""
+
+    def __init__(self, templates: List[Dict[str, Any]]):
+        self._templates = templates
+
+    async def list_all(self) -> List[Dict[str, Any]]:
+        return list(self._templates)
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        self._templates.append(dict(doc))
+
+
+class MongoTemplateRepository(TemplateRepository):
+    """Templates backed by a Motor collection"""
+
+    def __init__(self, collection, max_templates: int = 1000):
+        self.collection = collection
+        self.max_templates = max_templates
+
+    async def list_all(self) -> List[Dict[str, Any]]:
+        return await self.collection.find({}, {"_id": 0}).to_list(self.max_templates)
+
+    async def insert(self, doc: Dict[str, Any]) -> None:
+        await self.collection.insert_one(dict(doc))
+
+
+# ==================== Mongo Indexes ====================
+
+# (keys, options) per collection; every query shape the API issues must be
+# covered by one of these
+MONGO_INDEXES = {
+    "projects": [
+        ([("id", 1)], {"unique": True, "name": "id_unique"}),
+        ([("user_id", 1), ("id", 1)], {"name": "user_id_id"}),
+        ([("user_id", 1), ("created_at", 1), ("id", 1)], {"name": "user_id_created_at_id"}),
+        ([("created_at", 1), ("id", 1)], {"name": "created_at_id"}),
+        # Search filters, in the same (created_at, id) order as the listing
+        ([("user_id", 1), ("category", 1), ("created_at", 1), ("id", 1)], {"name": "user_id_category_created_at_id"}),
+        ([("user_id", 1), ("features", 1), ("created_at", 1), ("id", 1)], {"name": "user_id_features_created_at_id"}),
+        # No stemming or stop words, so every search token is in the index
+        ([("name", "text"), ("description", "text"), ("features", "text")],
+         {"name": "search_text_plain", "default_language": "none"}),
+    ],
+    "templates": [
+        ([("id", 1)], {"unique": True, "name": "id_unique"}),
+    ],
+    "jobs": [
+        ([("id", 1)], {"unique": True, "name": "id_unique"}),
+        # Unfinished jobs whose worker stopped renewing their lease
+        ([("status", 1), ("lease_expires_at", 1)], {"name": "status_lease_expires_at"}),
+        # Finished jobs are deleted once their retention is over; unfinished ones have no expires_at
+        ([("expires_at", 1)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    ],
+    "rate_limits": [
+        # Idle buckets are deleted once they would have refilled
+        ([("expires_at", 1)], {"expireAfterSeconds": 0, "name": "expires_at_ttl"}),
+    ],
+}
+
+# Superseded indexes, dropped by ensure_indexes (a collection has at most one text index)
+MONGO_RETIRED_INDEXES = {
+    "projects": ["search_text"],
+}
+
+_PAGE_SORT = [("created_at", -1), ("id", -1)]
+
+# Representative (collection, filter, sort) for the queries issued by the
+# router, used to check their plans with explain()
+QUERY_SHAPES = [
+    ("projects", {"user_id": "__probe__"}, _PAGE_SORT),
+    ("projects", {"id": "__probe__", "user_id": "__probe__"}, None),
+    ("projects", {}, _PAGE_SORT),
+    ("projects", {"user_id": "__probe__", "category": "__probe__"}, _PAGE_SORT),
+    ("projects", {"user_id": "__probe__", "features": {"$all": ["__probe__"]}}, _PAGE_SORT),
+    ("projects", {"$text": {"$search": "__probe__"}}, None),
+    ("templates", {"id": "__probe__"}, None),
+    ("jobs", {"id": "__probe__"}, None),
+]
+
+
+async def ensure_indexes(db) -> None:
+    """Create the indexes declared in MONGO_INDEXES (no-op if they exist)"""
+    for collection_name, names in MONGO_RETIRED_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        for name in names:
+            if name in existing:
+                await db[collection_name].drop_index(name)
+    for collection_name, indexes in MONGO_INDEXES.items():
+        collection = db[collection_name]
+        for keys, options in indexes:
+            await collection.create_index(keys, **options)
+
+
+def _plan_stages(plan: Any) -> List[str]:
+    """Collect every stage name in an explain() plan tree"""
+    stages = []
+    if isinstance(plan, dict):
+        if 'stage' in plan:
+            stages.append(plan['stage'])
+        for value in plan.values():
+            stages.extend(_plan_stages(value))
+    elif isinstance(plan, list):
+        for item in plan:
+            stages.extend(_plan_stages(item))
+    return stages
+
+
+# Timestamp fields older versions stored as ISO strings (migrate_datetimes.py converts them)
+DATETIME_FIELDS: Dict[str, List[str]] = {
+    "projects": ["created_at", "updated_at"],
+    "templates": ["created_at"],
+}
+
+
+async def verify_datetimes(db) -> None:
+    """Raise if any document still stores a timestamp as a string.
+
+    Mongo compares values of different types by type first, so keyset
+    pages (created_at < a date) would silently skip string-dated projects.
+    """
+    leftovers = []
+    for collection_name, fields in DATETIME_FIELDS.items():
+        query = {"$or": [{field: {"$type": "string"}} for field in fields]}
+        if await db[collection_name].find_one(query, {"_id": 1}) is not None:
+            leftovers.append(collection_name)
+    if leftovers:
+        raise RuntimeError(
+            f"String timestamps found in {', '.join(leftovers)}; run backend/migrate_datetimes.py before starting"
+        )
+
+
+async def verify_query_plans(db) -> None:
+    """Explain every query shape and raise if any falls back to a COLLSCAN"""
+    failures = []
+    for collection_name, query, sort in QUERY_SHAPES:
+        cursor = db[collection_name].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explanation = await cursor.explain()
+        winning_plan = explanation.get('queryPlanner', {}).get('winningPlan', {})
+        if 'COLLSCAN' in _plan_stages(winning_plan):
+            failures.append(f"{collection_name}.find({sorted(query)})")
+    if failures:
+        raise RuntimeError(f"Queries without index support (COLLSCAN): {', '.join(failures)}")
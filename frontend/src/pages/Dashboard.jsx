@@ -11,39 +11,54 @@ const API = `${BACKEND_URL}/api`;
 const Dashboard = () => {
   const navigate = useNavigate();
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchProjects();
   }, []);
 
-  const fetchProjects = async () => {
+  // Without a cursor, loads the first page; with one, appends the page after it
+  const fetchProjects = async (cursor = null) => {
     try {
-      const token = localStorage.getItem('token') || 'demo-token';
+      // Without a token the API serves the demo account
+      const token = localStorage.getItem('token');
       const response = await axios.get(`${API}/projects`, {
-        headers: { 'Authorization': `Bearer ${token}` }
+        headers: token ? { 'Authorization': `Bearer ${token}` } : {},
+        params: cursor ? { cursor } : {}
       });
 
       // Ensure we always set an array
       const data = response.data;
+      let page = [];
 
       if (Array.isArray(data)) {
-        setProjects(data);
+        page = data;
       } else if (Array.isArray(data.projects)) {
-        setProjects(data.projects);
+        page = data.projects;
       } else {
         console.warn("Unexpected response shape:", data);
-        setProjects([]);
       }
+      setProjects((current) => (cursor ? [...current, ...page] : page));
+      setNextCursor((data && data.next_cursor) || null);
 
     } catch (error) {
       console.error('Error fetching projects:', error);
-      setProjects([]);
+      if (!cursor) {
+        setProjects([]);
+      }
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchProjects(nextCursor);
+  };
+
 
   const getStatusColor = (status) => {
     const colors = {
@@ -192,6 +207,20 @@ const Dashboard = () => {
               ))}
             </div>
           )}
+
+          {!loading && nextCursor && (
+            <div className="text-center mt-8">
+              <Button
+                variant="outline"
+                className="border-white/20"
+                onClick={loadMore}
+                disabled={loadingMore}
+                data-testid="projects-load-more-btn"
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </Button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -139,9 +139,9 @@ const NewProject = () => {
         ...projectData,
         custom_design_description: customDesignDescription
       }, {
-        headers: {
-          'Authorization': `Bearer ${localStorage.getItem('token') || 'demo-token'}`
-        }
+        headers: localStorage.getItem('token')
+          ? { 'Authorization': `Bearer ${localStorage.getItem('token')}` }
+          : {}
       });
 
       // Reset project and navigate to dashboard
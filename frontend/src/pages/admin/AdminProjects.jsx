@@ -11,27 +11,41 @@ const API = `${BACKEND_URL}/api`;
 const AdminProjects = () => {
   const navigate = useNavigate();
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [loading, setLoading] = useState(true);
+  const [loadingMore, setLoadingMore] = useState(false);
 
   useEffect(() => {
     fetchProjects();
   }, []);
 
-  const fetchProjects = async () => {
+  // Without a cursor, loads the first page; with one, appends the page after it
+  const fetchProjects = async (cursor = null) => {
     try {
       const token = localStorage.getItem('admin_token') || 'admin-demo-token';
       const response = await axios.get(`${API}/admin/projects`, {
-        headers: { 'Authorization': `Bearer ${token}` }
+        headers: { 'Authorization': `Bearer ${token}` },
+        params: cursor ? { cursor } : {}
       });
-      setProjects(response.data);
+      const page = response.data.projects || [];
+      setProjects((current) => (cursor ? [...current, ...page] : page));
+      setNextCursor(response.data.next_cursor || null);
     } catch (error) {
       console.error('Error fetching projects:', error);
-      setProjects([]);
+      if (!cursor) {
+        setProjects([]);
+      }
     } finally {
       setLoading(false);
+      setLoadingMore(false);
     }
   };
 
+  const loadMore = () => {
+    setLoadingMore(true);
+    fetchProjects(nextCursor);
+  };
+
   const getStatusColor = (status) => {
     const colors = {
       'pending': 'text-yellow-400',
@@ -159,6 +173,20 @@ const AdminProjects = () => {
               ))}
             </div>
           )}
+
+          {!loading && nextCursor && (
+            <div className="text-center mt-8">
+              <Button
+                variant="outline"
+                className="border-white/20"
+                onClick={loadMore}
+                disabled={loadingMore}
+                data-testid="admin-projects-load-more-btn"
+              >
+                {loadingMore ? 'Loading...' : 'Load More'}
+              </Button>
+            </div>
+          )}
         </div>
       </div>
     </div>
@@ -0,0 +1,107 @@
+"""Per-item serialization cost of project list responses, strict vs fast path.
+
+Strict mirrors what FastAPI does for response_model=ProjectPage: validate
+every document into a Project, dump it in JSON mode, then json.dumps. Fast
+is the FAST_SERIALIZATION path: trim trusted documents to the model fields
+and encode them directly.
+
+Usage (from the repo root):
+    python -m tests.benchmarks.bench_serialization [--items 20 100 1000] [--repeat 50] [--json]
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+import argparse
+import json
+import sys
+import time
+import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+from pydantic import TypeAdapter  # noqa: E402
+
+import server  # noqa: E402
+from serialization import FastJSONResponse, trim_to_fields, HAS_ORJSON  # noqa: E402
+
+
+def make_projects(count):
+    now = datetime.now(timezone.utc)
+    return [
+        {
+            "id": str(uuid.uuid4()),
+            "user_id": "bench-user",
+            "name": f"Project {i}",
+            "description": "A realistic description of a generated project " * 3,
+            "category": "saas",
+            "platform": "web",
+            "frontend": "React + Tailwind",
+            "backend": "FastAPI + MongoDB",
+            "ui_template": "SaaS Dashboard",
+            "features": ["User Auth", "Analytics Dashboard", "Payments"],
+            "addons": ["SEO Optimization", "Custom Domain Setup"],
+            "deployment_option": "vercel",
+            "estimated_cost": 8500.0,
+            "estimated_timeline": "2-3 weeks",
+            "status": "pending",
+            "github_repo_url": None,
+            "deployed_url": None,
+            "created_at": now,
+            "updated_at": now,
+        }
+        for i in range(count)
+    ]
+
+
+page_adapter = TypeAdapter(server.ProjectPage)
+
+
+def strict(page):
+    validated = page_adapter.validate_python(page)
+    return json.dumps(page_adapter.dump_python(validated, mode="json")).encode()
+
+
+def fast(page):
+    return FastJSONResponse({
+        "projects": trim_to_fields(page["projects"], server.PROJECT_FIELDS),
+        "next_cursor": page["next_cursor"]
+    }).body
+
+
+def measure(fn, page, repeat):
+    fn(page)  # warm up
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn(page)
+    return (time.perf_counter() - start) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--items", type=int, nargs="+", default=[20, 100, 1000])
+    parser.add_argument("--repeat", type=int, default=50)
+    parser.add_argument("--json", action="store_true", help="Print results as JSON")
+    args = parser.parse_args()
+
+    results = []
+    for count in args.items:
+        page = {"projects": make_projects(count), "next_cursor": None}
+        strict_s = measure(strict, page, args.repeat)
+        fast_s = measure(fast, page, args.repeat)
+        results.append({
+            "items": count,
+            "strict_us_per_item": round(strict_s / count * 1e6, 2),
+            "fast_us_per_item": round(fast_s / count * 1e6, 2),
+            "speedup": round(strict_s / fast_s, 1),
+        })
+
+    if args.json:
+        print(json.dumps({"orjson": HAS_ORJSON, "results": results}, indent=2))
+        return
+    print(f"encoder: {'orjson' if HAS_ORJSON else 'json'}")
+    print(f"{'items':>7} {'strict us/item':>15} {'fast us/item':>13} {'speedup':>8}")
+    for r in results:
+        print(f"{r['items']:>7} {r['strict_us_per_item']:>15} {r['fast_us_per_item']:>13} {r['speedup']:>7}x")
+
+
+if __name__ == "__main__":
+    main()
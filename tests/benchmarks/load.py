@@ -0,0 +1,327 @@
+"""Load and latency benchmark for the SeeForge API.
+
+Drives the ASGI app in-process with a weighted mix of template reads,
+project CRUD, pricing and AI scaffold requests (against a stub LLM of
+configurable latency), once per storage backend, and reports throughput
+and p50/p95/p99 latency per route.
+
+Backends:
+    memory  in-memory repositories (the no-Mongo fallback)
+    sqlite  the embedded SQLite backend, on a temporary file
+    mongo   a local mongod via --mongo-url, else mongomock_motor if installed
+
+Usage (from the repo root):
+    python -m tests.benchmarks.load --duration 10 --users 32 --output bench.json
+    python -m tests.benchmarks.load --compare bench.json --max-regression 0.2
+"""
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import List, Dict, Any, Optional
+import argparse
+import asyncio
+import json
+import logging
+import os
+import platform
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import uuid
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[2] / "backend"))
+
+import httpx  # noqa: E402
+import jwt  # noqa: E402
+
+import server  # noqa: E402
+from auth import TokenVerifier  # noqa: E402
+from settings import Settings  # noqa: E402
+
+BENCH_JWT_SECRET = "bench-secret"
+
+# (route label, weight); labels are reported as-is
+ROUTE_MIX = [
+    ("GET /api/templates", 25),
+    ("GET /api/templates/{id}", 10),
+    ("GET /api/projects", 20),
+    ("GET /api/projects/{id}", 15),
+    ("POST /api/projects", 8),
+    ("PUT /api/projects/{id}", 6),
+    ("DELETE /api/projects/{id}", 2),
+    ("POST /api/pricing/calculate", 8),
+    ("POST /api/pricing/calculate-batch", 3),
+    ("POST /api/ai/generate-scaffold", 3),
+]
+
+SAMPLE_ADDONS = ["Custom Domain Setup", "SEO Optimization", "Payments", "Admin Panel", "Chat Support"]
+SAMPLE_TIERS = ["Idea Spark", "Starter", "MVP Launch", "Growth", "AI Pro"]
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an already sorted list"""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100 * len(sorted_values))))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def project_body(rng: random.Random) -> Dict[str, Any]:
+    return {
+        "name": f"Bench {rng.randint(0, 10**6)}",
+        "description": "Benchmark project",
+        "category": rng.choice(["saas", "ecommerce", "portfolio"]),
+        "frontend": "React",
+        "backend": "FastAPI",
+        "ui_template": "SaaS Dashboard",
+        "features": rng.sample(SAMPLE_ADDONS, 2),
+        "addons": rng.sample(SAMPLE_ADDONS, rng.randint(0, 3)),
+        "tier": rng.choice(SAMPLE_TIERS),
+        "is_student": rng.random() < 0.3,
+    }
+
+
+class VirtualUser:
+    """One simulated client with its own token and project ids"""
+
+    def __init__(self, client: httpx.AsyncClient, rng: random.Random, distinct_configs: int):
+        self.client = client
+        self.rng = rng
+        self.distinct_configs = distinct_configs
+        token = jwt.encode({"sub": f"bench-{uuid.uuid4()}", "exp": int(time.time()) + 3600},
+                           BENCH_JWT_SECRET, algorithm="HS256")
+        self.headers = {"Authorization": f"Bearer {token}"}
+        self.project_ids: List[str] = []
+
+    async def request(self, route: str) -> httpx.Response:
+        c, h, rng = self.client, self.headers, self.rng
+        if route == "GET /api/templates":
+            return await c.get("/api/templates")
+        if route == "GET /api/templates/{id}":
+            return await c.get(f"/api/templates/{rng.randint(1, 4)}")
+        if route == "GET /api/projects":
+            return await c.get("/api/projects", params={"limit": 20}, headers=h)
+        if route == "POST /api/projects":
+            response = await c.post("/api/projects", json=project_body(rng), headers=h)
+            if response.status_code == 200:
+                self.project_ids.append(response.json()["id"])
+            return response
+        if route == "GET /api/projects/{id}":
+            return await c.get(f"/api/projects/{rng.choice(self.project_ids)}", headers=h)
+        if route == "PUT /api/projects/{id}":
+            return await c.put(f"/api/projects/{rng.choice(self.project_ids)}",
+                               json={"status": rng.choice(["pending", "in_progress", "completed"])}, headers=h)
+        if route == "DELETE /api/projects/{id}":
+            return await c.delete(f"/api/projects/{self.project_ids.pop()}", headers=h)
+        if route == "POST /api/pricing/calculate":
+            return await c.post("/api/pricing/calculate", json=project_body(rng))
+        if route == "POST /api/pricing/calculate-batch":
+            return await c.post("/api/pricing/calculate-batch",
+                                json={"configurations": [project_body(rng) for _ in range(25)]})
+        if route == "POST /api/ai/generate-scaffold":
+            # A bounded pool of configs gives a realistic scaffold cache hit rate
+            config = {"name": f"scaffold-{rng.randrange(self.distinct_configs)}", "frontend": "React"}
+            return await c.post("/api/ai/generate-scaffold", json={"project_config": config}, headers=h)
+        raise ValueError(f"Unknown route {route}")
+
+
+async def run_load(app, duration: float, users: int, seed: int, distinct_configs: int) -> Dict[str, Any]:
+    routes = [route for route, _ in ROUTE_MIX]
+    weights = [weight for _, weight in ROUTE_MIX]
+    samples: Dict[str, List[float]] = {route: [] for route in routes}
+    errors: Dict[str, int] = {route: 0 for route in routes}
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        async def user_loop(index: int):
+            rng = random.Random(seed + index)
+            user = VirtualUser(client, rng, distinct_configs)
+            deadline = time.perf_counter() + duration
+            while time.perf_counter() < deadline:
+                route = rng.choices(routes, weights)[0]
+                if route.endswith("{id}") and route.startswith(("GET /api/projects", "PUT", "DELETE")) \
+                        and not user.project_ids:
+                    route = "POST /api/projects"
+                start = time.perf_counter()
+                try:
+                    response = await user.request(route)
+                    ok = response.status_code < 400
+                except Exception:
+                    ok = False
+                samples[route].append(time.perf_counter() - start)
+                if not ok:
+                    errors[route] += 1
+
+        started = time.perf_counter()
+        await asyncio.gather(*(user_loop(i) for i in range(users)))
+        elapsed = time.perf_counter() - started
+
+    report = {}
+    for route in routes:
+        latencies = sorted(samples[route])
+        if not latencies:
+            continue
+        report[route] = {
+            "requests": len(latencies),
+            "errors": errors[route],
+            "throughput_rps": round(len(latencies) / elapsed, 1),
+            "mean_ms": round(sum(latencies) / len(latencies) * 1000, 3),
+            "p50_ms": round(percentile(latencies, 50) * 1000, 3),
+            "p95_ms": round(percentile(latencies, 95) * 1000, 3),
+            "p99_ms": round(percentile(latencies, 99) * 1000, 3),
+        }
+    total = sum(len(v) for v in samples.values())
+    return {"elapsed_s": round(elapsed, 2), "total_requests": total,
+            "throughput_rps": round(total / elapsed, 1), "routes": report}
+
+
+def configure_common(llm_latency: float) -> None:
+    """Point auth and the LLM at benchmark stand-ins"""
+    async def stub_llm(system_message: str, prompt: str) -> Dict[str, Any]:
+        await asyncio.sleep(llm_latency)
+        return {"file_structure": ["src/", "package.json"], "key_files": {"package.json": "{}"},
+                "setup_instructions": ["npm install"], "estimated_time": "1 hour"}
+
+    server.token_verifier = TokenVerifier(BENCH_JWT_SECRET)
+    server.llm_available = lambda: True
+    server.GEMINI_API_KEY = "bench"
+    server.llm_gateway.call = stub_llm
+    # Measure the app itself: admission control would turn the offered load into 429/503s
+    server.RATE_LIMITS = dict.fromkeys(server.RATE_LIMITS)
+    server.LLM_SHED_THRESHOLD = float('inf')
+
+
+def backend_settings(name: str, mongo_url: Optional[str]):
+    """Settings for an app on the named backend; returns (settings, source label, cleanup function)"""
+    common = dict(preload_llm_sdk=False, mongo_warmup_timeout=5)
+
+    if name == "memory":
+        return Settings(storage_backend="memory", mongo_url=None, **common), "in-memory", lambda: None
+
+    if name == "sqlite":
+        workdir = tempfile.mkdtemp(prefix="seeforge_bench_")
+        path = os.path.join(workdir, "bench.db")
+        return (Settings(storage_backend="sqlite", mongo_url=None, sqlite_path=path, **common), path,
+                lambda: shutil.rmtree(workdir, ignore_errors=True))
+
+    db_name = f"seeforge_bench_{os.getpid()}"
+    if mongo_url:
+        settings = Settings(storage_backend="mongo", mongo_url=mongo_url, db_name=db_name, **common)
+        source = mongo_url
+    else:
+        from mongomock_motor import AsyncMongoMockClient
+        settings = Settings(storage_backend="mongo", mongo_url="mongodb://mongomock", db_name=db_name,
+                            mongo_client_factory=AsyncMongoMockClient, **common)
+        source = "mongomock_motor"
+    return settings, source, lambda: None
+
+
+async def seed_mongo_templates() -> None:
+    """Mongo startup doesn't seed the catalog the way SQLite does; give the template routes something to read"""
+    if server.STORAGE_BACKEND == "mongo" and not await server.db.templates.count_documents({}):
+        await server.db.templates.insert_many([dict(t) for t in server.demo_templates])
+
+
+def git_revision() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "HEAD"], text=True, stderr=subprocess.DEVNULL).strip()
+    except Exception:
+        return None
+
+
+def compare(current: Dict[str, Any], baseline: Dict[str, Any], max_regression: float) -> bool:
+    """Print p95/throughput deltas per route; return False if any p95 regressed beyond max_regression"""
+    ok = True
+    for backend, result in current["backends"].items():
+        base = baseline.get("backends", {}).get(backend)
+        if not base:
+            continue
+        print(f"\n[{backend}] vs baseline {baseline.get('git_revision', '?')[:12]}")
+        for route, stats in result["routes"].items():
+            base_stats = base["routes"].get(route)
+            if not base_stats or not base_stats["p95_ms"]:
+                continue
+            p95_delta = stats["p95_ms"] / base_stats["p95_ms"] - 1
+            rps_delta = stats["throughput_rps"] / base_stats["throughput_rps"] - 1 if base_stats["throughput_rps"] else 0
+            flag = "  REGRESSION" if p95_delta > max_regression else ""
+            print(f"  {route:<36} p95 {p95_delta:+7.1%}  rps {rps_delta:+7.1%}{flag}")
+            ok = ok and not flag
+    return ok
+
+
+def print_report(results: Dict[str, Any]) -> None:
+    for backend, result in results["backends"].items():
+        print(f"\n[{backend}] {result['source']}: {result['total_requests']} requests in "
+              f"{result['elapsed_s']}s ({result['throughput_rps']} req/s)")
+        print(f"  {'route':<36} {'reqs':>7} {'err':>5} {'rps':>8} {'p50 ms':>8} {'p95 ms':>8} {'p99 ms':>8}")
+        for route, s in result["routes"].items():
+            print(f"  {route:<36} {s['requests']:>7} {s['errors']:>5} {s['throughput_rps']:>8} "
+                  f"{s['p50_ms']:>8} {s['p95_ms']:>8} {s['p99_ms']:>8}")
+
+
+async def main_async(args) -> int:
+    configure_common(args.llm_latency)
+    results = {
+        "git_revision": git_revision(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "config": {"duration_s": args.duration, "users": args.users, "llm_latency_s": args.llm_latency,
+                   "distinct_configs": args.distinct_configs, "seed": args.seed},
+        "backends": {},
+    }
+    for backend in args.backends:
+        try:
+            settings, source, cleanup = backend_settings(backend, args.mongo_url)
+        except ImportError as e:
+            print(f"Skipping {backend} backend: {e}", file=sys.stderr)
+            continue
+        # A fresh app per backend: its startup connects storage and attaches every change listener
+        server.scaffold_cache.clear()
+        app = server.create_app(settings)
+        try:
+            async with app.router.lifespan_context(app):
+                await seed_mongo_templates()
+                try:
+                    result = await run_load(app, args.duration, args.users, args.seed, args.distinct_configs)
+                finally:
+                    if server.STORAGE_BACKEND == "mongo":
+                        await server.client.drop_database(settings.db_name)
+        finally:
+            cleanup()
+        results["backends"][backend] = {"source": source, **result}
+
+    print_report(results)
+    if args.output:
+        Path(args.output).write_text(json.dumps(results, indent=2))
+        print(f"\nResults written to {args.output}")
+    if args.compare:
+        baseline = json.loads(Path(args.compare).read_text())
+        if not compare(results, baseline, args.max_regression):
+            return 1
+    return 0
+
+
+def main():
+    parser = argparse.ArgumentParser(description="SeeForge API load benchmark")
+    parser.add_argument("--duration", type=float, default=10, help="Seconds of load per backend")
+    parser.add_argument("--users", type=int, default=32, help="Concurrent virtual users")
+    parser.add_argument("--llm-latency", type=float, default=0.5, help="Stub LLM latency in seconds")
+    parser.add_argument("--distinct-configs", type=int, default=50, help="Distinct scaffold configs in the mix")
+    parser.add_argument("--backends", nargs="+", default=["memory", "mongo"],
+                        choices=["memory", "sqlite", "mongo"])
+    parser.add_argument("--mongo-url", help="Local mongod to use instead of mongomock_motor")
+    parser.add_argument("--seed", type=int, default=1234)
+    parser.add_argument("--output", help="Write machine-readable results to this JSON file")
+    parser.add_argument("--compare", help="Baseline JSON from an earlier --output run")
+    parser.add_argument("--max-regression", type=float, default=0.2,
+                        help="Fail if any route's p95 is this fraction slower than the baseline")
+    args = parser.parse_args()
+
+    logging.disable(logging.WARNING)
+    sys.exit(asyncio.run(main_async(args)))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,96 @@
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Any, Dict
+import sys
+import time
+import uuid
+
+import jwt
+import pytest
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "backend"))
+
+from storage import InMemoryProjectRepository, MongoProjectRepository, ensure_indexes  # noqa: E402
+from sqlite_store import SQLiteDatabase, SQLiteProjectRepository  # noqa: E402
+
+BASE_TIME = datetime(2026, 1, 1, tzinfo=timezone.utc)
+TEST_JWT_SECRET = "test-secret"
+
+
+@pytest.fixture
+def anyio_backend():
+    return "asyncio"
+
+
+def make_project(index: int, user_id: str = "user-1", **fields: Any) -> Dict[str, Any]:
+    """A project document as the routes store it, created index minutes after BASE_TIME"""
+    doc = {
+        "id": f"project-{index:04d}",
+        "user_id": user_id,
+        "name": f"Project {index}",
+        "description": "A test project",
+        "category": "saas",
+        "frontend": "React",
+        "backend": "FastAPI",
+        "features": [],
+        "addons": [],
+        "estimated_cost": 1000.0,
+        "status": "pending",
+        "created_at": BASE_TIME + timedelta(minutes=index),
+        "updated_at": BASE_TIME + timedelta(minutes=index),
+        "version": 1,
+    }
+    doc.update(fields)
+    return doc
+
+
+@pytest.fixture(params=["memory", "sqlite", "mongo"])
+async def project_repo(request, tmp_path):
+    """The same empty project repository on every storage backend"""
+    if request.param == "memory":
+        yield InMemoryProjectRepository()
+    elif request.param == "sqlite":
+        database = SQLiteDatabase(str(tmp_path / "projects.db"))
+        await database.initialize()
+        yield SQLiteProjectRepository(database)
+        database.close()
+    else:
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        db = mongomock_motor.AsyncMongoMockClient()[f"test_{uuid.uuid4().hex}"]
+        await ensure_indexes(db)
+        yield MongoProjectRepository(db.projects)
+
+
+def auth_headers(user_id: str) -> Dict[str, str]:
+    token = jwt.encode({"sub": user_id, "exp": int(time.time()) + 3600}, TEST_JWT_SECRET, algorithm="HS256")
+    return {"Authorization": f"Bearer {token}"}
+
+
+@pytest.fixture(params=["memory", "sqlite", "mongo"])
+def api(request, monkeypatch, tmp_path):
+    """TestClient for a fresh app on each storage backend, with test JWTs and "admin-1" as the only admin"""
+    from fastapi.testclient import TestClient
+
+    import server
+    from auth import TokenVerifier
+    from settings import Settings
+
+    if request.param == "memory":
+        settings = Settings(storage_backend="memory", mongo_url=None)
+    elif request.param == "sqlite":
+        settings = Settings(storage_backend="sqlite", mongo_url=None, sqlite_path=str(tmp_path / "api.db"))
+    else:
+        mongomock_motor = pytest.importorskip("mongomock_motor")
+        # mongomock clients share one server, so each app gets its own database
+        settings = Settings(storage_backend="mongo", mongo_url="mongodb://mongomock", db_name=f"test_{uuid.uuid4().hex}",
+                            mongo_client_factory=mongomock_motor.AsyncMongoMockClient)
+    settings.preload_llm_sdk = False
+
+    monkeypatch.setattr(server, "token_verifier", TokenVerifier(TEST_JWT_SECRET))
+    monkeypatch.setattr(server, "ADMIN_USER_IDS", {"admin-1"})
+    server.scaffold_cache.clear()
+    with TestClient(server.create_app(settings)) as client:
+        if request.param == "mongo":
+            # Unlike SQLite, Mongo startup doesn't seed the template catalog
+            client.portal.call(server.db.templates.insert_many, [dict(t) for t in server.demo_templates])
+        yield client
@@ -0,0 +1,54 @@
+from datetime import datetime, timezone
+
+import pytest
+
+from analytics import MongoAnalyticsStore, rebuild_counters, _day
+
+from tests.conftest import auth_headers, make_project
+
+pytestmark = pytest.mark.anyio
+
+
+def test_day_of_legacy_and_unparseable_created_at():
+    assert _day(datetime(2026, 3, 1, 23, 30, tzinfo=timezone.utc)) == "2026-03-01"
+    assert _day("2026-03-01T23:30:00-02:00") == "2026-03-02"
+    assert _day("not a date") == "unknown"
+    assert _day(None) == "unknown"
+
+
+async def _iterate(docs):
+    for doc in docs:
+        yield doc
+
+
+async def test_mongo_rebuild_matches_streamed_rebuild_with_legacy_string_dates():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    projects = mongomock_motor.AsyncMongoMockClient()["tests"]["projects"]
+    docs = [
+        make_project(1, tier="Starter", addons=["SEO Optimization"]),
+        make_project(2, tier="Growth", created_at="2026-01-01T00:02:00+00:00"),
+        make_project(3, created_at="2026-01-05T09:00:00"),
+        make_project(4, created_at="garbage"),
+    ]
+    await projects.insert_many([dict(doc) for doc in docs])
+    store = MongoAnalyticsStore(mongomock_motor.AsyncMongoMockClient()["tests"]["analytics_counters"])
+    counters = await store.rebuild(projects)
+    assert counters == await rebuild_counters(_iterate(docs))
+    assert counters["day:2026-01-01"] == (2, 2000.0)
+    assert counters["day:unknown"] == (1, 1000.0)
+    assert await store.counters() == counters
+
+
+def test_rebuild_endpoint_requires_an_admin(api):
+    assert api.post("/api/admin/analytics/rebuild").status_code == 403
+    assert api.post("/api/admin/analytics/rebuild", headers=auth_headers("user-1")).status_code == 403
+    response = api.post("/api/admin/analytics/rebuild", headers=auth_headers("admin-1"))
+    assert response.status_code == 200
+    assert "projects" in response.json()
+
+
+def test_analytics_summary_requires_an_admin(api):
+    assert api.get("/api/admin/analytics").status_code == 403
+    assert api.get("/api/admin/analytics", headers=auth_headers("user-1")).status_code == 403
+    response = api.get("/api/admin/analytics", params={"days": 7}, headers=auth_headers("admin-1"))
+    assert response.status_code == 200
@@ -0,0 +1,105 @@
+import time
+
+import jwt
+import pytest
+
+import auth
+from auth import InvalidTokenError, TokenVerifier
+
+from tests.conftest import TEST_JWT_SECRET, auth_headers
+
+NOW = 1_800_000_000.0
+
+
+def make_token(secret=TEST_JWT_SECRET, **claims):
+    return jwt.encode({"sub": "user-1", **claims}, secret, algorithm="HS256")
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Frozen time for both the verifier's cache and PyJWT's exp check"""
+    now = [NOW]
+    monkeypatch.setattr(auth.time, "time", lambda: now[0])
+    monkeypatch.setattr(jwt.api_jwt, "datetime", _FrozenDatetime(now))
+    return now
+
+
+class _FrozenDatetime:
+    def __init__(self, now):
+        self._now = now
+
+    def __getattr__(self, name):
+        from datetime import datetime
+        return getattr(datetime, name)
+
+    def now(self, tz=None):
+        from datetime import datetime
+        return datetime.fromtimestamp(self._now[0], tz)
+
+
+def test_rejects_a_bad_signature_and_an_expired_token():
+    verifier = TokenVerifier(TEST_JWT_SECRET)
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(make_token(secret="another-secret", exp=int(time.time()) + 60))
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(make_token(exp=int(time.time()) - 60))
+
+
+def test_checks_the_audience_only_when_configured():
+    token = make_token(aud="other-app", exp=int(time.time()) + 60)
+    with pytest.raises(InvalidTokenError):
+        TokenVerifier(TEST_JWT_SECRET, audience="authenticated").verify(token)
+    assert TokenVerifier(TEST_JWT_SECRET, audience="other-app").verify(token)["sub"] == "user-1"
+    assert TokenVerifier(TEST_JWT_SECRET).verify(token)["sub"] == "user-1"
+
+
+def test_cached_claims_expire_at_the_tokens_exp(clock, monkeypatch):
+    verifier = TokenVerifier(TEST_JWT_SECRET, max_cache_seconds=300)
+    token = make_token(exp=int(NOW) + 60)
+    decodes = []
+    decode = verifier._decode
+    monkeypatch.setattr(verifier, "_decode", lambda t: decodes.append(t) or decode(t))
+
+    assert verifier.verify(token)["sub"] == "user-1"
+    clock[0] = NOW + 59
+    assert verifier.verify(token)["sub"] == "user-1"
+    assert len(decodes) == 1
+
+    # Past exp the cache entry is gone and verification fails again
+    clock[0] = NOW + 61
+    with pytest.raises(InvalidTokenError):
+        verifier.verify(token)
+    assert len(decodes) == 2
+
+
+def test_cache_entries_are_capped_at_max_cache_seconds(clock, monkeypatch):
+    verifier = TokenVerifier(TEST_JWT_SECRET, max_cache_seconds=10)
+    token = make_token(exp=int(NOW) + 3600)
+    decodes = []
+    decode = verifier._decode
+    monkeypatch.setattr(verifier, "_decode", lambda t: decodes.append(t) or decode(t))
+    verifier.verify(token)
+    clock[0] = NOW + 11
+    verifier.verify(token)
+    assert len(decodes) == 2
+
+
+def test_api_rejects_bad_tokens_with_401(api):
+    expired = make_token(exp=int(time.time()) - 60)
+    forged = make_token(secret="another-secret", exp=int(time.time()) + 60)
+    for headers in ({"Authorization": f"Bearer {expired}"}, {"Authorization": f"Bearer {forged}"},
+                    {"Authorization": "Basic dXNlcjpwYXNz"}):
+        response = api.get("/api/projects", headers=headers)
+        assert response.status_code == 401
+        assert response.headers["WWW-Authenticate"] == "Bearer"
+    assert api.get("/api/projects", headers=auth_headers("user-1")).status_code == 200
+
+
+def test_missing_header_is_the_demo_user_only_while_allowed(api, monkeypatch):
+    import server
+
+    assert api.get("/api/projects").status_code == 200
+    monkeypatch.setattr(server, "ALLOW_DEMO_USER", False)
+    response = api.get("/api/projects")
+    assert response.status_code == 401
+    assert response.json()["detail"] == "Missing bearer token"
@@ -0,0 +1,56 @@
+import os
+import time
+
+import pytest
+
+from blob_store import FileBlobStore, InMemoryBlobStore
+from scaffold_archive import load_manifest, store_scaffold
+
+pytestmark = pytest.mark.anyio
+
+SCAFFOLD = {"file_structure": ["src/"], "key_files": {"src/main.py": "print('hi')\n", "README.md": "# Demo\n"}}
+
+
+async def test_in_memory_store_evicts_least_recently_used_beyond_max_bytes():
+    store = InMemoryBlobStore(max_bytes=10)
+    first = await store.put(b"aaaa")
+    second = await store.put(b"bbbb")
+    assert await store.get(first) == b"aaaa"
+    await store.put(b"cccc")
+    assert await store.exists(first)
+    assert not await store.exists(second)
+    assert store.stats() == {"blobs": 2, "bytes": 8, "evictions": 1}
+
+
+async def test_file_store_prunes_blobs_untouched_for_max_age(tmp_path):
+    store = FileBlobStore(str(tmp_path), max_age_seconds=60)
+    stale = await store.put(b"stale")
+    fresh = await store.put(b"fresh")
+    old = time.time() - 120
+    os.utime(store._path(stale), (old, old))
+    os.utime(store._path(fresh), (old, old))
+    # Reading refreshes a blob, so only the untouched one is pruned
+    assert await store.get(fresh) == b"fresh"
+    assert store.prune() == 1
+    assert not await store.exists(stale)
+    assert await store.exists(fresh)
+
+
+async def test_manifest_only_loads_for_its_owner():
+    store = InMemoryBlobStore()
+    manifest_id = await store_scaffold(store, "user-1", SCAFFOLD, name="demo")
+    manifest = await load_manifest(store, manifest_id, "user-1")
+    assert [path for path, _ in manifest["files"]] == ["README.md", "src/main.py"]
+    with pytest.raises(KeyError):
+        await load_manifest(store, manifest_id, "user-2")
+    # The same scaffold generated by another user gets its own id
+    assert await store_scaffold(store, "user-2", SCAFFOLD, name="demo") != manifest_id
+
+
+async def test_manifest_with_expired_files_is_missing():
+    store = InMemoryBlobStore()
+    manifest_id = await store_scaffold(store, "user-1", SCAFFOLD, name="demo")
+    manifest = await load_manifest(store, manifest_id, "user-1")
+    del store._blobs[manifest["files"][0][1]]
+    with pytest.raises(KeyError):
+        await load_manifest(store, manifest_id, "user-1")
@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+from catalog import TemplateCatalogCache
+from sqlite_store import SQLiteDatabase, SQLiteTemplateRepository
+
+pytestmark = pytest.mark.anyio
+
+
+def make_template(template_id: str):
+    return {"id": template_id, "name": template_id.title(), "category": "saas", "description": "A template"}
+
+
+def make_cache(repo: SQLiteTemplateRepository) -> TemplateCatalogCache:
+    return TemplateCatalogCache(
+        repo.list_all,
+        serialize_list=lambda ts: json.dumps(sorted(t['id'] for t in ts)).encode(),
+        serialize_item=lambda t: json.dumps(t['id']).encode(),
+        ttl_seconds=3600,
+        load_version=repo.catalog_version,
+        check_interval=0,
+    )
+
+
+async def test_another_workers_template_write_invalidates_the_catalog(tmp_path):
+    # Two databases on one file stand in for two workers
+    path = str(tmp_path / "projects.db")
+    first, second = SQLiteDatabase(path), SQLiteDatabase(path)
+    await first.initialize()
+    await second.initialize()
+    try:
+        writer, reader = SQLiteTemplateRepository(first), SQLiteTemplateRepository(second)
+        await writer.insert(make_template("blog"))
+        cache = make_cache(reader)
+        before = await cache.snapshot()
+        assert json.loads(before.list_body) == ["blog"]
+        assert await cache.snapshot() is before
+
+        await writer.insert(make_template("shop"))
+        after = await cache.snapshot()
+        assert json.loads(after.list_body) == ["blog", "shop"]
+        assert after.list_etag != before.list_etag
+    finally:
+        first.close()
+        second.close()
+
+
+async def test_version_is_checked_at_most_once_per_interval(tmp_path):
+    database = SQLiteDatabase(str(tmp_path / "projects.db"))
+    await database.initialize()
+    try:
+        repo = SQLiteTemplateRepository(database)
+        cache = make_cache(repo)
+        cache.check_interval = 3600
+        before = await cache.snapshot()
+        await repo.insert(make_template("blog"))
+        assert await cache.snapshot() is before
+    finally:
+        database.close()
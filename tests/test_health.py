@@ -0,0 +1,69 @@
+import asyncio
+
+import httpx
+import pytest
+
+from settings import Settings
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ready_only_between_startup_and_shutdown(monkeypatch):
+    import server
+
+    # Hold startup part-way through, after storage is connected
+    release = asyncio.Event()
+    reload_pricing = server.reload_pricing
+
+    async def slow_reload_pricing():
+        await release.wait()
+        return await reload_pricing()
+
+    monkeypatch.setattr(server, "reload_pricing", slow_reload_pricing)
+    settings = Settings(storage_backend="memory", mongo_url=None)
+    settings.preload_llm_sdk = False
+    app = server.create_app(settings)
+
+    # ASGITransport doesn't run the lifespan, so the test drives it
+    async with httpx.AsyncClient(transport=httpx.ASGITransport(app=app), base_url="http://test") as client:
+        async def status(path):
+            response = await client.get(path)
+            return response.status_code, response.json()
+
+        # Storage still points wherever an earlier app in this process left it, so only startup is checked
+        code, body = await status("/api/health/ready")
+        assert (code, body["checks"]["startup"]) == (503, False)
+        assert await status("/api/health/live") == (200, {"status": "alive"})
+
+        lifespan = app.router.lifespan_context(app)
+        starting = asyncio.create_task(lifespan.__aenter__())
+        await asyncio.sleep(0.01)
+        assert not starting.done()
+        assert (await status("/api/health/ready"))[0] == 503
+        assert (await status("/api/health/live"))[0] == 200
+
+        release.set()
+        await starting
+        assert await status("/api/health/ready") == (200, {"status": "ready", "checks": {"startup": True}})
+
+        await lifespan.__aexit__(None, None, None)
+        assert (await status("/api/health/ready"))[0] == 503
+        assert (await status("/api/health/live"))[0] == 200
+
+
+def test_ready_reports_a_failed_database_ping(api, monkeypatch):
+    import server
+
+    if not server.HAS_MONGO:
+        pytest.skip("Only MongoDB is pinged")
+
+    class UnreachableDatabase:
+        async def command(self, name):
+            raise ConnectionError("no servers available")
+
+    assert api.get("/api/health/ready").status_code == 200
+    monkeypatch.setattr(server, "db", UnreachableDatabase())
+    response = api.get("/api/health/ready")
+    assert response.status_code == 503
+    assert response.json()["checks"] == {"startup": True, "mongo": False}
+    assert api.get("/api/health/live").status_code == 200
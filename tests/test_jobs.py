@@ -0,0 +1,94 @@
+from datetime import datetime, timedelta, timezone
+import asyncio
+
+import pytest
+
+from jobs import (
+    InMemoryJobStore, JobQueue, QueueFullError, JOB_COMPLETED, JOB_FAILED, JOB_QUEUED, JOB_RUNNING
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class SlowCreateStore(InMemoryJobStore):
+    async def create(self, job):
+        await asyncio.sleep(0.01)
+        await super().create(job)
+
+
+async def echo(payload):
+    return payload
+
+
+def stored_job(job_id, status, lease_expires_at=None):
+    now = datetime.now(timezone.utc)
+    return {"id": job_id, "kind": "echo", "user_id": "user-1", "status": status, "payload": {"n": 1},
+            "result": None, "error": None, "created_at": now, "updated_at": now,
+            "lease_expires_at": lease_expires_at}
+
+
+async def test_concurrent_submits_never_overfill_the_queue():
+    store = SlowCreateStore()
+    queue = JobQueue(store, concurrency=1, max_queued=2)
+    queue.register("echo", echo)
+    # Workers not started: nothing drains the queue while the submits race
+    queue.start = lambda: None
+    results = await asyncio.gather(*(queue.submit("echo", {}, "user-1") for _ in range(5)),
+                                   return_exceptions=True)
+    accepted = [r for r in results if isinstance(r, dict)]
+    assert len(accepted) == 2
+    assert all(isinstance(r, QueueFullError) for r in results if not isinstance(r, dict))
+    assert len(store._jobs) == 2
+
+
+async def test_expired_jobs_are_requeued_or_failed_on_start():
+    store = InMemoryJobStore()
+    expired = datetime.now(timezone.utc) - timedelta(minutes=5)
+    await store.create(stored_job("queued-job", JOB_QUEUED, expired))
+    await store.create(stored_job("running-job", JOB_RUNNING, expired))
+    await store.create(stored_job("legacy-job", JOB_QUEUED))
+    await store.create(stored_job("live-job", JOB_RUNNING, datetime.now(timezone.utc) + timedelta(minutes=5)))
+    queue = JobQueue(store, concurrency=1, lease_seconds=60)
+    queue.register("echo", echo)
+    queue.start()
+    try:
+        for _ in range(100):
+            if (await store.get("legacy-job"))['status'] == JOB_COMPLETED:
+                break
+            await asyncio.sleep(0.01)
+    finally:
+        await queue.stop()
+    assert (await store.get("queued-job"))['status'] == JOB_COMPLETED
+    assert (await store.get("legacy-job"))['result'] == {"n": 1}
+    assert (await store.get("running-job"))['status'] == JOB_FAILED
+    assert (await store.get("live-job"))['status'] == JOB_RUNNING
+
+
+async def test_subscribe_polls_jobs_held_elsewhere_and_heartbeats():
+    store = InMemoryJobStore()
+    await store.create(stored_job("remote-job", JOB_RUNNING, datetime.now(timezone.utc) + timedelta(minutes=5)))
+    queue = JobQueue(store)
+    updates = queue.subscribe("remote-job", poll_interval=0.01)
+    assert (await updates.__anext__())['status'] == JOB_RUNNING
+    assert await updates.__anext__() is None
+    # Another worker finishes the job; only the store sees it
+    await store.update("remote-job", {"status": JOB_COMPLETED, "result": "done"})
+    final = await updates.__anext__()
+    assert final['status'] == JOB_COMPLETED and final['result'] == "done"
+    with pytest.raises(StopAsyncIteration):
+        await updates.__anext__()
+
+
+async def test_finished_jobs_get_an_expiry():
+    store = InMemoryJobStore()
+    queue = JobQueue(store, retention_seconds=3600)
+    queue.register("echo", echo)
+    job = await queue.submit("echo", {}, "user-1")
+    try:
+        async for update in queue.subscribe(job['id']):
+            pass
+    finally:
+        await queue.stop()
+    finished = await store.get(job['id'])
+    assert finished['status'] == JOB_COMPLETED
+    assert finished['expires_at'] > finished['updated_at']
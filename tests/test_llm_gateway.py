@@ -0,0 +1,196 @@
+import asyncio
+
+import pytest
+
+import llm_gateway
+from llm_gateway import (
+    CircuitBreaker, CircuitOpenError, LLMBusyError, LLMGateway, CIRCUIT_CLOSED, CIRCUIT_HALF_OPEN, CIRCUIT_OPEN
+)
+
+pytestmark = pytest.mark.anyio
+
+
+class Clock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    clock = Clock()
+    monkeypatch.setattr(llm_gateway.time, "monotonic", clock)
+    return clock
+
+
+@pytest.fixture
+def sleeps(monkeypatch):
+    """Backoff delays requested by the gateway; they return at once"""
+    delays = []
+    real_sleep = asyncio.sleep
+
+    async def sleep(delay, *args, **kwargs):
+        delays.append(delay)
+        await real_sleep(0)
+
+    monkeypatch.setattr(llm_gateway.asyncio, "sleep", sleep)
+    monkeypatch.setattr(llm_gateway.random, "uniform", lambda low, high: 1.0)
+    return delays
+
+
+class StubLLM:
+    """Fails the first `failures` calls, then answers"""
+
+    def __init__(self, failures: int = 0, delay: float = 0):
+        self.failures = failures
+        self.delay = delay
+        self.calls = 0
+
+    async def __call__(self, system_message: str, prompt: str):
+        self.calls += 1
+        if self.delay:
+            await asyncio.sleep(self.delay)
+        if self.calls <= self.failures:
+            raise RuntimeError(f"provider error {self.calls}")
+        return f"answer to {prompt}"
+
+
+def test_breaker_opens_after_consecutive_failures_and_probes_once(clock):
+    breaker = CircuitBreaker(failure_threshold=3, reset_timeout=30)
+    for _ in range(2):
+        breaker.before_call()
+        breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+    breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    with pytest.raises(CircuitOpenError) as rejected:
+        breaker.before_call()
+    assert rejected.value.retry_after == 30
+
+    clock.now += 30
+    breaker.before_call()
+    assert breaker.state == CIRCUIT_HALF_OPEN
+    # Only one probe at a time
+    with pytest.raises(CircuitOpenError):
+        breaker.before_call()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_OPEN
+
+    clock.now += 30
+    breaker.before_call()
+    breaker.record_success()
+    assert breaker.state == CIRCUIT_CLOSED
+    assert breaker.consecutive_failures == 0
+
+
+def test_a_success_resets_the_failure_count():
+    breaker = CircuitBreaker(failure_threshold=2)
+    breaker.record_failure()
+    breaker.record_success()
+    breaker.record_failure()
+    assert breaker.state == CIRCUIT_CLOSED
+
+
+async def test_retries_with_exponential_backoff_until_success(sleeps):
+    stub = StubLLM(failures=2)
+    gateway = LLMGateway(stub, retries=2, backoff_base=0.5, breaker=CircuitBreaker(failure_threshold=5))
+    assert await gateway.complete("system", "hello") == "answer to hello"
+    assert stub.calls == 3
+    assert sleeps == [0.5, 1.0]
+    assert gateway.stats["successes"] == 1
+    assert gateway.breaker.consecutive_failures == 0
+
+
+async def test_gives_up_after_the_retry_budget_and_opens_the_circuit(sleeps, clock):
+    stub = StubLLM(failures=10)
+    gateway = LLMGateway(stub, retries=2, breaker=CircuitBreaker(failure_threshold=3, reset_timeout=30))
+    with pytest.raises(RuntimeError, match="provider error 3"):
+        await gateway.complete("system", "hello")
+    assert stub.calls == 3
+    assert gateway.stats["failures"] == 1
+    assert gateway.breaker.state == CIRCUIT_OPEN
+
+    # Rejected without reaching the provider
+    with pytest.raises(CircuitOpenError):
+        await gateway.complete("system", "hello")
+    assert stub.calls == 3
+    assert gateway.stats["rejected"] == 1
+
+    # After the reset window a successful probe closes the circuit
+    clock.now += 30
+    stub.failures = 0
+    assert await gateway.complete("system", "again") == "answer to again"
+    assert gateway.breaker.state == CIRCUIT_CLOSED
+
+
+async def test_each_attempt_is_bounded_by_the_timeout():
+    stub = StubLLM(delay=1)
+    gateway = LLMGateway(stub, timeout=0.05, retries=1, backoff_base=0)
+    with pytest.raises(TimeoutError):
+        await gateway.complete("system", "slow")
+    assert stub.calls == 2
+    assert gateway.stats["timeouts"] == 2
+    assert gateway.in_flight == 0
+
+
+async def test_concurrent_calls_are_capped_by_the_semaphore():
+    release = asyncio.Event()
+    running = []
+    peak = 0
+
+    async def call(system_message, prompt):
+        nonlocal peak
+        running.append(prompt)
+        peak = max(peak, len(running))
+        await release.wait()
+        running.remove(prompt)
+        return prompt
+
+    gateway = LLMGateway(call, max_concurrency=2, timeout=5, retries=0)
+    tasks = [asyncio.create_task(gateway.complete("system", str(i))) for i in range(5)]
+    await asyncio.sleep(0.01)
+    assert gateway.in_flight == 2
+    assert gateway.waiting == 3
+    assert gateway.load == 5
+    release.set()
+    assert sorted(await asyncio.gather(*tasks)) == ["0", "1", "2", "3", "4"]
+    assert peak == 2
+    assert gateway.load == 0
+
+
+async def test_waiting_longer_than_the_timeout_for_a_slot_is_rejected():
+    release = asyncio.Event()
+
+    async def call(system_message, prompt):
+        await release.wait()
+
+    gateway = LLMGateway(call, max_concurrency=1, timeout=0.05, retries=0)
+    holder = asyncio.create_task(gateway.complete("system", "first"))
+    await asyncio.sleep(0)
+    with pytest.raises(LLMBusyError):
+        await gateway.complete("system", "second")
+    assert gateway.stats["rejected"] == 1
+    release.set()
+    holder.cancel()
+    await asyncio.gather(holder, return_exceptions=True)
+
+
+def test_analyze_repo_returns_503_with_retry_after_while_the_circuit_is_open(api, monkeypatch):
+    import server
+
+    breaker = CircuitBreaker(failure_threshold=1, reset_timeout=45)
+    breaker.record_failure()
+    gateway = LLMGateway(StubLLM(), breaker=breaker)
+    monkeypatch.setattr(server, "llm_gateway", gateway)
+    monkeypatch.setattr(server, "load_llm_sdk", lambda: object())
+
+    response = api.post("/api/ai/analyze-repo", json={
+        "repo_url": "https://github.com/example/app", "requirements": "Add auth"
+    })
+    assert response.status_code == 503
+    assert 1 <= int(response.headers["Retry-After"]) <= 45
+    assert gateway.call.calls == 0
@@ -0,0 +1,128 @@
+from types import SimpleNamespace
+
+import pytest
+from starlette.applications import Starlette
+from starlette.requests import Request
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+from starlette.testclient import TestClient
+
+from metrics import MongoCommandMetrics, MetricsMiddleware, Registry, mongo_command_listener
+
+pytestmark = pytest.mark.anyio
+
+
+def test_renders_prometheus_text():
+    registry = Registry()
+    calls = registry.counter("calls_total", "Calls made", ("path",))
+    active = registry.gauge("active", "Active things")
+    latency = registry.histogram("latency_seconds", "Latency", ("op",), buckets=(0.1, 1))
+    calls.inc('say "hi"\n')
+    calls.inc('say "hi"\n', amount=2)
+    active.inc()
+    active.dec(amount=0.5)
+    latency.observe("read", value=0.05)
+    latency.observe("read", value=0.5)
+    latency.observe("read", value=5)
+
+    assert registry.render().splitlines() == [
+        "# HELP calls_total Calls made",
+        "# TYPE calls_total counter",
+        'calls_total{path="say \\"hi\\"\\n"} 3',
+        "# HELP active Active things",
+        "# TYPE active gauge",
+        "active 0.5",
+        "# HELP latency_seconds Latency",
+        "# TYPE latency_seconds histogram",
+        'latency_seconds_bucket{op="read",le="0.1"} 1',
+        'latency_seconds_bucket{op="read",le="1"} 2',
+        'latency_seconds_bucket{op="read",le="+Inf"} 3',
+        'latency_seconds_sum{op="read"} 5.55',
+        'latency_seconds_count{op="read"} 3',
+    ]
+
+
+def test_reregistering_shares_a_metric_unless_it_conflicts():
+    registry = Registry()
+    first = registry.counter("calls_total", "Calls", ("path",))
+    assert registry.counter("calls_total", "Calls", ("path",)) is first
+    with pytest.raises(ValueError):
+        registry.gauge("calls_total", "Calls", ("path",))
+    with pytest.raises(ValueError):
+        first.inc("too", "many")
+
+
+def test_middleware_labels_routes_by_template_and_tracks_in_flight():
+    registry = Registry()
+    # Registering the same metrics again shares the middleware's series
+    in_flight = registry.gauge("http_requests_in_flight", "HTTP requests currently being served", ("method", "route"))
+    requests = registry.histogram("http_request_duration_seconds", "HTTP request latency by route",
+                                  ("method", "route", "status"))
+    seen_in_flight = []
+
+    async def item(request):
+        seen_in_flight.append(in_flight.value("GET", "/items/{item_id}"))
+        return JSONResponse({"id": request.path_params["item_id"]})
+
+    app = Starlette(routes=[Route("/items/{item_id}", item)])
+    app.add_middleware(MetricsMiddleware, registry=registry, routes=lambda: app.router.routes)
+
+    with TestClient(app) as client:
+        assert client.get("/items/1").status_code == 200
+        assert client.get("/items/2").status_code == 200
+        assert client.get("/nowhere").status_code == 404
+        assert client.post("/items/3").status_code == 405
+
+    assert seen_in_flight == [1, 1]
+    assert in_flight.value("GET", "/items/{item_id}") == 0
+    assert requests.count("GET", "/items/{item_id}", "200") == 2
+    assert requests.count("GET", "unmatched", "404") == 1
+    # A method mismatch is a partial match, still labelled by the template
+    assert requests.count("POST", "/items/{item_id}", "405") == 1
+    assert "/items/1" not in registry.render()
+
+
+def command_event(name, command, request_id=1, duration_micros=2500):
+    return SimpleNamespace(command_name=name, command=command, request_id=request_id, operation_id=request_id,
+                           duration_micros=duration_micros)
+
+
+def test_mongo_listener_records_commands_by_collection():
+    registry = Registry()
+    listener = MongoCommandMetrics(registry)
+    listener.started(command_event("find", {"find": "projects"}, request_id=1))
+    listener.started(command_event("getMore", {"getMore": 123, "collection": "projects"}, request_id=2))
+    listener.started(command_event("insert", {"insert": "jobs"}, request_id=3))
+    listener.started(command_event("ping", {"ping": 1}, request_id=4))
+    for request_id in (1, 2, 4):
+        listener.succeeded(command_event("ignored", {}, request_id=request_id))
+    listener.failed(command_event("insert", {}, request_id=3))
+
+    assert listener.duration.count("projects", "find") == 1
+    assert listener.duration.count("projects", "getMore") == 1
+    assert listener.duration.count("", "ping") == 1
+    assert listener.duration.count("jobs", "insert") == 1
+    assert listener.failures.value("jobs", "insert") == 1
+    assert listener._pending == {}
+
+
+def test_mongo_listener_is_a_pymongo_command_listener():
+    monitoring = pytest.importorskip("pymongo.monitoring")
+    assert isinstance(mongo_command_listener(Registry()), monitoring.CommandListener)
+
+
+def test_metrics_endpoint_is_loopback_only(api):
+    # TestClient connects as "testclient", not a loopback address
+    response = api.get("/metrics")
+    assert response.status_code == 403
+
+
+async def test_metrics_endpoint_serves_loopback_clients():
+    import server
+
+    request = Request({"type": "http", "method": "GET", "path": "/metrics", "headers": [],
+                       "client": ("127.0.0.1", 40000)})
+    response = await server.get_metrics(request)
+    assert response.status_code == 200
+    assert response.media_type == Registry.content_type
+    assert b"# TYPE llm_call_duration_seconds histogram" in response.body
@@ -0,0 +1,63 @@
+from datetime import datetime, timezone
+import uuid
+
+import pytest
+
+from storage import encode_cursor, decode_cursor, verify_datetimes
+
+from tests.conftest import BASE_TIME, make_project
+
+mongomock = pytest.importorskip("mongomock")
+
+from migrate_datetimes import DATETIME_FIELDS, migrate_collection  # noqa: E402
+
+
+def legacy_projects():
+    return [
+        make_project(1),
+        make_project(2, created_at="2026-01-01T00:02:00+00:00", updated_at="2026-01-02T00:00:00"),
+        make_project(3, created_at="2026-01-01T00:03:00Z"),
+        make_project(4, created_at="garbage"),
+    ]
+
+
+@pytest.fixture
+def projects():
+    collection = mongomock.MongoClient()[f"test_{uuid.uuid4().hex}"]["projects"]
+    collection.insert_many(legacy_projects())
+    return collection
+
+
+def test_dry_run_counts_without_writing(projects):
+    assert migrate_collection(projects, DATETIME_FIELDS["projects"], batch_size=2, dry_run=True) == 2
+    assert projects.count_documents({"created_at": {"$type": "string"}}) == 3
+
+
+def test_migration_converts_parseable_strings_and_reruns_do_nothing(projects):
+    assert migrate_collection(projects, DATETIME_FIELDS["projects"], batch_size=2, dry_run=False) == 2
+    second = projects.find_one({"id": "project-0002"})
+    assert second["created_at"].replace(tzinfo=timezone.utc) == datetime(2026, 1, 1, 0, 2, tzinfo=timezone.utc)
+    # Naive strings were written from UTC
+    assert second["updated_at"].replace(tzinfo=timezone.utc) == datetime(2026, 1, 2, tzinfo=timezone.utc)
+    # Unparseable values are left for a human to fix
+    assert projects.find_one({"id": "project-0004"})["created_at"] == "garbage"
+
+    assert migrate_collection(projects, DATETIME_FIELDS["projects"], batch_size=2, dry_run=True) == 0
+    assert migrate_collection(projects, DATETIME_FIELDS["projects"], batch_size=2, dry_run=False) == 0
+
+
+@pytest.mark.anyio
+async def test_startup_check_refuses_string_timestamps():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()[f"test_{uuid.uuid4().hex}"]
+    await db.projects.insert_one(make_project(1))
+    await verify_datetimes(db)
+
+    await db.templates.insert_one({"id": "legacy", "created_at": "2025-06-01T00:00:00"})
+    with pytest.raises(RuntimeError, match="templates"):
+        await verify_datetimes(db)
+
+
+def test_cursor_of_a_string_timestamp_round_trips():
+    token = encode_cursor(("2026-01-01T00:02:00+00:00", "project-0002"))
+    assert decode_cursor(token) == (BASE_TIME.replace(minute=2), "project-0002")
@@ -0,0 +1,90 @@
+import uuid
+
+import pytest
+
+from storage import MONGO_INDEXES, QUERY_SHAPES, ensure_indexes, verify_query_plans
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_ensure_indexes_creates_every_declared_index_and_drops_retired_ones():
+    mongomock_motor = pytest.importorskip("mongomock_motor")
+    db = mongomock_motor.AsyncMongoMockClient()[f"test_{uuid.uuid4().hex}"]
+    await db.projects.create_index([("name", "text"), ("description", "text")], name="search_text")
+
+    await ensure_indexes(db)
+    # Re-running against existing indexes is a no-op
+    await ensure_indexes(db)
+
+    for collection_name, indexes in MONGO_INDEXES.items():
+        existing = await db[collection_name].index_information()
+        assert set(existing) == {"_id_"} | {options["name"] for _, options in indexes}
+        for keys, options in indexes:
+            index = existing[options["name"]]
+            assert index["key"] == keys
+            assert index.get("unique", False) == options.get("unique", False)
+    assert "search_text" not in await db.projects.index_information()
+
+
+def _leading_fields(query):
+    return {field for field in query if not field.startswith("$")}
+
+
+@pytest.mark.parametrize("collection_name, query, sort", QUERY_SHAPES,
+                         ids=[f"{c}:{sorted(q)}" for c, q, _ in QUERY_SHAPES])
+def test_every_query_shape_has_a_covering_index(collection_name, query, sort):
+    """Offline stand-in for explain(): some index leads with the filter fields, then the sort fields"""
+    indexes = [keys for keys, _ in MONGO_INDEXES[collection_name]]
+    if "$text" in query:
+        assert any(direction == "text" for keys in indexes for _, direction in keys)
+        return
+    equality = _leading_fields(query)
+    sort_fields = [field for field, _ in sort or []]
+
+    def covers(keys):
+        fields = [field for field, _ in keys]
+        if set(fields[:len(equality)]) != equality:
+            return False
+        return fields[len(equality):len(equality) + len(sort_fields)] == sort_fields
+
+    assert any(covers(keys) for keys in indexes)
+
+
+class ExplainedCursor:
+    def __init__(self, plan):
+        self.plan = plan
+
+    def sort(self, sort):
+        return self
+
+    async def explain(self):
+        return {"queryPlanner": {"winningPlan": self.plan}}
+
+
+class ExplainedDatabase:
+    """Answers explain() for every query with a canned plan, or a COLLSCAN for the given collections"""
+
+    def __init__(self, collscans=()):
+        self.collscans = set(collscans)
+
+    def __getitem__(self, collection_name):
+        database = self
+
+        class Collection:
+            def find(self, query):
+                if collection_name in database.collscans and "$text" not in query:
+                    return ExplainedCursor({"stage": "SORT", "inputStage": {"stage": "COLLSCAN"}})
+                return ExplainedCursor({"stage": "FETCH", "inputStage": {"stage": "IXSCAN"}})
+
+        return Collection()
+
+
+async def test_verify_query_plans_accepts_index_scans():
+    await verify_query_plans(ExplainedDatabase())
+
+
+async def test_verify_query_plans_reports_collection_scans():
+    with pytest.raises(RuntimeError, match="COLLSCAN") as failure:
+        await verify_query_plans(ExplainedDatabase(collscans={"jobs"}))
+    assert "jobs.find(['id'])" in str(failure.value)
+    assert "projects" not in str(failure.value)
@@ -0,0 +1,53 @@
+import copy
+import random
+
+import pytest
+from pydantic import ValidationError
+
+from pricing import DEFAULT_PRICE_TABLES, PricingEngine
+
+from tests.conftest import auth_headers
+
+
+def test_batch_totals_match_single_quotes_with_fractional_prices():
+    tables = copy.deepcopy(DEFAULT_PRICE_TABLES)
+    tables["addon_prices"]["Hosting Extension"] = 199.5
+    tables["addon_prices"]["Payments"] = 500.7
+    engine = PricingEngine(tables)
+    rng = random.Random(7)
+    configs = [
+        {"tier": rng.choice(list(tables["base_prices"])),
+         "addons": rng.sample(list(tables["addon_prices"]), rng.randint(0, 4)),
+         "features": rng.sample(list(tables["addon_prices"]), rng.randint(0, 2)),
+         "is_student": rng.random() < 0.5}
+        for _ in range(200)
+    ]
+    assert engine.quote_batch(configs) == [engine.quote(config) for config in configs]
+
+
+def test_null_selections_price_as_empty():
+    engine = PricingEngine()
+    config = {"tier": "Growth", "addons": None, "features": None}
+    assert engine.quote(config)["total_cost"] == 12000
+    assert engine.quote_batch([config]) == [engine.quote(config)]
+
+
+@pytest.mark.parametrize("change", [
+    {"addon_prices": None},
+    {"addon_prices": {"Payments": None}},
+    {"base_prices": {"Starter": -1}},
+    {"student_discount": 1.5},
+])
+def test_malformed_tables_are_rejected_and_current_ones_kept(change):
+    engine = PricingEngine()
+    current = engine.tables
+    with pytest.raises(ValidationError):
+        engine.load(dict(DEFAULT_PRICE_TABLES, **change))
+    assert engine.tables is current
+
+
+def test_pricing_reload_requires_an_admin(api):
+    assert api.post("/api/admin/pricing/reload", headers=auth_headers("user-1")).status_code == 403
+    response = api.post("/api/admin/pricing/reload", headers=auth_headers("admin-1"))
+    assert response.status_code == 200
+    assert response.json()["currency"] == "INR"
@@ -0,0 +1,77 @@
+import pytest
+
+from tests.conftest import make_project
+from project_events import ProjectEventBus, EVENT_CREATED, EVENT_UPDATED, EVENT_DELETED
+from sqlite_store import SQLiteChangeLogSource, SQLiteDatabase, SQLiteProjectRepository
+
+pytestmark = pytest.mark.anyio
+
+
+@pytest.fixture
+async def two_workers(tmp_path):
+    """Two databases on one SQLite file, standing in for two workers"""
+    path = str(tmp_path / "projects.db")
+    databases = [SQLiteDatabase(path), SQLiteDatabase(path)]
+    for database in databases:
+        await database.initialize()
+    yield databases
+    for database in databases:
+        database.close()
+
+
+async def test_change_log_relays_another_workers_writes(two_workers):
+    writer_db, reader_db = two_workers
+    writer = SQLiteProjectRepository(writer_db)
+    bus = ProjectEventBus()
+    source = SQLiteChangeLogSource(reader_db, bus)
+    await writer.insert(make_project(0))
+    # The first poll only finds the current position
+    assert await source.poll() == 0
+
+    with bus.subscribe("project-0001") as subscription:
+        await writer.insert(make_project(1))
+        assert await source.poll() == 1
+        created = await subscription.get(0.1)
+        assert created["type"] == EVENT_CREATED
+        assert created["project"]["id"] == "project-0001"
+
+        await writer.update("user-1", "project-0001", {"status": "deployed"})
+        await writer.delete("user-1", "project-0001")
+        await writer.update("user-1", "project-0000", {"status": "deployed"})
+        # project-0001 was already gone when polled, so only its delete is published
+        assert await source.poll() == 2
+        deleted = await subscription.get(0.1)
+        assert deleted == {"type": EVENT_DELETED, "project_id": "project-0001", "project": None}
+        assert await subscription.get(0.1) is None
+
+
+async def test_change_log_publishes_current_state_in_batches(two_workers):
+    writer_db, reader_db = two_workers
+    writer = SQLiteProjectRepository(writer_db)
+    bus = ProjectEventBus(max_pending=64)
+    source = SQLiteChangeLogSource(reader_db, bus)
+    source.batch_size = 2
+    await writer.insert(make_project(0))
+    await source.poll()
+
+    with bus.subscribe("project-0000") as subscription:
+        for status in ("building", "testing", "deployed"):
+            await writer.update("user-1", "project-0000", {"status": status})
+        assert await source.poll() == 3
+        events = [await subscription.get(0.1) for _ in range(3)]
+        assert {event["type"] for event in events} == {EVENT_UPDATED}
+        assert events[-1]["project"]["status"] == "deployed"
+
+
+async def test_change_log_skips_changes_while_nobody_subscribes(two_workers):
+    writer_db, reader_db = two_workers
+    writer = SQLiteProjectRepository(writer_db)
+    bus = ProjectEventBus()
+    source = SQLiteChangeLogSource(reader_db, bus)
+    await source.poll()
+    await writer.insert(make_project(0))
+    assert await source.poll() == 0
+
+    with bus.subscribe("project-0000") as subscription:
+        assert await source.poll() == 0
+        assert await subscription.get(0.1) is None
@@ -0,0 +1,151 @@
+import csv
+import json
+
+import pytest
+
+from rate_limit import RateLimit
+
+from tests.conftest import auth_headers
+
+USER = auth_headers("user-1")
+
+
+def project_body(name, **fields):
+    body = {"name": name, "description": "A test project", "category": "saas", "frontend": "React",
+            "backend": "FastAPI", "ui_template": "SaaS Dashboard", "tier": "Starter"}
+    body.update(fields)
+    return body
+
+
+def create(api, name, headers=USER, **fields):
+    response = api.post("/api/projects", json=project_body(name, **fields), headers=headers)
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_next_cursor_walks_every_project_once(api):
+    created = [create(api, f"Project {i}")["id"] for i in range(5)]
+    create(api, "Someone else's", headers=auth_headers("user-2"))
+
+    seen, params = [], {"limit": 2}
+    while True:
+        page = api.get("/api/projects", params=params, headers=USER).json()
+        seen += [project["id"] for project in page["projects"]]
+        if not page["next_cursor"]:
+            break
+        params = {"limit": 2, "cursor": page["next_cursor"]}
+    assert seen == created[::-1]
+    assert api.get("/api/projects", params={"cursor": "not-a-cursor"}, headers=USER).status_code == 400
+
+
+def test_get_returns_304_for_a_matching_etag(api):
+    project = create(api, "Cached")
+    response = api.get(f"/api/projects/{project['id']}", headers=USER)
+    etag = response.headers["ETag"]
+    assert etag == '"v0"'
+    assert api.get(f"/api/projects/{project['id']}", headers={**USER, "If-None-Match": etag}).status_code == 304
+    api.put(f"/api/projects/{project['id']}", json={"status": "completed"}, headers=USER)
+    assert api.get(f"/api/projects/{project['id']}", headers={**USER, "If-None-Match": etag}).status_code == 200
+
+
+def test_if_match_rejects_stale_versions_with_412(api):
+    project = create(api, "Contended")
+    url = f"/api/projects/{project['id']}"
+    first = api.put(url, json={"status": "in_progress"}, headers={**USER, "If-Match": '"v0"'})
+    assert first.status_code == 200
+    assert first.headers["ETag"] == '"v1"'
+
+    stale = api.put(url, json={"status": "completed"}, headers={**USER, "If-Match": '"v0"'})
+    assert stale.status_code == 412
+    assert stale.headers["ETag"] == '"v1"'
+    assert api.put(url, json={"status": "completed"}, headers={**USER, "If-Match": 'W/"v1"'}).status_code == 412
+    assert api.get(url, headers=USER).json()["status"] == "in_progress"
+
+
+def test_bulk_writes_report_each_operation(api):
+    existing = create(api, "Existing")
+    response = api.post("/api/projects/bulk", headers=USER, json={"ordered": False, "operations": [
+        {"op": "create", "project": project_body("Bulk 1", addons=["Payments"])},
+        {"op": "create", "project": project_body("Bulk 2")},
+        {"op": "update", "id": existing["id"], "updates": {"status": "completed"}},
+        {"op": "delete", "id": "missing"},
+    ]})
+    assert response.status_code == 200
+    body = response.json()
+    assert [result["status"] for result in body["results"]] == ["created", "created", "updated", "not_found"]
+    assert body["summary"] == {"created": 2, "updated": 1, "not_found": 1}
+    projects = api.get("/api/projects", headers=USER).json()["projects"]
+    bulk_1 = next(project for project in projects if project["name"] == "Bulk 1")
+    assert bulk_1["estimated_cost"] == 3500
+
+
+def test_writes_reach_the_analytics_counters(api):
+    create(api, "Counted", tier="Growth")
+    create(api, "Also counted", tier="Growth")
+    analytics = api.get("/api/admin/analytics", headers=auth_headers("admin-1")).json()
+    assert analytics["projects"] == 2
+    assert analytics["by_tier"]["Growth"]["count"] == 2
+
+
+def test_rate_limited_callers_get_429_with_retry_after(api, monkeypatch):
+    import server
+    monkeypatch.setitem(server.RATE_LIMITS, "read", RateLimit(2, 60))
+    assert api.get("/api/projects", headers=USER).status_code == 200
+    assert api.get("/api/projects", headers=USER).status_code == 200
+    limited = api.get("/api/projects", headers=USER)
+    assert limited.status_code == 429
+    assert 1 <= int(limited.headers["Retry-After"]) <= 30
+    # Buckets are per caller
+    assert api.get("/api/projects", headers=auth_headers("user-2")).status_code == 200
+
+
+def test_updates_reject_null_required_fields_and_pricing_inputs(api):
+    project = create(api, "Priced", addons=["Payments"])
+    url = f"/api/projects/{project['id']}"
+    assert api.put(url, json={"name": None}, headers=USER).status_code == 422
+    assert api.put(url, json={"features": None}, headers=USER).status_code == 422
+    assert api.put(url, json={"addons": []}, headers=USER).status_code == 422
+    bulk = api.post("/api/projects/bulk", headers=USER, json={"operations": [
+        {"op": "update", "id": project["id"], "updates": {"status": None}},
+    ]})
+    assert bulk.status_code == 422
+
+    # Nullable fields can still be cleared
+    cleared = api.put(url, json={"deployed_url": None}, headers=USER)
+    assert cleared.status_code == 200
+    assert cleared.json()["deployed_url"] is None
+    stored = api.get(url, headers=USER).json()
+    assert stored["name"] == "Priced"
+    assert stored["estimated_cost"] == project["estimated_cost"]
+    assert api.get("/api/projects", headers=USER).status_code == 200
+
+
+def test_export_requires_an_admin(api):
+    create(api, "Private")
+    assert api.get("/api/admin/projects/export").status_code == 403
+    assert api.get("/api/admin/projects/export", headers=USER).status_code == 403
+
+
+@pytest.mark.parametrize("export_format", ["ndjson", "csv"])
+def test_export_streams_every_users_projects_across_batches(api, monkeypatch, export_format):
+    import server
+
+    # Smaller than the project count, so the export spans several storage batches
+    monkeypatch.setattr(server, "EXPORT_BATCH_SIZE", 2)
+    created = {create(api, f"Project {i}", headers=auth_headers(f"user-{i % 2}"))["id"] for i in range(5)}
+
+    response = api.get("/api/admin/projects/export", params={"format": export_format},
+                       headers=auth_headers("admin-1"))
+    assert response.status_code == 200
+    lines = response.text.splitlines()
+    if export_format == "ndjson":
+        assert response.headers["content-type"].startswith("application/x-ndjson")
+        exported = [json.loads(line) for line in lines]
+        assert {project["user_id"] for project in exported} == {"user-0", "user-1"}
+    else:
+        assert response.headers["content-type"].startswith("text/csv")
+        header, *rows = list(csv.reader(lines))
+        assert header == list(server.Project.model_fields)
+        exported = [dict(zip(header, row)) for row in rows]
+    assert len(exported) == 5
+    assert {project["id"] for project in exported} == created
@@ -0,0 +1,166 @@
+import subprocess
+
+import pytest
+
+from repo_ingest import (
+    CHUNK_SYSTEM_MESSAGE, RepoAnalyzer, RepoIngestionError, RepoSnapshot, blob_hash, build_chunks,
+    resolve_local_source
+)
+from scaffold_cache import ScaffoldCache
+
+pytestmark = pytest.mark.anyio
+
+SOURCE_FILES = {
+    "README.md": "# Shop\n",
+    "src/app.py": "print('app')\n",
+    "src/util.py": "def helper():\n    return 1\n",
+    "src/components/button.js": "export const Button = () => null;\n",
+}
+SKIPPED_FILES = {
+    "node_modules/react/index.js": "module.exports = {};\n",
+    "vendor/lib.go": "package lib\n",
+    "package-lock.json": "{}\n",
+    "yarn.lock": "# lock\n",
+    "static/logo.png": "not really a png\n",
+    "static/app.min.js": "var a=1;\n",
+    "data/blob.txt": "binary\0content\n",
+    "empty.py": "",
+    "huge.sql": "x" * 5000,
+}
+
+
+def write_tree(root, files):
+    for rel_path, text in files.items():
+        path = root / rel_path
+        path.parent.mkdir(parents=True, exist_ok=True)
+        path.write_text(text)
+    return root
+
+
+def git_commit(root):
+    def git(*args):
+        subprocess.run(["git", "-C", str(root), "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+                       check=True, capture_output=True)
+    git("init", "-q")
+    git("add", "-A")
+    git("commit", "-q", "-m", "initial")
+
+
+class StubLLM:
+    """Answers chunk prompts with a numbered summary and synthesis prompts with a fixed analysis"""
+
+    def __init__(self):
+        self.chunk_prompts = []
+        self.synthesis_prompts = []
+
+    async def __call__(self, system_message, prompt):
+        if system_message == CHUNK_SYSTEM_MESSAGE:
+            self.chunk_prompts.append(prompt)
+            return f"summary {len(self.chunk_prompts)}"
+        self.synthesis_prompts.append(prompt)
+        return "analysis"
+
+
+@pytest.mark.parametrize("use_git", [False, True])
+def test_snapshot_reads_source_and_skips_vendored_lockfiles_and_binaries(tmp_path, use_git):
+    write_tree(tmp_path, {**SOURCE_FILES, **SKIPPED_FILES})
+    if use_git:
+        git_commit(tmp_path)
+    snapshot = RepoSnapshot(tmp_path, max_file_bytes=1024)
+    files = list(snapshot.files())
+
+    assert (snapshot.commit is not None) == use_git
+    assert sorted(path for path, _, _ in files) == sorted(SOURCE_FILES)
+    for path, blob, text in files:
+        assert text == SOURCE_FILES[path]
+        # Git blob ids and directory hashes agree, so both share cached summaries
+        assert blob == blob_hash(text.encode())
+    if use_git:
+        assert snapshot.skipped == len(SKIPPED_FILES)
+
+
+def test_chunks_never_span_directories_and_split_large_files():
+    files = [
+        ("a/one.py", "1", "x" * 40),
+        ("a/two.py", "2", "x" * 40),
+        ("a/b/three.py", "3", "x" * 40),
+        ("b/four.py", "4", "x" * 40),
+        ("b/large.py", "5", "line\n" * 100),
+    ]
+    chunks, included, truncated = build_chunks(files, chunk_tokens=50, max_tokens=10000)
+    assert (included, truncated) == (5, False)
+    for chunk in chunks:
+        assert len({path.rpartition('/')[0] for path, _, _, _ in chunk.pieces}) == 1
+        assert chunk.tokens <= 50 + 1
+    assert [path for path, _, _, _ in chunks[0].pieces] == ["a/one.py", "a/two.py"]
+    large_parts = [chunk.pieces[0][2] for chunk in chunks if chunk.pieces[0][0] == "b/large.py"]
+    assert len(large_parts) > 1
+    assert large_parts[0] == f"(part 1/{len(large_parts)})"
+
+
+def test_token_budget_cuts_the_repository_short():
+    files = [(f"src/file{i}.py", str(i), "x" * 400) for i in range(10)]
+    chunks, included, truncated = build_chunks(files, chunk_tokens=1000, max_tokens=350)
+    assert truncated
+    assert included == 3
+    assert sum(chunk.tokens for chunk in chunks) <= 350
+
+
+async def test_unchanged_chunks_reuse_cached_summaries(tmp_path):
+    write_tree(tmp_path, {
+        "api/routes.py": "def routes():\n    pass\n",
+        "api/models.py": "class Model:\n    pass\n",
+        "web/app.js": "render();\n",
+    })
+    git_commit(tmp_path)
+    llm = StubLLM()
+    analyzer = RepoAnalyzer(llm, ScaffoldCache(), chunk_tokens=1000)
+
+    first = await analyzer.analyze(tmp_path, "file:///shop", "Add auth")
+    assert first["analysis"] == "analysis"
+    assert first["repository"]["chunks"] == 2
+    assert first["repository"]["cached_chunks"] == 0
+    assert len(llm.chunk_prompts) == 2
+
+    # Same snapshot, new requirements: every chunk summary comes from the cache
+    second = await analyzer.analyze(tmp_path, "file:///shop", "Add payments")
+    assert second["repository"]["cached_chunks"] == 2
+    assert len(llm.chunk_prompts) == 2
+    assert len(llm.synthesis_prompts) == 2
+
+    # Same snapshot and requirements: the whole analysis is cached
+    await analyzer.analyze(tmp_path, "file:///shop", "Add payments")
+    assert len(llm.synthesis_prompts) == 2
+
+    # Editing one directory re-summarizes only its chunk
+    write_tree(tmp_path, {"web/app.js": "render(App);\n"})
+    git_commit(tmp_path)
+    third = await analyzer.analyze(tmp_path, "file:///shop", "Add payments")
+    assert third["repository"]["cached_chunks"] == 1
+    assert len(llm.chunk_prompts) == 3
+    assert "web/app.js" in llm.chunk_prompts[-1]
+
+
+def test_local_paths_must_be_under_an_allowed_root(tmp_path):
+    allowed = tmp_path / "repos"
+    (allowed / "shop").mkdir(parents=True)
+    (tmp_path / "secrets").mkdir()
+    assert resolve_local_source("https://github.com/example/shop", [str(allowed)]) is None
+    assert resolve_local_source(f"file://{allowed}/shop", [str(allowed)]) == (allowed / "shop").resolve()
+    with pytest.raises(RepoIngestionError):
+        resolve_local_source(f"file://{allowed}/../secrets", [str(allowed)])
+    with pytest.raises(RepoIngestionError):
+        resolve_local_source(f"file://{allowed}/shop", [])
+
+
+def test_analyze_repo_rejects_paths_outside_the_ingest_roots(api, monkeypatch, tmp_path):
+    import server
+
+    allowed = tmp_path / "repos"
+    allowed.mkdir()
+    (tmp_path / "secrets").mkdir()
+    monkeypatch.setattr(server, "REPO_INGEST_ROOTS", [str(allowed)])
+    for repo_url in (f"file://{tmp_path}/secrets", f"{allowed}/../secrets", "/etc"):
+        response = api.post("/api/ai/analyze-repo", json={"repo_url": repo_url, "requirements": "Review"})
+        assert response.status_code == 400
+        assert "outside the allowed roots" in response.json()["detail"]
@@ -0,0 +1,63 @@
+import asyncio
+
+import pytest
+
+from scaffold_cache import ScaffoldCache, config_cache_key
+
+pytestmark = pytest.mark.anyio
+
+CONFIG = {"name": "Shop", "features": ["Payments", "Admin Panel"]}
+
+
+class SlowGenerator:
+    def __init__(self):
+        self.calls = 0
+        self.release = asyncio.Event()
+
+    async def __call__(self, project_config):
+        self.calls += 1
+        await self.release.wait()
+        return {"status": "generated", "scaffold": project_config["name"]}
+
+
+async def test_cancelled_first_caller_does_not_cancel_followers():
+    cache = ScaffoldCache()
+    generate = SlowGenerator()
+    leader = asyncio.ensure_future(cache.get_or_generate(CONFIG, generate))
+    follower = asyncio.ensure_future(cache.get_or_generate(dict(CONFIG), generate))
+    await asyncio.sleep(0)
+    leader.cancel()
+    await asyncio.sleep(0)
+    generate.release.set()
+    assert (await follower)["scaffold"] == "Shop"
+    assert leader.cancelled()
+    assert generate.calls == 1
+    # The generation finished without any caller left and still filled the cache
+    assert await cache.get(config_cache_key(CONFIG)) is not None
+
+
+async def test_generation_survives_every_caller_leaving():
+    cache = ScaffoldCache()
+    generate = SlowGenerator()
+    caller = asyncio.ensure_future(cache.get_or_generate(CONFIG, generate))
+    await asyncio.sleep(0)
+    caller.cancel()
+    generate.release.set()
+    for _ in range(10):
+        await asyncio.sleep(0)
+    assert await cache.get(config_cache_key(CONFIG)) is not None
+    assert await cache.get_or_generate(CONFIG, generate) == {"status": "generated", "scaffold": "Shop"}
+    assert generate.calls == 1
+
+
+async def test_failures_reach_every_waiter_and_are_not_cached():
+    cache = ScaffoldCache()
+
+    async def failing(project_config):
+        await asyncio.sleep(0)
+        raise RuntimeError("upstream down")
+
+    results = await asyncio.gather(cache.get_or_generate(CONFIG, failing), cache.get_or_generate(CONFIG, failing),
+                                   return_exceptions=True)
+    assert all(isinstance(r, RuntimeError) for r in results)
+    assert await cache.get(config_cache_key(CONFIG)) is None
@@ -0,0 +1,86 @@
+import asyncio
+import json
+
+import pytest
+
+from llm_gateway import LLMGateway
+
+from tests.conftest import auth_headers
+
+SCAFFOLD = {
+    "file_structure": ["src/", "src/App.jsx", "package.json"],
+    "key_files": {"package.json": '{"name": "shop"}', "src/App.jsx": "export default () => null;"},
+    "setup_instructions": ["npm install", "npm start"],
+    "estimated_time": "12 hours",
+}
+
+
+def use_stub_llm(monkeypatch, response, delay=0):
+    """Route scaffold generation through the real gateway to a stub model returning response"""
+    import server
+
+    async def call(system_message, prompt):
+        await asyncio.sleep(delay)
+        return response
+
+    monkeypatch.setattr(server, "llm_available", lambda: True)
+    monkeypatch.setattr(server, "GEMINI_API_KEY", "test-key")
+    monkeypatch.setattr(server, "llm_gateway", LLMGateway(call, retries=0))
+
+
+def read_events(api, project_config):
+    """(event, data) for each SSE message, with comment lines as (None, comment)"""
+    response = api.post("/api/ai/generate-scaffold/stream", json={"project_config": project_config},
+                        headers=auth_headers("user-1"))
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/event-stream")
+    events = []
+    for message in response.text.split("\n\n"):
+        if not message:
+            continue
+        if message.startswith(":"):
+            events.append((None, message[1:].strip()))
+            continue
+        fields = dict(line.split(": ", 1) for line in message.splitlines())
+        events.append((fields.get("event"), json.loads(fields["data"])))
+    return events
+
+
+def test_stream_emits_started_files_setup_and_done(api, monkeypatch):
+    # Models often fence their JSON
+    use_stub_llm(monkeypatch, f"```json\n{json.dumps(SCAFFOLD)}\n```")
+    events = read_events(api, {"name": "Streamed Shop"})
+
+    assert [event for event, _ in events] == [
+        "started", "file_structure", "file_structure", "file_structure", "key_file", "key_file", "setup", "done",
+    ]
+    assert events[0][1] == {"status": "started"}
+    assert [data["path"] for event, data in events if event == "file_structure"] == SCAFFOLD["file_structure"]
+    assert {data["path"]: data["content"] for event, data in events if event == "key_file"} == SCAFFOLD["key_files"]
+    assert events[-2][1] == {"setup_instructions": ["npm install", "npm start"], "estimated_time": "12 hours"}
+    done = events[-1][1]
+    assert done["status"] == "generated"
+    assert "scaffold" not in done
+
+
+def test_unparseable_output_is_streamed_raw(api, monkeypatch):
+    use_stub_llm(monkeypatch, "Here is your project: make a src folder and start coding.")
+    events = read_events(api, {"name": "Prose Shop"})
+
+    assert [event for event, _ in events] == ["started", "raw", "done"]
+    assert events[1][1] == {"content": "Here is your project: make a src folder and start coding."}
+    assert events[2][1]["status"] == "generated"
+
+
+def test_heartbeats_are_sent_while_the_model_is_working(api, monkeypatch):
+    import server
+
+    monkeypatch.setattr(server, "SSE_HEARTBEAT_SECONDS", 0.02)
+    use_stub_llm(monkeypatch, json.dumps(SCAFFOLD), delay=0.1)
+    events = read_events(api, {"name": "Slow Shop"})
+
+    kinds = [event for event, _ in events]
+    assert kinds[0] == "started"
+    assert None in kinds[1:kinds.index("file_structure")]
+    assert (None, "heartbeat") in events
+    assert kinds[-1] == "done"
@@ -0,0 +1,53 @@
+import io
+import zipfile
+
+import pytest
+
+from blob_store import InMemoryBlobStore
+from scaffold_archive import load_manifest, store_scaffold, stream_zip
+
+from tests.conftest import auth_headers
+
+pytestmark = pytest.mark.anyio
+
+SCAFFOLD = {
+    "file_structure": ["src/", "src/components/", "package.json"],
+    "key_files": {"package.json": {"name": "shop"}, "src/main.js": "x" * 200000, "../etc/passwd": "nope"},
+}
+
+
+async def test_stream_zip_yields_a_valid_archive_in_pieces():
+    store = InMemoryBlobStore()
+    manifest = await load_manifest(store, await store_scaffold(store, "user-1", SCAFFOLD, name="My Shop!"), "user-1")
+    pieces = [piece async for piece in stream_zip(store, manifest)]
+    assert len(pieces) > 2
+    with zipfile.ZipFile(io.BytesIO(b"".join(pieces))) as archive:
+        assert archive.testzip() is None
+        assert sorted(archive.namelist()) == [
+            "My-Shop/etc/passwd", "My-Shop/package.json", "My-Shop/src/", "My-Shop/src/components/",
+            "My-Shop/src/main.js",
+        ]
+        assert archive.read("My-Shop/src/main.js") == b"x" * 200000
+        assert archive.read("My-Shop/package.json").startswith(b'{\n  "name": "shop"')
+
+
+def test_zip_download_round_trip_is_owner_only(api, monkeypatch):
+    import server
+    # The built-in mock scaffold, whatever SDK is installed
+    monkeypatch.setattr(server, "llm_available", lambda: False)
+    headers = auth_headers("user-1")
+    response = api.post("/api/ai/generate-scaffold/zip", json={"project_config": {"name": "Shop"}}, headers=headers)
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/zip"
+    assert response.headers["content-disposition"] == 'attachment; filename="Shop.zip"'
+    with zipfile.ZipFile(io.BytesIO(response.content)) as archive:
+        names = set(archive.namelist())
+        assert {"Shop/README.md", "Shop/package.json", "Shop/src/"} <= names
+
+    scaffold_id = response.headers["X-Scaffold-Id"]
+    again = api.get(f"/api/ai/scaffolds/{scaffold_id}/zip", headers=headers)
+    assert again.status_code == 200
+    with zipfile.ZipFile(io.BytesIO(again.content)) as archive:
+        assert set(archive.namelist()) == names
+    assert api.get(f"/api/ai/scaffolds/{scaffold_id}/zip", headers=auth_headers("user-2")).status_code == 404
+    assert api.get("/api/ai/scaffolds/not-a-digest/zip", headers=headers).status_code == 404
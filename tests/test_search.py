@@ -0,0 +1,58 @@
+import pytest
+
+from search import PROJECT_SEARCH, SearchFilters, matches, tokenize
+from storage import MongoProjectRepository
+
+from tests.conftest import make_project
+
+pytestmark = pytest.mark.anyio
+
+PROJECTS = [
+    make_project(1, name="Storefront", frontend="Node.js", backend="Express", features=["Payments"]),
+    make_project(2, name="Dashboard", frontend="React", backend="C#", description="Internal tools"),
+    make_project(3, name="Engine", frontend="Vue.js", backend="C++", features=["Admin Panel"]),
+    make_project(4, name="Node explorer", frontend="Svelte", backend="Go", description="Graph nodes"),
+    make_project(5, name="Running shoes", frontend="React", backend="Django", description="The running store"),
+]
+
+QUERIES = [
+    {"tech": ["node"]},
+    {"tech": ["Node.js"]},
+    {"tech": ["js"]},
+    {"tech": ["c#"]},
+    {"tech": ["c"]},
+    {"tech": ["c++"]},
+    {"tech": ["react", "c#"]},
+    {"q": "node"},
+    {"q": "nodes"},
+    {"q": "running"},
+    {"q": "run"},
+    {"q": "the"},
+    {"q": "admin"},
+    {"q": "payments storefront"},
+]
+
+
+def test_tokenize_splits_on_dots_and_keeps_symbols():
+    assert tokenize("Node.js") == ["node", "js"]
+    assert tokenize("C# and C++.") == ["c#", "and", "c++"]
+
+
+async def _search_ids(repo, filters):
+    if isinstance(repo, MongoProjectRepository) and filters.text_terms:
+        # mongomock has no $text; the regex clauses alone decide which documents match
+        query = repo._search_query("user-1", filters)
+        del query["$text"]
+        docs = await repo.collection.find(query).to_list(None)
+    else:
+        docs = await repo.search("user-1", filters, limit=100)
+    return sorted(doc["id"] for doc in docs)
+
+
+@pytest.mark.parametrize("params", QUERIES, ids=lambda params: repr(params))
+async def test_backends_agree_with_matches(project_repo, params):
+    for doc in PROJECTS:
+        await project_repo.insert(dict(doc))
+    filters = SearchFilters(**params)
+    expected = sorted(doc["id"] for doc in PROJECTS if matches(PROJECT_SEARCH, doc, filters))
+    assert await _search_ids(project_repo, filters) == expected
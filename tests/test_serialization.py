@@ -0,0 +1,75 @@
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from pydantic import BaseModel
+
+import serialization
+
+from tests.conftest import auth_headers
+
+
+class Stamped(BaseModel):
+    at: datetime
+
+
+VALUES = [
+    datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone.utc),
+    datetime(2026, 1, 2, 3, 4, 5, 678901, tzinfo=timezone.utc),
+    datetime(2026, 1, 2, 3, 4, 5, tzinfo=timezone(timedelta(hours=5, minutes=30))),
+    datetime(2026, 1, 2, 3, 4, 5),
+]
+
+
+@pytest.mark.parametrize("orjson", [True, False], ids=["orjson", "stdlib"])
+@pytest.mark.parametrize("value", VALUES, ids=str)
+def test_fast_path_writes_datetimes_like_pydantic(monkeypatch, orjson, value):
+    if orjson and not serialization.HAS_ORJSON:
+        pytest.skip("orjson not installed")
+    monkeypatch.setattr(serialization, "HAS_ORJSON", orjson)
+    assert serialization.dumps({"at": value}) == Stamped(at=value).model_dump_json().encode()
+
+
+# A project written before tier, version, platform and the URL fields existed
+LEGACY_PROJECT = {
+    "id": "legacy-1", "user_id": "user-1", "name": "Legacy", "description": "Old", "category": "saas",
+    "frontend": "React", "backend": "FastAPI", "ui_template": "Minimal", "deployment_option": "vercel",
+    "estimated_cost": 1000.0, "estimated_timeline": "2-3 weeks",
+    "created_at": datetime(2024, 5, 1, tzinfo=timezone.utc), "updated_at": datetime(2024, 5, 1, tzinfo=timezone.utc),
+    "_id": "mongo-id", "legacy_field": "dropped",
+}
+
+
+def test_fast_path_fills_in_model_defaults_for_legacy_documents():
+    import server
+
+    fast = serialization.trim_to_fields([LEGACY_PROJECT], server.PROJECT_FIELDS, server.PROJECT_DEFAULTS)[0]
+    assert fast["tier"] == "Starter"
+    assert fast["version"] == 0
+    assert serialization.dumps(fast) == server.Project(**LEGACY_PROJECT).model_dump_json().encode()
+    # Mutable defaults are copied, never shared between responses
+    assert fast["features"] == [] and fast["features"] is not server.PROJECT_DEFAULTS["features"]
+
+
+def test_fast_and_strict_responses_agree_for_legacy_documents(api, monkeypatch):
+    import server
+
+    if server.STORAGE_BACKEND == "sqlite":
+        pytest.skip("SQLite stores every column, so it has no legacy documents")
+    doc = {k: v for k, v in LEGACY_PROJECT.items() if k != "_id"}
+    api.portal.call(server.project_repo.insert, doc)
+    # Insert adds the version counter; take it out again, as in a document from before it existed
+    if server.STORAGE_BACKEND == "mongo":
+        api.portal.call(server.db.projects.update_one, {"id": "legacy-1"}, {"$unset": {"version": ""}})
+    else:
+        server.project_repo._by_id["legacy-1"].pop("version", None)
+
+    headers = auth_headers("user-1")
+    bodies = {}
+    for fast in (True, False):
+        monkeypatch.setattr(server, "FAST_SERIALIZATION", fast)
+        item = api.get("/api/projects/legacy-1", headers=headers)
+        page = api.get("/api/projects", headers=headers)
+        assert item.status_code == page.status_code == 200
+        bodies[fast] = (item.json(), page.json()["projects"])
+    assert bodies[True] == bodies[False]
+    assert bodies[True][0]["tier"] == "Starter"
@@ -0,0 +1,92 @@
+from datetime import timedelta
+
+import pytest
+
+from storage import VersionConflictError
+
+from tests.conftest import BASE_TIME, make_project
+
+pytestmark = pytest.mark.anyio
+
+
+async def test_crud_is_scoped_to_the_owner_and_versions_every_update(project_repo):
+    await project_repo.insert(make_project(1))
+    assert await project_repo.get("user-2", "project-0001") is None
+
+    updated = await project_repo.update("user-1", "project-0001", {"status": "completed"})
+    assert updated["status"] == "completed"
+    assert updated["version"] == 2
+    assert await project_repo.update("user-2", "project-0001", {"status": "pending"}) is None
+
+    with pytest.raises(VersionConflictError) as conflict:
+        await project_repo.update("user-1", "project-0001", {"status": "pending"}, expected_version=1)
+    assert conflict.value.current_version == 2
+    assert (await project_repo.update("user-1", "project-0001", {"name": "Renamed"}, expected_version=2))["version"] == 3
+
+    assert not await project_repo.delete("user-2", "project-0001")
+    assert await project_repo.delete("user-1", "project-0001")
+    assert await project_repo.get("user-1", "project-0001") is None
+
+
+async def test_duplicate_insert_is_rejected(project_repo):
+    await project_repo.insert(make_project(1))
+    with pytest.raises(Exception):
+        await project_repo.insert(make_project(1))
+
+
+@pytest.mark.parametrize("descending", [True, False])
+async def test_keyset_pages_cover_every_project_once(project_repo, descending):
+    docs = [make_project(i) for i in range(7)]
+    # Two projects created at the same instant are ordered by id
+    docs.append(make_project(7, created_at=docs[3]["created_at"]))
+    docs.append(make_project(8, user_id="user-2"))
+    for doc in docs:
+        await project_repo.insert(dict(doc))
+
+    seen, after = [], None
+    while True:
+        page = await project_repo.list_for_user("user-1", 3, after, descending)
+        seen += [doc["id"] for doc in page]
+        if len(page) < 3:
+            break
+        after = (page[-1]["created_at"], page[-1]["id"])
+
+    expected = sorted((doc for doc in docs if doc["user_id"] == "user-1"),
+                      key=lambda doc: (doc["created_at"], doc["id"]), reverse=descending)
+    assert seen == [doc["id"] for doc in expected]
+
+
+async def test_list_all_crosses_users(project_repo):
+    for i, user_id in enumerate(["user-1", "user-2", "user-3"]):
+        await project_repo.insert(make_project(i, user_id=user_id))
+    page = await project_repo.list_all(10, (BASE_TIME + timedelta(minutes=0), "project-0000"), descending=False)
+    assert [doc["id"] for doc in page] == ["project-0001", "project-0002"]
+
+
+@pytest.mark.parametrize("ordered, statuses", [
+    (True, ["created", "updated", "not_found", "skipped"]),
+    (False, ["created", "updated", "not_found", "deleted"]),
+])
+async def test_bulk_write_stops_at_the_first_failure_only_when_ordered(project_repo, ordered, statuses):
+    await project_repo.insert(make_project(1))
+    results = await project_repo.bulk_write("user-1", [
+        {"op": "insert", "doc": make_project(2)},
+        {"op": "update", "id": "project-0001", "updates": {"status": "completed"}},
+        {"op": "delete", "id": "missing"},
+        {"op": "delete", "id": "project-0002"},
+    ], ordered=ordered)
+    assert [result["status"] for result in results] == statuses
+    assert (await project_repo.get("user-1", "project-0001"))["status"] == "completed"
+
+
+async def test_listeners_see_every_write(project_repo):
+    changes = []
+
+    async def listener(previous, current):
+        changes.append((previous and previous["status"], current and current["status"]))
+
+    project_repo.add_listener(listener)
+    await project_repo.insert(make_project(1))
+    await project_repo.update("user-1", "project-0001", {"status": "completed"})
+    await project_repo.delete("user-1", "project-0001")
+    assert changes == [(None, "pending"), ("pending", "completed"), ("completed", None)]
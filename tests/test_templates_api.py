@@ -0,0 +1,18 @@
+def test_catalog_and_template_etags_return_304(api):
+    listing = api.get("/api/templates")
+    assert listing.status_code == 200
+    etag = listing.headers["ETag"]
+    assert api.get("/api/templates", headers={"If-None-Match": etag}).status_code == 304
+
+    template_id = listing.json()[0]["id"]
+    item = api.get(f"/api/templates/{template_id}")
+    assert item.json()["id"] == template_id
+    assert api.get(f"/api/templates/{template_id}", headers={"If-None-Match": item.headers["ETag"]}).status_code == 304
+    assert api.get("/api/templates/missing").status_code == 404
+
+
+def test_filtered_listing_skips_the_cached_body(api):
+    everything = api.get("/api/templates").json()
+    saas = api.get("/api/templates", params={"category": "saas"}).json()
+    assert 0 < len(saas) < len(everything)
+    assert all(template["category"] == "saas" for template in saas)